@@ -1,18 +1,23 @@
 import os
 import json
 import time
+import asyncio
 import uvicorn
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Literal
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
 from dotenv import load_dotenv
 load_dotenv()
 
+from engine.audio_upload import MAX_AUDIO_BYTES, AudioTooLarge, spool_upload
+from engine.idempotency import IdempotencyConflict, IdempotentRunner, request_key
+from engine.llm_json import parse_llm_json
+
 # -----------------------------------------------------------
 # FastAPI App
 # -----------------------------------------------------------
@@ -34,13 +39,31 @@ DASHSCOPE_API_KEY = os.getenv("DASHSCOPE_API_KEY", "").strip()
 camel_engine = None
 rag_module = None
 ALLOWED_BANDS = {"5.5", "6", "6.5", "7", "7.5", "8"}
+EVAL_MODES = {"full", "fast"}
+DEFAULT_EVAL_MODE = "full"
 
 try:
-    from engine.camel_agents import CamelIELTSAgent
+    from engine.camel_agents import CamelIELTSAgent, EVAL_MODES, DEFAULT_EVAL_MODE
     camel_engine = CamelIELTSAgent()
 except Exception as e:
     print(f"[WARN] CamelIELTSAgent init failed: {e}")
 
+try:
+    from engine.audio_preprocess import prepare_for_asr
+    from engine.audio_quality import AudioRejected, check_audio
+except Exception as e:
+    print(f"[WARN] audio preprocessing import failed: {e}")
+    prepare_for_asr = None
+
+    class AudioRejected(Exception):
+        pass
+
+try:
+    from engine.grammar_trial import generate_grammar_hint, validate_grammar_trial
+except Exception as e:
+    print(f"[WARN] grammar_trial import failed: {e}")
+    generate_grammar_hint = validate_grammar_trial = None
+
 try:
     from engine.rag import AgenticRAG
     rag_module = AgenticRAG()
@@ -48,25 +71,101 @@ except Exception as e:
     print(f"[WARN] RAG init failed: {e}")
 
 try:
-    from engine.p1_service import ALLOWED_BANDS, generate_p1_answer
+    from engine.p1_service import ALLOWED_BANDS, generate_p1_answer, stream_p1_answer
 except Exception as e:
     print(f"[WARN] p1_service import failed: {e}")
-    def generate_p1_answer(**kwargs):
+    async def generate_p1_answer(**kwargs):
         return "服务暂不可用"
+    async def stream_p1_answer(**kwargs):
+        yield "服务暂不可用"
 
 try:
-    from engine.tts import synthesize_speech
+    from engine.tts import asynthesize_speech
 except Exception as e:
     print(f"[WARN] TTS import failed: {e}")
-    def synthesize_speech(**kwargs):
+    async def asynthesize_speech(**kwargs):
         raise RuntimeError("TTS 服务不可用")
 
+try:
+    from engine.tts_cache import CACHE_CONTROL, tts_cache
+except Exception as e:
+    print(f"[WARN] TTS cache import failed: {e}")
+    tts_cache = None
+
+try:
+    from engine.transcript_cache import transcript_cache
+except Exception as e:
+    print(f"[WARN] transcript cache import failed: {e}")
+    transcript_cache = None
+
 try:
     from engine import llm_client
 except Exception as e:
     print(f"[WARN] llm_client import failed: {e}")
     llm_client = None
 
+try:
+    from engine.glossary import AUTOBUILD as GLOSSARY_AUTOBUILD, glossary, normalize_term
+except Exception as e:
+    print(f"[WARN] glossary import failed: {e}")
+    glossary = None
+
+try:
+    from engine import http_client
+except Exception as e:
+    print(f"[WARN] http_client import failed: {e}")
+    http_client = None
+
+
+try:
+    from engine.bank_registry import registry as bank_registry
+except Exception as e:
+    print(f"[WARN] bank_registry import failed: {e}")
+    bank_registry = None
+
+
+@fastapi_app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    # Reject oversized uploads from Content-Length before the body is read;
+    # spool_upload() still enforces the limit for chunked requests.
+    length = request.headers.get("content-length")
+    if request.method == "POST" and length and length.isdigit() and int(length) > MAX_AUDIO_BYTES + 64 * 1024:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Request body exceeds {MAX_AUDIO_BYTES // (1024 * 1024)} MB limit."},
+        )
+    return await call_next(request)
+
+
+@fastapi_app.on_event("startup")
+async def start_bank_watcher():
+    if bank_registry is not None:
+        # Load (and index) every bank now, so a broken one is reported at startup.
+        await asyncio.to_thread(bank_registry.refresh_all)
+        bank_registry.start_watcher(float(os.getenv("BANK_RELOAD_INTERVAL", "5")))
+
+
+@fastapi_app.on_event("startup")
+async def start_glossary_build():
+    if glossary is not None and GLOSSARY_AUTOBUILD and os.getenv("DASHSCOPE_API_KEY", "").strip():
+        # Runs in the background; word lookups fall back to the LLM until it lands.
+        glossary.start_build()
+
+
+@fastapi_app.on_event("shutdown")
+async def stop_image_workers():
+    try:
+        from engine.image_jobs import image_jobs
+    except Exception:
+        return
+    await image_jobs.aclose()
+
+
+@fastapi_app.on_event("shutdown")
+async def close_http_pool():
+    if http_client is not None:
+        await http_client.aclose()
+
 
 # -----------------------------------------------------------
 # Request Models
@@ -82,6 +181,15 @@ class PolishRequest(BaseModel):
 class TranslateWordRequest(BaseModel):
     word: str
 
+class TranslateWordsRequest(BaseModel):
+    words: List[str]
+    glossaryOnly: bool = False
+
+class GrammarHintRequest(BaseModel):
+    original: str
+    correction: str
+    explanation: str
+
 class ChatMessage(BaseModel):
     role: str
     content: str
@@ -90,6 +198,7 @@ class ChatCompletionRequest(BaseModel):
     model: str = "myielts-multi-agent"
     messages: List[ChatMessage]
     metadata: Optional[Dict[str, Any]] = None
+    stream: bool = False
 
 class SpeechRequest(BaseModel):
     input: str
@@ -133,21 +242,16 @@ Task:
 4. Return JSON with keys: en, cn, imagePrompt. Do NOT wrap in markdown code fences."""
 
     try:
-        raw = llm_client.chat(
+        raw = await llm_client.achat(
             messages=[
                 {"role": "system", "content": "You are an IELTS speaking coach. Always respond with valid JSON containing keys: en, cn, imagePrompt. Do NOT use markdown code fences."},
                 {"role": "user", "content": prompt},
             ],
             temperature=0.7,
+            # A direct example is kept verbatim, so the reply only depends on the draft.
+            cache="polish_direct" if req.isDirectExample else None,
         )
-        # Strip markdown fences if LLM wraps output in ```json...```
-        cleaned = raw.strip()
-        if cleaned.startswith("```"):
-            import re
-            cleaned = re.sub(r"^```\w*\n?", "", cleaned)
-            cleaned = re.sub(r"\n?```$", "", cleaned)
-            cleaned = cleaned.strip()
-        result = json.loads(cleaned)
+        result = parse_llm_json(raw)
         return {"en": result.get("en", req.draft), "cn": result.get("cn", ""), "imagePrompt": result.get("imagePrompt", "")}
     except json.JSONDecodeError as e:
         print(f"[ERROR] polish JSON parse failed: {e}\nRaw LLM output: {raw[:300]}")
@@ -159,45 +263,109 @@ Task:
 
 @fastapi_app.post("/api/translate_word")
 async def translate_word(req: TranslateWordRequest):
+    if glossary is not None:
+        entry = glossary.lookup(normalize_term(req.word))
+        if entry is not None:
+            return {"translation": entry[0], "emoji": entry[1]}
     if llm_client is None:
         return {"translation": req.word, "emoji": "📝", "error": "LLM 未初始化"}
 
-    prompt = f'Translate the English word/phrase "{req.word}" to Chinese contextually as used in IELTS. Also provide 1 relevant emoji. Return JSON {{ "translation": "...", "emoji": "..." }}'
+    prompt = f'Translate the English word/phrase "{req.word.strip()}" to Chinese contextually as used in IELTS. Also provide 1 relevant emoji. Return JSON {{ "translation": "...", "emoji": "..." }}'
 
     try:
-        raw = llm_client.chat(
+        raw = await llm_client.achat(
             messages=[
                 {"role": "system", "content": "Always respond with valid JSON containing keys: translation, emoji. No markdown fences."},
                 {"role": "user", "content": prompt},
             ],
             temperature=0.3,
+            cache="translate_word",
+            batch="translate_word",
         )
-        cleaned = raw.strip()
-        if cleaned.startswith("```"):
-            import re
-            cleaned = re.sub(r"^```\w*\n?", "", cleaned)
-            cleaned = re.sub(r"\n?```$", "", cleaned)
-            cleaned = cleaned.strip()
-        result = json.loads(cleaned)
+        result = parse_llm_json(raw)
         return {"translation": result.get("translation", ""), "emoji": result.get("emoji", "")}
     except (json.JSONDecodeError, RuntimeError) as e:
         print(f"[WARN] translate_word failed: {e}")
         return {"translation": req.word, "emoji": "📝", "error": f"翻译失败: {e}"}
 
 
+MAX_TRANSLATE_WORDS = 300
+
+
+@fastapi_app.post("/api/translate_words")
+async def translate_words(req: TranslateWordsRequest):
+    """Translate many words at once: glossary hits directly, all misses in one LLM call.
+
+    With ``glossaryOnly`` the misses are just reported (no LLM call), for
+    prefetching words the user may never tap.
+    """
+    if len(req.words) > MAX_TRANSLATE_WORDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_TRANSLATE_WORDS} words per request.")
+    if glossary is None:
+        return {"translations": {}, "missing": req.words, "error": "词表未初始化"}
+
+    found = glossary.known(req.words) if req.glossaryOnly else await glossary.translate(req.words)
+    translations, missing = {}, []
+    for word in req.words:
+        entry = found.get(normalize_term(word))
+        if entry is None:
+            missing.append(word)
+        else:
+            translations[word] = {"translation": entry[0], "emoji": entry[1]}
+    return {"translations": translations, "missing": missing}
+
+
 @fastapi_app.get("/api/question_bank")
 async def api_get_question_bank():
     if rag_module is None:
         return {"error": "RAG 模块未初始化"}
     try:
         questions = rag_module.get_question_context("all")
-        return {"questions": questions}
+        return {"questions": questions, "version": rag_module.question_bank_version()}
     except Exception as e:
         return {"error": f"获取题库出错: {str(e)}"}
 
 
+@fastapi_app.post("/api/grammar-trial/generate-hint")
+async def api_generate_grammar_hint(req: GrammarHintRequest):
+    if generate_grammar_hint is None:
+        return {"chineseHint": "", "contextNote": ""}
+    return await generate_grammar_hint(req.original, req.correction, req.explanation)
+
+
+@fastapi_app.post("/api/grammar-trial/validate")
+async def api_validate_grammar_trial(
+    audio: UploadFile = File(...),
+    correction: str = Form(...),
+    chinese_hint: str = Form(""),
+):
+    if validate_grammar_trial is None:
+        raise HTTPException(status_code=503, detail="语法试炼服务不可用")
+
+    spooled = await _spool_audio(audio)
+    try:
+        prepared, _, rejected = await _prepare_and_gate(spooled)
+        if rejected is not None:
+            # Same shape as a failed attempt, so MistakeNotebook shows the reason.
+            return {"transcription": "", "isCorrect": False, "reason": rejected.message, "code": rejected.code}
+        return await validate_grammar_trial(prepared, correction, chinese_hint)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Grammar trial validation failed: {str(e)}")
+    finally:
+        spooled.close()
+
+
+def _image_prompt(req: ImageRequest) -> str:
+    from engine.image_gen import build_image_prompt
+
+    enhanced_prompt = build_image_prompt(req.prompt, req.words)
+    print(f"[INFO] generate-image: prompt={enhanced_prompt[:100]}...")
+    return enhanced_prompt
+
+
 @fastapi_app.post("/api/generate-image")
 async def api_generate_image(req: ImageRequest):
+    """Blocking form of /api/image-jobs, kept for older clients; runs on the same worker pool."""
     has_prompt = req.prompt and req.prompt.strip()
     has_words = req.words and req.words.strip()
 
@@ -205,33 +373,15 @@ async def api_generate_image(req: ImageRequest):
         return {"url": "", "error": "未提供图片描述或锚点词"}
 
     try:
-        from engine.image_gen import generate_image, ImageGenError
-
-        # Build a prompt that visually represents the selected vocabulary words
-        if has_words:
-            word_list = req.words.strip()
-            if has_prompt:
-                enhanced_prompt = (
-                    f"A photorealistic scene without any text, words, labels, or watermarks. "
-                    f"The scene naturally shows: {word_list}. "
-                    f"Scene context: {req.prompt.strip()}. "
-                    f"Style: high quality photograph, vivid colors, no text overlay, no captions, no annotations."
-                )
-            else:
-                # No scene prompt from LLM, build one purely from anchor words
-                enhanced_prompt = (
-                    f"A photorealistic scene without any text, words, labels, or watermarks. "
-                    f"The scene naturally shows: {word_list}. "
-                    f"Style: high quality photograph, vivid colors, no text overlay, no captions, no annotations."
-                )
-        else:
-            enhanced_prompt = req.prompt.strip() + " No text, no labels, no words in the image."
-
-        print(f"[INFO] generate-image: prompt={enhanced_prompt[:100]}...")
-        url = await generate_image(enhanced_prompt)
-        print(f"[INFO] generate-image: result url={'(empty)' if not url else url[:80]}")
-        return {"url": url}
-    except ImageGenError as e:
+        from engine.image_gen import ImageGenError
+        from engine.image_jobs import JobQueueFull, image_jobs
+
+        job = await image_jobs.wait(image_jobs.submit(_image_prompt(req)), timeout=90)
+        print(f"[INFO] generate-image: job {job.id} {job.status} url={'(empty)' if not job.url else job.url[:80]}")
+        if job.status == "succeeded":
+            return {"url": job.url, "cached": job.cached}
+        return {"url": "", "error": job.error or "图片生成超时，请稍后重试", "job_id": job.id}
+    except (ImageGenError, JobQueueFull) as e:
         print(f"[WARN] Image generation failed: {e}")
         return {"url": "", "error": str(e)}
     except Exception as e:
@@ -240,60 +390,404 @@ async def api_generate_image(req: ImageRequest):
         return {"url": "", "error": f"图片生成异常: {e}"}
 
 
+@fastapi_app.post("/api/image-jobs", status_code=202)
+async def api_submit_image_job(req: ImageRequest):
+    """Queue an image generation job; poll GET /api/image-jobs/{id} or subscribe to .../events."""
+    from engine.image_gen import ImageGenError
+    from engine.image_jobs import JobQueueFull, image_jobs
+
+    if not (req.prompt and req.prompt.strip()) and not (req.words and req.words.strip()):
+        raise HTTPException(status_code=400, detail="未提供图片描述或锚点词")
+    try:
+        job = image_jobs.submit(_image_prompt(req))
+    except ImageGenError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    return JSONResponse(
+        status_code=200 if job.finished else 202,
+        content=job.as_dict(),
+        headers={"Location": f"/api/image-jobs/{job.id}"},
+    )
+
+
+def _get_image_job(job_id: str):
+    from engine.image_jobs import image_jobs
+
+    job = image_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Image job not found or expired")
+    return job
+
+
+@fastapi_app.get("/api/image-jobs/{job_id}")
+async def api_image_job_status(job_id: str):
+    return _get_image_job(job_id).as_dict()
+
+
+@fastapi_app.get("/api/image-jobs/{job_id}/events")
+async def api_image_job_events(job_id: str):
+    """SSE: a "status" event per change until the job finishes, with keep-alives in between."""
+    job = _get_image_job(job_id)
+
+    async def events():
+        last = None
+        while True:
+            if job.status != last:
+                last = job.status
+                yield _sse_event("status", job.as_dict())
+            if job.finished:
+                break
+            if not await job.wait_change(15):
+                yield ": keep-alive\n\n"
+
+    return _sse_response(events())
+
+
+@fastapi_app.get("/media/images/{name}")
+async def media_image(name: str):
+    from engine.image_store import CACHE_CONTROL, CONTENT_TYPES, image_store
+
+    path = await image_store.path(name)
+    try:
+        # FileResponse would stat the file anyway; doing it here turns a file
+        # removed behind the store's back into a 404 instead of a 500.
+        stat = await asyncio.to_thread(os.stat, path) if path is not None else None
+    except OSError:
+        image_store.forget(name)
+        stat = None
+    if stat is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(
+        str(path),
+        media_type=CONTENT_TYPES[name.rsplit(".", 1)[1]],
+        headers={"Cache-Control": CACHE_CONTROL},
+        stat_result=stat,
+    )
+
+
+@fastapi_app.get("/v1/images/cache")
+async def media_image_cache_stats():
+    from engine.image_jobs import image_jobs
+    from engine.image_store import image_store
+
+    return {**image_store.stats(), "jobs": image_jobs.stats()}
+
+
 # -----------------------------------------------------------
 # /v1/* endpoints (used by apiService.ts & TTSProvider.ts)
 # -----------------------------------------------------------
-@fastapi_app.post("/v1/ielts/evaluate")
-async def ielts_evaluate(
-    audio: Optional[UploadFile] = File(None),
-    part: str = Form("P1"),
-    question: str = Form(""),
-    level: str = Form("6.0-6.5"),
-    anchor_words: str = Form("[]"),
-):
+def _check_evaluation_request(audio: Optional[UploadFile], anchor_words: str, mode: str):
     if not audio:
         raise HTTPException(status_code=400, detail="No audio file provided.")
     if camel_engine is None:
         raise HTTPException(status_code=503, detail="AI 引擎未初始化")
 
+    mode = mode.strip().lower() or DEFAULT_EVAL_MODE
+    if mode not in EVAL_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid mode '{mode}'. Use one of {sorted(EVAL_MODES)}.")
+
     try:
         words_list = json.loads(anchor_words)
     except (json.JSONDecodeError, TypeError):
         words_list = []
+    return words_list, mode
+
 
+async def _spool_audio(audio: UploadFile):
+    """Copy the upload in bounded chunks; 413 as soon as it passes the size limit."""
     try:
-        audio_bytes = await audio.read()
-        result = await camel_engine.run_roleplay_evaluation(
-            audio_bytes=audio_bytes,
-            question=question,
-            target_level=level,
-            part=part,
-            anchor_words=words_list,
-        )
-        return {
-            "id": f"chatcmpl-{int(time.time())}",
-            "object": "chat.completion",
-            "created": int(time.time()),
-            "model": "myielts-multi-agent",
-            "choices": [{
-                "index": 0,
-                "message": {
-                    "role": "assistant",
-                    "content": result["feedback"],
-                    "metadata": {
-                        "transcription": result["transcription"],
-                        "scores": result["scores"],
-                        "agent_thoughts": result["agent_thoughts"],
-                        "xp_reward": result["xpReward"],
-                        "pronunciation_feedback": result.get("pronunciation_feedback", []),
-                        "detected_errors": result.get("detected_errors", []),
-                    },
+        return await spool_upload(audio)
+    except AudioTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+
+async def _prepare_and_gate(spooled):
+    """Decode/resample the upload once and reject unusable recordings before any upstream call.
+
+    Returns ``(prepared, quality, rejected)``; ``rejected`` is the
+    AudioRejected reason, or None.
+    """
+    if prepare_for_asr is None:
+        return spooled.open(), None, None
+    prepared = await asyncio.to_thread(prepare_for_asr, spooled.open())
+    try:
+        quality = check_audio(prepared)
+    except AudioRejected as e:
+        print(f"[INFO] audio gate: rejected ({e.code})")
+        return prepared, None, e
+    return prepared, quality, None
+
+
+def _rejection_response(rejected) -> JSONResponse:
+    return JSONResponse(status_code=422, content={"detail": rejected.message, **rejected.to_dict()})
+
+
+def _evaluation_response(result: Dict[str, Any], mode: str, quality=None) -> Dict[str, Any]:
+    return {
+        "id": f"chatcmpl-{int(time.time())}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "myielts-multi-agent",
+        "choices": [{
+            "index": 0,
+            "message": {
+                "role": "assistant",
+                "content": result["feedback"],
+                "metadata": {
+                    "transcription": result["transcription"],
+                    "scores": result["scores"],
+                    "agent_thoughts": result["agent_thoughts"],
+                    "xp_reward": result["xpReward"],
+                    "pronunciation_feedback": result.get("pronunciation_feedback", []),
+                    "fluency_metrics": result.get("fluency_metrics"),
+                    "detected_errors": result.get("detected_errors", []),
+                    "stage_timings_ms": result.get("stage_timings_ms", {}),
+                    "mode": result.get("mode", mode),
+                    "audio_quality": quality.as_dict() if quality else None,
                 },
-                "finish_reason": "stop",
-            }],
-        }
+            },
+            "finish_reason": "stop",
+        }],
+    }
+
+
+# Duplicate evaluations (client retries, re-submitted takes) share one run.
+evaluation_requests = IdempotentRunner()
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+def _evaluation_key(request: Request, spooled, question: str, level: str, part: str, mode: str, words_list):
+    """``Idempotency-Key`` header if sent, else a hash of the audio and form fields."""
+    return request_key(
+        "evaluate", request.headers.get("Idempotency-Key"),
+        spooled.sha256, question, level, part, mode, json.dumps(words_list, ensure_ascii=False),
+    )
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _sse_response(events, headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(headers or {})},
+    )
+
+
+@fastapi_app.post("/v1/ielts/evaluate")
+async def ielts_evaluate(
+    request: Request,
+    audio: Optional[UploadFile] = File(None),
+    part: str = Form("P1"),
+    question: str = Form(""),
+    level: str = Form("6.0-6.5"),
+    anchor_words: str = Form("[]"),
+    mode: str = Form(""),
+):
+    words_list, mode = _check_evaluation_request(audio, anchor_words, mode)
+    spooled = await _spool_audio(audio)
+    key, fingerprint = _evaluation_key(request, spooled, question, level, part, mode, words_list)
+    # Once the evaluation task starts it owns (and closes) the spooled upload.
+    started = False
+
+    try:
+        # Decoding is part of the run, so a duplicate that arrives meanwhile
+        # joins it instead of decoding the same audio again.
+        async def evaluate():
+            try:
+                prepared, quality, rejected = await _prepare_and_gate(spooled)
+                if rejected is not None:
+                    raise rejected
+                result = await camel_engine.run_roleplay_evaluation(
+                    audio=prepared,
+                    question=question,
+                    target_level=level,
+                    part=part,
+                    anchor_words=words_list,
+                    mode=mode,
+                )
+                return _evaluation_response(result, mode, quality)
+            finally:
+                spooled.close()
+
+        def start():
+            nonlocal started
+            started = True
+            return evaluate()
+
+        body, source = await evaluation_requests.run(key, fingerprint, start)
+        if source != "executed":
+            return JSONResponse(body, headers={REPLAY_HEADER: "true"})
+        return body
+    except AudioRejected as e:
+        return _rejection_response(e)
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if not started:
+            spooled.close()
+
+
+@fastapi_app.post("/v1/ielts/evaluate/stream")
+async def ielts_evaluate_stream(
+    request: Request,
+    audio: Optional[UploadFile] = File(None),
+    part: str = Form("P1"),
+    question: str = Form(""),
+    level: str = Form("6.0-6.5"),
+    anchor_words: str = Form("[]"),
+    mode: str = Form(""),
+):
+    """Server-sent events version of /v1/ielts/evaluate.
+
+    Emits "thought", "transcription", "pronunciation" and "stage" events
+    while the pipeline runs, then a "result" event carrying the same body
+    the non-streaming endpoint returns (or an "error" event). A duplicate
+    of a running or recently finished evaluation only gets the "result".
+    """
+    words_list, mode = _check_evaluation_request(audio, anchor_words, mode)
+    spooled = await _spool_audio(audio)
+    key, fingerprint = _evaluation_key(request, spooled, question, level, part, mode, words_list)
+    try:
+        replayed = evaluation_requests.replay(key, fingerprint)
+        joined = None if replayed is not None else evaluation_requests.attach(key, fingerprint)
+    except IdempotencyConflict as e:
+        spooled.close()
+        raise HTTPException(status_code=422, detail=str(e))
+    if replayed is not None:
+        spooled.close()
+
+        async def replay_events():
+            yield _sse_event("result", replayed)
+
+        return _sse_response(replay_events(), headers={REPLAY_HEADER: "true"})
+    if joined is not None:
+        # Duplicate of a running evaluation: wait for its result without decoding the audio again.
+        spooled.close()
+
+        async def joined_events():
+            try:
+                yield _sse_event("result", await joined)
+            except Exception as e:
+                yield _sse_event("error", {"detail": str(e)})
+
+        return _sse_response(joined_events(), headers={REPLAY_HEADER: "true"})
+
+    queue: asyncio.Queue = asyncio.Queue()
+    started = False
+    # Resolved with the AudioRejected reason (or None) once the audio is decoded.
+    gate: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def emit(event: str, data: Dict[str, Any]) -> None:
+        queue.put_nowait((event, data))
+
+    async def evaluate():
+        try:
+            prepared, quality, rejected = await _prepare_and_gate(spooled)
+            gate.set_result(rejected)
+            if rejected is not None:
+                raise rejected
+            result = await camel_engine.run_roleplay_evaluation(
+                audio=prepared,
+                question=question,
+                target_level=level,
+                part=part,
+                anchor_words=words_list,
+                mode=mode,
+                on_event=emit,
+            )
+            return _evaluation_response(result, mode, quality)
+        finally:
+            spooled.close()
+            if not gate.done():
+                gate.set_result(None)
+
+    def start():
+        nonlocal started
+        started = True
+        return evaluate()
+
+    async def run():
+        try:
+            body, _ = await evaluation_requests.run(key, fingerprint, start)
+            emit("result", body)
+        except Exception as e:
+            emit("error", {"detail": str(e)})
+        finally:
+            if not started:
+                spooled.close()
+            queue.put_nowait(None)
+
+    task = asyncio.create_task(run())
+    # Report an unusable recording as a plain 422 before the stream starts. A
+    # request that ends up joining another run never resolves the gate.
+    await asyncio.wait({gate, task}, return_when=asyncio.FIRST_COMPLETED)
+    if gate.done() and gate.result() is not None:
+        return _rejection_response(gate.result())
+
+    async def events():
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield _sse_event(*item)
+        finally:
+            # Client went away: stop waiting. The evaluation itself keeps
+            # running so a retry can pick up its result.
+            task.cancel()
+
+    return _sse_response(events())
+
+
+async def _stream_free_chat(messages: List[Dict[str, str]], last_user_message: str):
+    if llm_client is None:
+        yield f"LLM 不可用\n{last_user_message or ''}"
+        return
+
+    started = False
+    try:
+        async for delta in llm_client.astream_chat(messages=messages):
+            started = True
+            yield delta
+    except RuntimeError as e:
+        if started:
+            print(f"[WARN] chat stream interrupted: {e}")
+        else:
+            yield f"LLM 调用失败\n{last_user_message or ''}"
+
+
+def _sse_chat_response(deltas) -> StreamingResponse:
+    """Wrap content deltas as OpenAI-style chat.completion.chunk events."""
+    created = int(time.time())
+    base = {
+        "id": f"chatcmpl-{created}",
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": os.getenv("DASHSCOPE_MODEL", "qwen-plus"),
+    }
+
+    def event(delta: Dict[str, str], finish_reason: Optional[str] = None) -> str:
+        chunk = {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+        return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+    async def events():
+        yield event({"role": "assistant"})
+        async for delta in deltas:
+            yield event({"content": delta})
+        yield event({}, "stop")
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @fastapi_app.post("/v1/chat/completions")
@@ -305,6 +799,7 @@ async def chat_completions(payload: ChatCompletionRequest):
             break
 
     metadata = payload.metadata or {}
+    messages = [{"role": m.role, "content": m.content} for m in payload.messages]
 
     if metadata.get("task") == "p1_answer":
         band = str(metadata.get("band", "")).strip()
@@ -314,15 +809,17 @@ async def chat_completions(payload: ChatCompletionRequest):
         if not question:
             raise HTTPException(status_code=400, detail="Missing question.")
         profile = metadata.get("profile") or {}
-        content = generate_p1_answer(question=question, band=band, profile=profile)
+        if payload.stream:
+            return _sse_chat_response(stream_p1_answer(question=question, band=band, profile=profile))
+        content = await generate_p1_answer(question=question, band=band, profile=profile)
+    elif payload.stream:
+        return _sse_chat_response(_stream_free_chat(messages, last_user_message))
     else:
         if llm_client is None:
             content = f"LLM 不可用\n{last_user_message or ''}"
         else:
             try:
-                content = llm_client.chat(
-                    messages=[{"role": m.role, "content": m.content} for m in payload.messages]
-                )
+                content = await llm_client.achat(messages=messages)
             except RuntimeError:
                 content = f"LLM 调用失败\n{last_user_message or ''}"
 
@@ -340,13 +837,31 @@ async def chat_completions(payload: ChatCompletionRequest):
 
 
 @fastapi_app.post("/v1/audio/speech")
-async def audio_speech(payload: SpeechRequest):
+async def audio_speech(payload: SpeechRequest, request: Request):
     text = payload.input.strip()
     if not text:
         raise HTTPException(status_code=400, detail="Field 'input' cannot be empty.")
 
     try:
-        audio_bytes, content_type = synthesize_speech(
+        if tts_cache is not None:
+            cached = await tts_cache.get_or_synthesize(
+                text=text,
+                voice=payload.voice,
+                audio_format=payload.format,
+                model=payload.model,
+            )
+            headers = {
+                "ETag": cached.etag,
+                "Cache-Control": CACHE_CONTROL,
+                "X-Cache": "MISS" if cached.source == "miss" else f"HIT-{cached.source.upper()}",
+            }
+            if request.headers.get("if-none-match") == cached.etag:
+                return Response(status_code=304, headers=headers)
+            if cached.path is not None:
+                return FileResponse(str(cached.path), media_type=cached.content_type, headers=headers)
+            return Response(content=cached.content, media_type=cached.content_type, headers=headers)
+
+        audio_bytes, content_type = await asynthesize_speech(
             text=text,
             voice=payload.voice,
             audio_format=payload.format,
@@ -364,6 +879,41 @@ async def audio_speech(payload: SpeechRequest):
     return Response(content=audio_bytes, media_type=content_type)
 
 
+@fastapi_app.get("/v1/audio/speech/cache")
+async def audio_speech_cache_stats():
+    if tts_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **tts_cache.stats()}
+
+
+@fastapi_app.get("/v1/audio/transcriptions/cache")
+async def audio_transcription_cache_stats():
+    if transcript_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **transcript_cache.stats()}
+
+
+@fastapi_app.get("/v1/llm/cache")
+async def llm_cache_stats():
+    if llm_client is None:
+        return {"enabled": False}
+    return llm_client.llm_cache.stats()
+
+
+@fastapi_app.get("/v1/llm/batches")
+async def llm_batch_stats():
+    if llm_client is None:
+        return {"enabled": False}
+    return llm_client.llm_batcher.stats()
+
+
+@fastapi_app.get("/v1/glossary/cache")
+async def glossary_cache_stats():
+    if glossary is None:
+        return {"enabled": False}
+    return {"enabled": True, **glossary.stats()}
+
+
 # -----------------------------------------------------------
 # Static frontend (dist/)
 # -----------------------------------------------------------
@@ -6,6 +6,7 @@ from __future__ import annotations
 import argparse
 import json
 import re
+import sys
 from pathlib import Path
 from typing import Iterable
 
@@ -55,6 +56,10 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Build Part1 question bank JSON from PDF")
     parser.add_argument("--input", required=True, help="Path to source PDF")
     parser.add_argument("--output", required=True, help="Path to output JSON")
+    parser.add_argument(
+        "--binary-output",
+        help="Optional path for the memory-mapped .p1b bank (serve it via P1_BANK_PATH)",
+    )
     return parser.parse_args()
 
 
@@ -268,6 +273,16 @@ def ensure_minimum_records(records: Iterable[dict], minimum: int = 50) -> list[d
     return out
 
 
+def load_binary_writer():
+    # engine/ lives at the repo root, two levels above backend/scripts/.
+    repo_root = Path(__file__).resolve().parents[2]
+    if str(repo_root) not in sys.path:
+        sys.path.insert(0, str(repo_root))
+    from engine.p1_binary import write_binary_bank
+
+    return write_binary_bank
+
+
 def main() -> None:
     args = parse_args()
     input_path = Path(args.input)
@@ -282,6 +297,13 @@ def main() -> None:
     output_path.write_text(json.dumps(records, ensure_ascii=False, indent=2), encoding="utf-8")
     print(f"Wrote {len(records)} records to {output_path}")
 
+    if args.binary_output:
+        write_binary_bank = load_binary_writer()
+        binary_path = Path(args.binary_output)
+        binary_path.parent.mkdir(parents=True, exist_ok=True)
+        version = write_binary_bank(records, binary_path)
+        print(f"Wrote binary bank {binary_path} (version {version})")
+
 
 if __name__ == "__main__":
     main()
@@ -134,18 +134,20 @@ const MockTest: React.FC<MockTestProps> = ({ onComplete, onCancel, profile }) =>
     setStage('analysis');
     setThoughts([{ agent: 'SYSTEM', text: 'Initializing Agentic Analysis...', time: new Date().toLocaleTimeString() }]);
     
-    const result = await callIELTSAgent(blob, `Part ${currentPart}`, currentQuestionText, profile.currentLevel);
-    
-    for (let i = 0; i < result.agent_thoughts.length; i++) {
-      const t = result.agent_thoughts[i];
-      let currentAgent = 'SYSTEM';
-      if (t.includes("Critic")) currentAgent = 'CRITIC';
-      else if (t.includes("Examiner")) currentAgent = 'EXAMINER';
-      else if (t.includes("GM")) currentAgent = 'GM';
+    const agentOf = (t: string) => {
+      if (t.includes("Critic")) return 'CRITIC';
+      if (t.includes("Examiner")) return 'EXAMINER';
+      if (t.includes("GM")) return 'GM';
+      return 'SYSTEM';
+    };
+
+    // Thoughts arrive live while the Examiner/Critic/GM stages are still running.
+    const result = await callIELTSAgent(blob, `Part ${currentPart}`, currentQuestionText, profile.currentLevel, [], undefined, (event) => {
+      if (event.type !== 'thought') return;
+      const currentAgent = agentOf(event.text);
       setAgentContext(prev => ({ ...prev, activeAgent: currentAgent }));
-      await new Promise(r => setTimeout(r, 600));
-      setThoughts(prev => [...prev, { agent: currentAgent, text: t, time: new Date().toLocaleTimeString() }]);
-    }
+      setThoughts(prev => [...prev, { agent: currentAgent, text: event.text, time: new Date().toLocaleTimeString() }]);
+    });
 
     setRadarData(result.scores);
     setFinalFeedback(result.feedback);
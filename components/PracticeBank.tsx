@@ -2,7 +2,7 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { INITIAL_QUESTIONS, MATERIAL_ARCHETYPES } from '../constants';
 import { PracticeQuestion, UserProfile, MaterialArchetype, GoldenPhrase, SpeakingError } from '../types';
-import { callIELTSAgent, speakWithAliyun, PronunciationItem } from '../services/apiService';
+import { callIELTSAgent, generateSceneImage, speakWithAliyun, translateWords, PronunciationItem, WordTranslation } from '../services/apiService';
 
 interface FeedbackToken {
   text: string;
@@ -43,6 +43,8 @@ const PracticeBank: React.FC<PracticeBankProps> = ({ profile, setProfile, onNewA
   const audioStreamRef = useRef<MediaStream | null>(null);
   const mediaRecorderRef = useRef<MediaRecorder | null>(null);
   const audioChunksRef = useRef<Blob[]>([]);
+  // Translations of the reviewed answer's words, fetched in one batch so a tap needs no round trip.
+  const wordTranslationsRef = useRef<Record<string, WordTranslation>>({});
 
   useEffect(() => {
     setCurrentStep('technique');
@@ -62,6 +64,22 @@ const PracticeBank: React.FC<PracticeBankProps> = ({ profile, setProfile, onNewA
     if (!isChallengeActive) setImageError('');
   }, [isChallengeActive]);
 
+  useEffect(() => {
+    const answer = currentStep === 'review' ? selectedQuestion?.answerEn : '';
+    if (!answer) return;
+    const known = wordTranslationsRef.current;
+    const words = Array.from(new Set(
+      answer.split(/\s+/).map(w => w.replace(/[.,!?;:]/g, '').toLowerCase()).filter(w => w && !known[w])
+    ));
+    if (words.length === 0) return;
+    // Glossary hits only: a word the user actually taps falls back to /api/translate_word.
+    translateWords(words.slice(0, 300), true)
+      .then(found => {
+        for (const [word, entry] of Object.entries(found)) known[word.toLowerCase()] = entry;
+      })
+      .catch(e => console.error(e));
+  }, [currentStep, selectedQuestion]);
+
   const speak = async (text: string) => {
     if (isSpeaking) return;
     setIsSpeaking(true);
@@ -145,6 +163,11 @@ const PracticeBank: React.FC<PracticeBankProps> = ({ profile, setProfile, onNewA
     speak(word);
     if (selectedPhrases.find(p => p.phrase.toLowerCase() === word.toLowerCase())) return;
 
+    const known = wordTranslationsRef.current[word.toLowerCase()];
+    if (known) {
+      setSelectedPhrases(prev => [...prev, { phrase: word, translation: known.translation, emoji: known.emoji || '📝' }]);
+      return;
+    }
     try {
       const resp = await fetch('/api/translate_word', {
         method: 'POST',
@@ -191,15 +214,7 @@ const PracticeBank: React.FC<PracticeBankProps> = ({ profile, setProfile, onNewA
       setImageError('');
       const words = selectedPhrases.map(sp => sp.phrase).join(', ');
       console.log('[ImageGen] triggering:', { savedImagePrompt: savedImagePrompt?.slice(0, 60), words });
-      fetch('/api/generate-image', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ prompt: savedImagePrompt, words }),
-      })
-        .then(r => {
-          if (!r.ok) throw new Error(`HTTP ${r.status} ${r.statusText}`);
-          return r.json();
-        })
+      generateSceneImage(savedImagePrompt || '', words)
         .then(data => {
           console.log('[ImageGen] response:', data);
           if (data.url) {
@@ -255,7 +270,7 @@ const PracticeBank: React.FC<PracticeBankProps> = ({ profile, setProfile, onNewA
     setIsAnalyzing(true);
     try {
       const anchorWords = selectedPhrases.map(p => p.phrase);
-      const result = await callIELTSAgent(audioBlob, activeTab, selectedQuestion?.questionEn || '', profile.currentLevel, anchorWords);
+      const result = await callIELTSAgent(audioBlob, activeTab, selectedQuestion?.questionEn || '', profile.currentLevel, anchorWords, 'fast');
       
       for (const t of result.agent_thoughts) {
         await new Promise(r => setTimeout(r, 600));
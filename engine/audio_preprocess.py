@@ -0,0 +1,197 @@
+"""Local audio preprocessing before ASR upload.
+
+Browser recordings arrive as whatever MediaRecorder produced (often 44.1/48
+kHz stereo with long silences) and used to be uploaded byte-for-byte as
+``audio/wav``. ``prepare_for_asr`` decodes the upload with soundfile,
+downmixes to mono, resamples to 16 kHz, trims leading/trailing silence and
+re-encodes as FLAC (or 16-bit WAV), which is all SenseVoice needs.
+Decoding and resampling run block by block straight from the (spooled)
+upload, so only the 16 kHz mono signal is ever held in memory.
+
+Containers libsndfile cannot decode (WebM/MP4 from Chrome/Safari) are sent
+unchanged, but with a MIME type sniffed from their magic bytes instead of a
+blanket ``audio/wav``.
+"""
+import io
+import os
+from dataclasses import dataclass
+from math import gcd
+from typing import BinaryIO, Optional, Union
+
+import numpy as np
+
+ENABLED = os.getenv("AUDIO_PREPROCESS", "1").strip() != "0"
+TARGET_RATE = 16000
+# "flac" (lossless, smallest) or "wav"
+OUTPUT_FORMAT = os.getenv("ASR_AUDIO_FORMAT", "flac").strip().lower()
+# Frames quieter than this (dB relative to the loudest frame) count as silence.
+SILENCE_DB = float(os.getenv("AUDIO_SILENCE_DB", "-40"))
+SILENCE_FLOOR = 1e-4
+SILENCE_PAD_MS = 200
+FRAME_MS = 20
+BLOCK_SECONDS = 10
+# Source samples at or above this magnitude count as clipped.
+CLIP_LEVEL = 0.999
+
+_FORMATS = {"flac": ("FLAC", "audio/flac"), "wav": ("WAV", "audio/wav")}
+
+
+@dataclass
+class PreparedAudio:
+    # Re-encoded bytes, or the original upload file when sent unchanged.
+    data: Union[bytes, BinaryIO]
+    mime: str
+    original_bytes: int
+    processed: bool
+    # Decoded 16 kHz mono samples, when decoding succeeded.
+    samples: Optional[np.ndarray] = None
+    sample_rate: int = TARGET_RATE
+    original_duration_s: Optional[float] = None
+    # Share of source samples at full scale, measured before resampling.
+    clipping_ratio: float = 0.0
+
+    @property
+    def duration_s(self) -> Optional[float]:
+        if self.samples is None:
+            return None
+        return len(self.samples) / self.sample_rate
+
+    @property
+    def size(self) -> int:
+        return len(self.data) if isinstance(self.data, bytes) else self.original_bytes
+
+    def open(self) -> BinaryIO:
+        """The payload as a file object positioned at the start."""
+        if isinstance(self.data, bytes):
+            return io.BytesIO(self.data)
+        self.data.seek(0)
+        return self.data
+
+
+def sniff_mime(data: bytes) -> str:
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "audio/wav"
+    if data[:4] == b"fLaC":
+        return "audio/flac"
+    if data[:4] == b"OggS":
+        return "audio/ogg"
+    if data[:4] == b"\x1a\x45\xdf\xa3":
+        return "audio/webm"
+    if data[4:8] == b"ftyp":
+        return "audio/mp4"
+    if data[:3] == b"ID3" or (len(data) > 1 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0):
+        return "audio/mpeg"
+    return "application/octet-stream"
+
+
+def resample(samples: np.ndarray, rate: int, target: int = TARGET_RATE) -> np.ndarray:
+    if rate == target or len(samples) == 0:
+        return samples
+    from scipy.signal import resample_poly
+
+    g = gcd(rate, target)
+    return resample_poly(samples, target // g, rate // g).astype(np.float32)
+
+
+def decode_audio(source: BinaryIO):
+    """Decode to 16 kHz float32 mono.
+
+    Returns ``(samples, source_rate, source_frames, clipping_ratio)``.
+
+    Blocks are aligned so each maps to a whole number of output samples and
+    are read with enough overlap to cover the resampling filter, so the
+    result matches resampling the whole signal at once. Raises if
+    libsndfile cannot decode the container.
+    """
+    import soundfile as sf
+
+    with sf.SoundFile(source) as f:
+        rate, frames = f.samplerate, f.frames
+        g = gcd(rate, TARGET_RATE)
+        up, down = TARGET_RATE // g, rate // g
+        block = down * max(1, rate * BLOCK_SECONDS // down)
+        # resample_poly's filter spans 10 * max(up, down) upsampled samples per side.
+        pad = down * (10 * max(up, down) // (up * down) + 2) if rate != TARGET_RATE else 0
+
+        out = []
+        clipped = 0
+        for start in range(0, frames, block):
+            lo, hi = max(0, start - pad), min(frames, start + block + pad)
+            end = min(start + block, frames)
+            f.seek(lo)
+            raw = f.read(hi - lo, dtype="float32", always_2d=True)
+            clipped += int(np.count_nonzero(np.abs(raw[start - lo:end - lo]) >= CLIP_LEVEL))
+            resampled = resample(raw.mean(axis=1), rate)
+            skip = (start - lo) * up // down
+            keep = -(-(end - start) * up // down)
+            out.append(resampled[skip:skip + keep])
+        channels = f.channels
+
+    samples = np.concatenate(out).astype(np.float32) if out else np.zeros(0, np.float32)
+    clipping_ratio = clipped / (frames * channels) if frames else 0.0
+    return samples, rate, frames, clipping_ratio
+
+
+def trim_silence(samples: np.ndarray, rate: int = TARGET_RATE) -> np.ndarray:
+    """Cut leading/trailing frames below SILENCE_DB, keeping a short pad."""
+    frame = max(1, rate * FRAME_MS // 1000)
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return samples
+    frames = samples[: n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    threshold = max(float(rms.max()) * 10 ** (SILENCE_DB / 20), SILENCE_FLOOR)
+    voiced = np.flatnonzero(rms > threshold)
+    if len(voiced) == 0:
+        return samples
+    pad = rate * SILENCE_PAD_MS // 1000
+    start = max(0, voiced[0] * frame - pad)
+    end = min(len(samples), (voiced[-1] + 1) * frame + pad)
+    return samples[start:end]
+
+
+def encode_audio(samples: np.ndarray, rate: int = TARGET_RATE, fmt: str = OUTPUT_FORMAT):
+    import soundfile as sf
+
+    sf_format, mime = _FORMATS.get(fmt, _FORMATS["flac"])
+    buf = io.BytesIO()
+    sf.write(buf, np.clip(samples, -1.0, 1.0), rate, format=sf_format, subtype="PCM_16")
+    return buf.getvalue(), mime
+
+
+def prepare_for_asr(audio: Union[bytes, BinaryIO]) -> PreparedAudio:
+    """Shrink an uploaded recording for ASR; never fails, falls back to the raw upload."""
+    source = io.BytesIO(audio) if isinstance(audio, bytes) else audio
+    source.seek(0, os.SEEK_END)
+    original_bytes = source.tell()
+    source.seek(0)
+    mime = sniff_mime(source.read(12))
+    source.seek(0)
+    if not ENABLED:
+        return PreparedAudio(source, mime, original_bytes, processed=False)
+
+    try:
+        samples, rate, frames, clipping_ratio = decode_audio(source)
+    except Exception as e:
+        print(f"[INFO] audio_preprocess: sending {original_bytes} bytes of {mime} as-is ({str(e)[:80]})")
+        return PreparedAudio(source, mime, original_bytes, processed=False)
+
+    original_duration = frames / rate if rate else 0.0
+    samples = trim_silence(samples)
+    encoded, encoded_mime = encode_audio(samples)
+
+    prepared = PreparedAudio(
+        encoded, encoded_mime, original_bytes, processed=True,
+        samples=samples, original_duration_s=original_duration, clipping_ratio=clipping_ratio,
+    )
+    if len(encoded) >= original_bytes:
+        # Already compact (e.g. Ogg/Opus): keep the original payload.
+        prepared.data, prepared.mime, prepared.processed = source, mime, False
+
+    saved = original_bytes - prepared.size
+    print(
+        f"[INFO] audio_preprocess: {original_bytes} -> {prepared.size} bytes "
+        f"({saved * 100 // max(original_bytes, 1)}% saved), "
+        f"{original_duration:.1f}s -> {prepared.duration_s:.1f}s @ {rate}->{TARGET_RATE} Hz"
+    )
+    return prepared
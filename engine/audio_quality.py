@@ -0,0 +1,119 @@
+"""Energy-based voice activity and quality gate for recordings.
+
+Runs on the 16 kHz mono signal ``audio_preprocess`` already decoded, so it
+costs a few NumPy passes and no extra decode. Silent, clipped or tiny
+recordings (accidental taps) are rejected with a structured reason before
+any ASR or LLM call is paid for.
+"""
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .audio_preprocess import PreparedAudio
+
+MIN_DURATION_S = float(os.getenv("VAD_MIN_DURATION_S", "0.5"))
+MIN_SPEECH_S = float(os.getenv("VAD_MIN_SPEECH_S", "0.6"))
+MIN_SPEECH_DBFS = float(os.getenv("VAD_MIN_SPEECH_DBFS", "-45"))
+MAX_CLIPPING_RATIO = float(os.getenv("VAD_MAX_CLIPPING_RATIO", "0.02"))
+# Undecodable containers (WebM/MP4) only get a byte-size sanity check.
+MIN_UNDECODED_BYTES = int(os.getenv("VAD_MIN_UNDECODED_BYTES", "1000"))
+
+FRAME_MS = 30
+# A frame is speech when it is this far above the noise floor (10th
+# percentile frame), or loud enough outright (recordings with no pauses).
+SPEECH_OVER_NOISE_DB = 10.0
+LOUD_FRAME_DBFS = -25.0
+_EPS = 1e-10
+
+
+@dataclass
+class AudioQuality:
+    duration_s: float
+    speech_s: float
+    speech_ratio: float
+    rms_dbfs: float
+    peak_dbfs: float
+    noise_dbfs: float
+    clipping_ratio: float
+
+    def as_dict(self) -> Dict[str, float]:
+        return {k: round(v, 4) for k, v in asdict(self).items()}
+
+
+class AudioRejected(Exception):
+    """Recording is unusable; ``code`` is machine-readable, ``message`` is shown to the student."""
+
+    def __init__(self, code: str, message: str, quality: Optional[AudioQuality] = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.quality = quality
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "code": self.code,
+            "message": self.message,
+            "quality": self.quality.as_dict() if self.quality else None,
+        }
+
+
+def _dbfs(value: float) -> float:
+    return float(20 * np.log10(max(value, _EPS)))
+
+
+def frame_rms(samples: np.ndarray, rate: int) -> Tuple[np.ndarray, int]:
+    """RMS of consecutive FRAME_MS frames, and the frame length in samples."""
+    frame = max(1, rate * FRAME_MS // 1000)
+    n_frames = len(samples) // frame
+    frames = samples[: n_frames * frame].reshape(n_frames, frame)
+    return np.sqrt(np.mean(frames * frames, axis=1)), frame
+
+
+def speech_mask(rms: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Per-frame speech flags and the noise floor they were measured against."""
+    noise = float(np.percentile(rms, 10))
+    threshold = max(
+        min(noise * 10 ** (SPEECH_OVER_NOISE_DB / 20), 10 ** (LOUD_FRAME_DBFS / 20)),
+        10 ** (MIN_SPEECH_DBFS / 20),
+    )
+    return rms > threshold, noise
+
+
+def analyze(samples: np.ndarray, rate: int, clipping_ratio: float = 0.0) -> AudioQuality:
+    duration = len(samples) / rate if rate else 0.0
+    rms, frame = frame_rms(samples, rate)
+    if len(rms) == 0:
+        return AudioQuality(duration, 0.0, 0.0, _dbfs(0.0), _dbfs(0.0), _dbfs(0.0), clipping_ratio)
+
+    energy = rms * rms
+    speech, noise = speech_mask(rms)
+    speech_energy = energy[speech] if speech.any() else energy
+
+    return AudioQuality(
+        duration_s=duration,
+        speech_s=float(speech.sum()) * frame / rate,
+        speech_ratio=float(speech.mean()),
+        rms_dbfs=_dbfs(float(np.sqrt(speech_energy.mean()))),
+        peak_dbfs=_dbfs(float(np.abs(samples).max())),
+        noise_dbfs=_dbfs(noise),
+        clipping_ratio=clipping_ratio,
+    )
+
+
+def check_audio(prepared: PreparedAudio) -> Optional[AudioQuality]:
+    """Raise AudioRejected for unusable recordings; returns the metrics (None if undecodable)."""
+    if prepared.samples is None:
+        if prepared.original_bytes < MIN_UNDECODED_BYTES:
+            raise AudioRejected("too_short", "录音太短，请按住录音键完整作答后再提交。")
+        return None
+
+    quality = analyze(prepared.samples, prepared.sample_rate, prepared.clipping_ratio)
+    if quality.duration_s < MIN_DURATION_S:
+        raise AudioRejected("too_short", "录音太短，请按住录音键完整作答后再提交。", quality)
+    if quality.clipping_ratio > MAX_CLIPPING_RATIO:
+        raise AudioRejected("clipped", "录音音量过大出现削波失真，请远离麦克风或调低输入音量后重试。", quality)
+    if quality.speech_s < MIN_SPEECH_S:
+        raise AudioRejected("no_speech", "未检测到有效语音，请靠近麦克风重新录制。", quality)
+    return quality
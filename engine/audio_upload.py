@@ -0,0 +1,112 @@
+"""Bounded-memory handling of uploaded recordings.
+
+``spool_upload`` copies a multipart upload in fixed-size chunks into a
+spooled temporary file (kept in memory only while small), enforcing the
+size limit as bytes arrive and hashing on the way. ``data_uri_json_body``
+then streams a JSON request body with the audio embedded as a base64 data
+URI, encoding one chunk at a time, so a long Part 2 recording is never
+held as raw bytes + base64 bytes + str + data URI + JSON copies at once.
+"""
+import base64
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, AsyncIterator, BinaryIO, Optional, Tuple
+
+MAX_AUDIO_BYTES = int(float(os.getenv("MAX_AUDIO_UPLOAD_MB", "25")) * 1024 * 1024)
+CHUNK_SIZE = 64 * 1024
+# Multiple of 3 so every base64 chunk encodes without padding.
+B64_CHUNK_SIZE = 3 * 16 * 1024
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+AUDIO_PLACEHOLDER = "@@AUDIO_DATA_URI@@"
+
+
+class AudioTooLarge(ValueError):
+    pass
+
+
+class SpooledAudio:
+    """An uploaded recording spooled to a temporary file, plus its size and sha256."""
+
+    def __init__(self, file: BinaryIO, size: int, sha256: str):
+        self.file = file
+        self.size = size
+        self.sha256 = sha256
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SpooledAudio":
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+        spool.write(data)
+        return cls(spool, len(data), hashlib.sha256(data).hexdigest())
+
+    def open(self) -> BinaryIO:
+        """The underlying file, rewound to the start."""
+        self.file.seek(0)
+        return self.file
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "SpooledAudio":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+async def spool_upload(upload: Any, max_bytes: int = MAX_AUDIO_BYTES) -> SpooledAudio:
+    """Copy an ``UploadFile`` chunk by chunk; raises AudioTooLarge past ``max_bytes``."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise AudioTooLarge(f"Audio upload exceeds {max_bytes // (1024 * 1024)} MB limit.")
+            digest.update(chunk)
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    return SpooledAudio(spool, size, digest.hexdigest())
+
+
+def file_size(source: BinaryIO) -> int:
+    source.seek(0, os.SEEK_END)
+    size = source.tell()
+    source.seek(0)
+    return size
+
+
+def data_uri_json_body(
+    payload: Any, mime: str, source: BinaryIO, size: Optional[int] = None,
+) -> Tuple[AsyncIterator[bytes], int]:
+    """Stream ``payload`` as JSON with AUDIO_PLACEHOLDER replaced by a base64 data URI of ``source``.
+
+    Returns ``(chunks, content_length)``; the length is exact, so the body
+    is sent with a Content-Length header rather than chunked encoding.
+    """
+    if size is None:
+        size = file_size(source)
+    head, tail = json.dumps(payload, ensure_ascii=False).split(AUDIO_PLACEHOLDER, 1)
+    head_bytes = f"{head}data:{mime};base64,".encode("utf-8")
+    tail_bytes = tail.encode("utf-8")
+    length = len(head_bytes) + 4 * ((size + 2) // 3) + len(tail_bytes)
+
+    async def chunks() -> AsyncIterator[bytes]:
+        source.seek(0)
+        yield head_bytes
+        while True:
+            block = source.read(B64_CHUNK_SIZE)
+            if not block:
+                break
+            yield base64.b64encode(block)
+        yield tail_bytes
+
+    return chunks(), length
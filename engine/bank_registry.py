@@ -0,0 +1,181 @@
+"""Versioned, hot-reloadable registry for on-disk question banks.
+
+Each bank is read and parsed once; request handlers get the current
+``BankVersion`` snapshot without touching the disk. A background watcher
+compares file mtime/size and, when the content hash changes, parses the new
+file and builds its indexes off the request path before swapping the
+snapshot in with a single reference assignment. ``BankVersion.version`` is a
+content hash that downstream caches can key on.
+"""
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+RELOAD_INTERVAL = 5.0
+
+
+class BankVersion:
+    """Snapshot of one bank file's parsed data plus indexes derived from it."""
+
+    def __init__(self, name: str, version: str, data: Any, mtime_ns: int, size: int):
+        self.name = name
+        self.version = version
+        self.data = data
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.loaded_at = time.time()
+        self._indexes: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def index(self, key: str, build: Callable[[], Any]) -> Any:
+        """Return the index stored under ``key``, building it on first use."""
+        index = self._indexes.get(key)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(key)
+                if index is None:
+                    index = self._indexes[key] = build()
+        return index
+
+
+class _BankEntry:
+    def __init__(self, path: Path, loader: Callable, warm: Optional[Callable[[BankVersion], None]], mapped: bool):
+        self.path = path
+        self.loader = loader
+        self.warm = warm
+        self.mapped = mapped
+        self.current: Optional[BankVersion] = None
+
+
+class BankRegistry:
+    def __init__(self):
+        self._banks: Dict[str, _BankEntry] = {}
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def register(
+        self,
+        name: str,
+        path: Path,
+        loader: Callable,
+        warm: Optional[Callable[[BankVersion], None]] = None,
+        mapped: bool = False,
+    ) -> None:
+        """Register a bank. ``loader`` parses the raw file bytes (None if the
+        file is missing); ``warm`` prebuilds indexes before a version goes live.
+
+        With ``mapped=True`` the file is not read here: ``loader`` receives the
+        path (or None) and returns ``(version, data)``, e.g. for a memory-mapped
+        format that carries its own content hash.
+        """
+        with self._lock:
+            if name not in self._banks:
+                self._banks[name] = _BankEntry(Path(path), loader, warm, mapped)
+
+    def get(self, name: str) -> BankVersion:
+        entry = self._banks[name]
+        current = entry.current
+        if current is None:
+            with self._lock:
+                if entry.current is None:
+                    # A failed first load raises to the caller instead of going live
+                    # as an empty bank; the next get() (or the watcher) tries again.
+                    entry.current = self._load(name, entry)
+                current = entry.current
+        return current
+
+    @staticmethod
+    def _parse(entry: _BankEntry, source: Any) -> Tuple[Optional[str], Any]:
+        result = entry.loader(source)
+        return result if entry.mapped else (None, result)
+
+    def _load(self, name: str, entry: _BankEntry, skip_version: Optional[str] = None) -> Optional[BankVersion]:
+        """Read, hash, parse and warm the bank file.
+
+        Returns None without parsing when the content hash equals
+        ``skip_version``.
+        """
+        try:
+            stat = entry.path.stat()
+            if entry.mapped:
+                version, data = self._parse(entry, entry.path)
+            else:
+                raw = entry.path.read_bytes()
+                version = hashlib.sha256(raw).hexdigest()[:12]
+                data = None if version == skip_version else self._parse(entry, raw)[1]
+        except FileNotFoundError:
+            if skip_version == "missing":
+                return None
+            return BankVersion(name, "missing", self._parse(entry, None)[1], 0, 0)
+
+        if version == skip_version:
+            return None
+        snapshot = BankVersion(name, version, data, stat.st_mtime_ns, stat.st_size)
+        if entry.warm is not None:
+            entry.warm(snapshot)
+        return snapshot
+
+    def refresh(self, name: str) -> bool:
+        """Reload ``name`` if its file changed; returns True if a new version went live."""
+        entry = self._banks[name]
+        current = entry.current
+        if current is None:
+            self.get(name)
+            return True
+
+        try:
+            stat = entry.path.stat()
+            if (stat.st_mtime_ns, stat.st_size) == (current.mtime_ns, current.size):
+                return False
+        except FileNotFoundError:
+            if current.version == "missing":
+                return False
+            stat = None
+
+        try:
+            snapshot = self._load(name, entry, skip_version=current.version)
+        except Exception as e:
+            # Keep serving the last good version if the new file is broken.
+            print(f"[WARN] bank_registry: reload of '{name}' failed, keeping {current.version}: {e}")
+            return False
+
+        if snapshot is None:
+            # Touched but unchanged: remember the new stat, keep built indexes.
+            if stat is not None:
+                current.mtime_ns, current.size = stat.st_mtime_ns, stat.st_size
+            return False
+
+        entry.current = snapshot
+        print(f"[INFO] bank_registry: '{name}' {current.version} -> {snapshot.version}")
+        return True
+
+    def refresh_all(self) -> None:
+        for name in list(self._banks):
+            try:
+                self.refresh(name)
+            except Exception as e:
+                print(f"[WARN] bank_registry: refresh of '{name}' failed: {e}")
+
+    def start_watcher(self, interval: float = RELOAD_INTERVAL) -> None:
+        """Poll registered banks every ``interval`` seconds in a daemon thread."""
+        with self._lock:
+            if self._watcher is not None and self._watcher.is_alive():
+                return
+            self._stop.clear()
+            self._watcher = threading.Thread(
+                target=self._watch, args=(interval,), name="bank-registry-watcher", daemon=True,
+            )
+            self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.refresh_all()
+
+
+registry = BankRegistry()
@@ -1,118 +1,84 @@
 import os
 import re
 import json
-import time
-import base64
-import urllib.request
-import urllib.error
-from typing import List, Dict, Any
-from . import llm_client
+import asyncio
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Union
+from . import fluency, http_client, llm_client, pronunciation, task_poller
+from .audio_preprocess import PreparedAudio, prepare_for_asr
+from .audio_upload import AUDIO_PLACEHOLDER, data_uri_json_body
+from .llm_json import parse_llm_json as _parse_llm_json
+from .pipeline import Stage, run_dag
+from .transcript_cache import audio_key, transcript_cache
 from .rag import AgenticRAG
+from .transcript_cleaner import clean_transcription
 
 DASHSCOPE_ASR_URL = (
     "https://dashscope.aliyuncs.com/api/v1/services/audio/asr/transcription"
 )
-DASHSCOPE_TASK_URL = "https://dashscope.aliyuncs.com/api/v1/tasks"
-
-
-def _parse_llm_json(raw: str):
-    """Strip markdown fences and parse JSON from LLM output."""
-    text = raw.strip()
-    # Remove ```json ... ``` or ``` ... ```
-    if text.startswith("```"):
-        text = re.sub(r"^```\w*\n?", "", text)
-        text = re.sub(r"\n?```$", "", text)
-        text = text.strip()
-    return json.loads(text)
-
-
-def _clean_transcription(text: str) -> str:
-    """Post-process STT output to fix common SenseVoice issues."""
-    # 1. Remove Chinese/CJK characters and Chinese punctuation
-    text = re.sub(r'[\u4e00-\u9fff\u3000-\u303f\uff00-\uffef]+', '', text)
-    # 2. Fix word.Word patterns → word. Word  (e.g. "center.it'Spretty" → "center. it'Spretty")
-    text = re.sub(r'([a-zA-Z])\.([a-zA-Z])', r'\1. \2', text)
-    # 3. Fix word,word patterns → word, word  (e.g. "convenient,but" → "convenient, but")
-    text = re.sub(r'([a-zA-Z]),([a-zA-Z])', r'\1, \2', text)
-    # 4. Fix camelCase-like concatenation from STT: lowercase followed by uppercase
-    #    e.g. "i'Mcurrently" → "i'M currently", "it'Spretty" → "it'S pretty"
-    text = re.sub(r"([a-z])'([A-Z])([a-z])", r"\1'\2 \3", text)
-    # 5. Fix direct lowercase-uppercase joins: e.g. "livein" → "live in"
-    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
-    # 6. Normalize common contractions casing: i'M → I'm, it'S → it's
-    text = re.sub(r"\bi'M\b", "I'm", text)
-    text = re.sub(r"\bit'S\b", "it's", text)
-    text = re.sub(r"\bthat'S\b", "that's", text)
-    text = re.sub(r"\bwhat'S\b", "what's", text)
-    text = re.sub(r"\bthere'S\b", "there's", text)
-    text = re.sub(r"\bhe'S\b", "he's", text)
-    text = re.sub(r"\bshe'S\b", "she's", text)
-    text = re.sub(r"\bdon'T\b", "don't", text)
-    text = re.sub(r"\bcan'T\b", "can't", text)
-    text = re.sub(r"\bwon'T\b", "won't", text)
-    text = re.sub(r"\bdidn'T\b", "didn't", text)
-    text = re.sub(r"\bisn'T\b", "isn't", text)
-    text = re.sub(r"\baren'T\b", "aren't", text)
-    text = re.sub(r"\bwasn'T\b", "wasn't", text)
-    text = re.sub(r"\bwouldn'T\b", "wouldn't", text)
-    text = re.sub(r"\bcouldn'T\b", "couldn't", text)
-    text = re.sub(r"\bshouldn'T\b", "shouldn't", text)
-    text = re.sub(r"\bhaven'T\b", "haven't", text)
-    text = re.sub(r"\bhasn'T\b", "hasn't", text)
-    text = re.sub(r"\bI'Ve\b", "I've", text)
-    text = re.sub(r"\bwe'Re\b", "we're", text)
-    text = re.sub(r"\bthey'Re\b", "they're", text)
-    text = re.sub(r"\byou'Re\b", "you're", text)
-    text = re.sub(r"\bi'Ll\b", "I'll", text)
-    text = re.sub(r"\bwe'Ll\b", "we'll", text)
-    text = re.sub(r"\bi'D\b", "I'd", text)
-    # 7. Remove orphan single letters (not "I" or "a") left after CJK removal
-    text = re.sub(r'\b([b-hj-zB-HJ-Z])\b(?=\s*[.,!?]|\s*$)', '', text)
-    # 8. Clean up spaces before punctuation
-    text = re.sub(r'\s+([.,!?;:])', r'\1', text)
-    # 9. Collapse multiple spaces
-    text = re.sub(r'\s+', ' ', text).strip()
-    # 10. Remove trailing punctuation-only fragments
-    text = re.sub(r'[.,!?;:\s]+$', '.', text).strip()
-    # 11. Capitalize first letter of sentences
-    text = re.sub(r'(?:^|(?<=\.\s))([a-z])', lambda m: m.group(1).upper(), text)
-    return text
-
-
-def _transcribe_audio(audio_bytes: bytes) -> str:
+ASR_MODEL = "sensevoice-v1"
+
+# "full" runs the Examiner -> Critic -> GM role-play (3 LLM calls);
+# "fast" fuses them into one structured call for practice drills.
+EVAL_MODES = {"full", "fast"}
+DEFAULT_EVAL_MODE = os.getenv("IELTS_EVAL_MODE", "full").strip().lower()
+if DEFAULT_EVAL_MODE not in EVAL_MODES:
+    DEFAULT_EVAL_MODE = "full"
+
+_SCORES_SCHEMA = (
+    '"scores": { "fluency": float, "lexical": float, "grammar": float, "pronunciation": float }, "report": str, "xp": int, '
+    '"errors": [{ "type": "grammar|lexical|pronunciation|fluency", "original": "学生原始表达", "correction": "正确表达", "explanation": "中文解释(20字内)" }]'
+)
+
+
+async def _transcribe_audio(audio: Union[bytes, BinaryIO, PreparedAudio]) -> str:
     """Transcribe audio using DashScope SenseVoice (async API with base64)."""
     api_key = os.getenv("DASHSCOPE_API_KEY", "").strip()
     if not api_key:
         return "(语音转写不可用: 缺少 DASHSCOPE_API_KEY)"
 
-    # Step 1: Base64 encode audio and build data URI
-    b64 = base64.b64encode(audio_bytes).decode("ascii")
-    data_uri = f"data:audio/wav;base64,{b64}"
+    # Step 1: Downmix/resample/trim locally (unless the caller already did)
+    if isinstance(audio, PreparedAudio):
+        prepared = audio
+    else:
+        prepared = await asyncio.to_thread(prepare_for_asr, audio)
+
+    # Re-submitted recordings reuse the earlier transcription; failures
+    # ("(...)" placeholders) are not cached
+    key = await asyncio.to_thread(audio_key, prepared, ASR_MODEL)
+
+    async def transcribe():
+        text = await _run_asr(prepared, api_key)
+        return text, not text.startswith("(")
+
+    return await transcript_cache.get_or_transcribe(key, transcribe)
+
 
-    # Step 2: Submit async transcription task with English language hint
-    payload = json.dumps({
-        "model": "sensevoice-v1",
-        "input": {"file_urls": [data_uri]},
+async def _run_asr(prepared: PreparedAudio, api_key: str) -> str:
+    # Step 2: Submit async transcription task with English language hint; the
+    # base64 data URI is encoded chunk by chunk into the streamed request body
+    payload = {
+        "model": ASR_MODEL,
+        "input": {"file_urls": [AUDIO_PLACEHOLDER]},
         "parameters": {"language_hints": ["en"]},
-    }).encode("utf-8")
-
-    req = urllib.request.Request(
-        url=DASHSCOPE_ASR_URL,
-        data=payload,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-            "X-DashScope-Async": "enable",
-        },
-        method="POST",
-    )
+    }
+    body, length = data_uri_json_body(payload, prepared.mime, prepared.open(), prepared.size)
 
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            submit_data = json.loads(resp.read().decode("utf-8"))
-    except urllib.error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="ignore")[:200]
-        return f"(语音转写提交失败: HTTP {exc.code} - {detail})"
+        resp = await http_client.request(
+            "POST",
+            DASHSCOPE_ASR_URL,
+            headers={
+                "Content-Type": "application/json",
+                "Content-Length": str(length),
+                "Authorization": f"Bearer {api_key}",
+                "X-DashScope-Async": "enable",
+            },
+            content=body,
+            timeout=30,
+        )
+        if resp.status_code >= 400:
+            return f"(语音转写提交失败: HTTP {resp.status_code} - {resp.text[:200]})"
+        submit_data = resp.json()
     except Exception as e:
         return f"(语音转写提交失败: {str(e)[:100]})"
 
@@ -120,88 +86,99 @@ def _transcribe_audio(audio_bytes: bytes) -> str:
     if not task_id:
         return "(语音转写失败: 未获取到 task_id)"
 
-    # Step 3: Poll for task completion
-    task_url = f"{DASHSCOPE_TASK_URL}/{task_id}"
-    for _ in range(30):  # max 30 seconds
-        time.sleep(1)
-        try:
-            poll_req = urllib.request.Request(
-                url=task_url,
-                headers={"Authorization": f"Bearer {api_key}"},
-            )
-            with urllib.request.urlopen(poll_req, timeout=10) as resp:
-                poll_data = json.loads(resp.read().decode("utf-8"))
-        except Exception:
-            continue
-
-        status = poll_data.get("output", {}).get("task_status", "")
-        if status == "SUCCEEDED":
-            results = poll_data.get("output", {}).get("results", [])
-            if not results:
-                return "(转写结果为空)"
-            transcription_url = results[0].get("transcription_url", "")
-            if not transcription_url:
-                return "(转写结果为空)"
-
-            # Step 4: Fetch transcription JSON
-            try:
-                with urllib.request.urlopen(transcription_url, timeout=10) as tr:
-                    tr_data = json.loads(tr.read().decode("utf-8"))
-                raw_text = tr_data.get("transcripts", [{}])[0].get("text", "")
-                # Strip SenseVoice tags like <|Speech|> and <|/Speech|>
-                clean = re.sub(r"<\|[^|]*\|>", "", raw_text).strip().rstrip(".")
-                # Apply comprehensive post-processing
-                clean = _clean_transcription(clean)
-                return clean if clean else "(转写结果为空)"
-            except Exception as e:
-                return f"(转写结果获取失败: {str(e)[:100]})"
-
-        elif status == "FAILED":
-            msg = poll_data.get("output", {}).get("message", "unknown error")
-            return f"(语音转写失败: {msg[:100]})"
-
-    return "(语音转写超时)"
-
-
-def _analyze_pronunciation(transcription: str, anchor_words: List[str]) -> List[Dict[str, Any]]:
-    """Use LLM to compare STT transcription against anchor words for pronunciation feedback."""
+    # Step 3: Wait for task completion on the shared poller
+    try:
+        output = await task_poller.wait_for_task(task_id, api_key, timeout=30)
+    except task_poller.TaskFailed as e:
+        return f"(语音转写失败: {str(e)[:100]})"
+    except task_poller.TaskTimeout:
+        return "(语音转写超时)"
+
+    results = output.get("results", [])
+    if not results:
+        return "(转写结果为空)"
+    transcription_url = results[0].get("transcription_url", "")
+    if not transcription_url:
+        return "(转写结果为空)"
+
+    # Step 4: Fetch transcription JSON
+    try:
+        tr = await http_client.request("GET", transcription_url, timeout=10)
+        tr.raise_for_status()
+        tr_data = tr.json()
+        raw_text = tr_data.get("transcripts", [{}])[0].get("text", "")
+        # Strip SenseVoice tags like <|Speech|> and <|/Speech|>
+        clean = re.sub(r"<\|[^|]*\|>", "", raw_text).strip().rstrip(".")
+        # Apply comprehensive post-processing
+        clean = clean_transcription(clean)
+        return clean if clean else "(转写结果为空)"
+    except Exception as e:
+        return f"(转写结果获取失败: {str(e)[:100]})"
+
+
+async def _analyze_pronunciation(transcription: str, anchor_words: List[str]) -> List[Dict[str, Any]]:
+    """Compare STT transcription against anchor words for pronunciation feedback.
+
+    The local phonetic matcher decides most words; only ambiguous ones
+    (a near-but-not-close window match) are sent to the LLM.
+    """
     if not anchor_words:
         return []
 
-    words_str = ", ".join(anchor_words)
+    feedback = await asyncio.to_thread(pronunciation.analyze_anchor_words, transcription, anchor_words)
+    ambiguous = [item for item in feedback if item["status"] == "ambiguous"]
+    if ambiguous:
+        verdicts = await _adjudicate_pronunciation(transcription, [item["word"] for item in ambiguous])
+        for item in ambiguous:
+            verdict = verdicts.get(item["word"].lower())
+            if verdict is None:
+                # LLM unavailable: lean on the local score
+                verdict = {"status": "mispronounced" if item["score"] >= 0.6 else "missing"}
+            item["status"] = verdict["status"]
+            if item["status"] == "missing":
+                item["recognized_as"], item["hint"] = None, ""
+            elif verdict.get("recognized_as"):
+                item["recognized_as"] = verdict["recognized_as"]
+            if verdict.get("hint"):
+                item["hint"] = verdict["hint"]
+
+    for item in feedback:
+        item.pop("score", None)
+    return feedback
+
+
+async def _adjudicate_pronunciation(transcription: str, words: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Ask the LLM about words the local matcher could not decide; {} on failure."""
+    words_str = ", ".join(words)
     prompt = (
         f"You are a pronunciation analysis expert.\n"
         f"The student was supposed to use these anchor words: [{words_str}]\n"
         f"The speech-to-text system transcribed their speech as:\n\"{transcription}\"\n\n"
         f"For EACH anchor word, determine:\n"
-        f"1. \"correct\" - the word appears correctly in the transcription (allow minor punctuation/case differences)\n"
-        f"2. \"mispronounced\" - a phonetically similar but wrong form appears (e.g. routine→root teen, fulfillment→fulfill meant)\n"
-        f"3. \"missing\" - the word was not said at all\n\n"
+        f"1. \"mispronounced\" - a phonetically similar but wrong form appears (e.g. routine→root teen, fulfillment→fulfill meant)\n"
+        f"2. \"missing\" - the word was not said at all\n\n"
         f"Return ONLY a JSON array. Each element:\n"
-        f'{{"word":"<anchor>","status":"correct|mispronounced|missing","recognized_as":"<what STT heard or null>","ipa":"/<IPA of correct pronunciation>/","hint":"<short Chinese tip, max 15 chars>"}}\n'
-        f"For correct words, ipa and hint can be empty strings. recognized_as should be null for correct and missing."
+        f'{{"word":"<anchor>","status":"mispronounced|missing","recognized_as":"<what STT heard or null>","hint":"<short Chinese tip, max 15 chars>"}}\n'
+        f"recognized_as should be null for missing words."
     )
 
     try:
-        raw = llm_client.chat(
+        raw = await llm_client.achat(
             messages=[
                 {"role": "system", "content": "You are a pronunciation analysis expert. Return only valid JSON array, nothing else."},
                 {"role": "user", "content": prompt},
             ],
             temperature=0.2,
         )
-        # Strip markdown fences if present
-        return _parse_llm_json(raw)
+        parsed = _parse_llm_json(raw)
     except (json.JSONDecodeError, RuntimeError):
-        # Fallback: simple string matching, no IPA
-        result = []
-        lower_trans = transcription.lower()
-        for w in anchor_words:
-            if w.lower() in lower_trans:
-                result.append({"word": w, "status": "correct", "recognized_as": None, "ipa": "", "hint": ""})
-            else:
-                result.append({"word": w, "status": "missing", "recognized_as": None, "ipa": "", "hint": ""})
-        return result
+        return {}
+
+    verdicts = {}
+    for entry in parsed if isinstance(parsed, list) else []:
+        if isinstance(entry, dict) and entry.get("status") in ("mispronounced", "missing"):
+            verdicts[str(entry.get("word", "")).lower()] = entry
+    return verdicts
 
 
 class CamelIELTSAgent:
@@ -214,91 +191,184 @@ class CamelIELTSAgent:
         self.rag = AgenticRAG()
 
     async def run_roleplay_evaluation(
-        self, audio_bytes: bytes, question: str, target_level: str, part: str,
-        anchor_words: List[str] = None,
+        self, audio: Union[bytes, BinaryIO, PreparedAudio], question: str, target_level: str, part: str,
+        anchor_words: List[str] = None, mode: str = None,
+        on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
     ):
+        """Run the evaluation pipeline.
+
+        ``on_event(event, data)`` receives progress as it happens: every
+        "thought", the "transcription", the "pronunciation" feedback, the
+        "fluency" metrics and a "stage" event per finished stage.
+        """
+        mode = (mode or DEFAULT_EVAL_MODE).lower()
+        if mode not in EVAL_MODES:
+            raise ValueError(f"Unknown evaluation mode '{mode}'. Use one of {sorted(EVAL_MODES)}.")
         thoughts = []
 
-        # PHASE 0: Signal Processing (STT)
-        thoughts.append("Agent: [AudioNode] 正在通过 SenseVoice 解码考生回答...")
-        transcription = _transcribe_audio(audio_bytes)
-        thoughts.append(
-            f"Agent: [AudioNode] 信号已锁定。内容: '{transcription[:60]}...'"
-        )
+        def emit(event: str, data: Dict[str, Any]) -> None:
+            if on_event is not None:
+                on_event(event, data)
+
+        def think(text: str) -> None:
+            thoughts.append(text)
+            emit("thought", {"text": text})
 
-        # PHASE 0.5: Pronunciation Analysis (anchor words)
-        pronunciation_feedback = []
-        if anchor_words:
-            thoughts.append("Agent: [PronunciationCoach] 正在分析锚点词发音准确性...")
-            pronunciation_feedback = _analyze_pronunciation(transcription, anchor_words)
-            correct_count = sum(1 for p in pronunciation_feedback if p.get("status") == "correct")
-            thoughts.append(
+        def stage_done(name: str, result: Any, elapsed_ms: float) -> None:
+            if name == "stt":
+                emit("transcription", {"text": result})
+            elif name == "pronunciation":
+                emit("pronunciation", {"items": result})
+            elif name == "fluency":
+                emit("fluency", {"metrics": result})
+            emit("stage", {"name": name, "elapsed_ms": elapsed_ms})
+
+        # PHASE 0: Signal Processing (STT)
+        async def stt(results):
+            think("Agent: [AudioNode] 正在通过 SenseVoice 解码考生回答...")
+            transcription = await _transcribe_audio(audio)
+            think(
+                f"Agent: [AudioNode] 信号已锁定。内容: '{transcription[:60]}...'"
+            )
+            return transcription
+
+        # PHASE 0.1: Pause profile from the decoded signal - runs while ASR is in flight
+        async def pauses(results):
+            if not isinstance(audio, PreparedAudio):
+                return None
+            return await asyncio.to_thread(fluency.analyze_pauses, audio.samples, audio.sample_rate)
+
+        async def fluency_stage(results):
+            # _transcribe_audio reports failures as "(...)" placeholders
+            if results["stt"].startswith("("):
+                return None
+            return fluency.fluency_metrics(results["pauses"], results["stt"])
+
+        def fluency_line(results) -> str:
+            line = fluency.describe(results["fluency"])
+            return f"\n流利度信号 (本地音频分析): {line}" if line else ""
+
+        # PHASE 0.5: Pronunciation Analysis (anchor words) - overlaps the Examiner
+        async def pronunciation(results):
+            if not anchor_words:
+                return []
+            think("Agent: [PronunciationCoach] 正在分析锚点词发音准确性...")
+            feedback = await _analyze_pronunciation(results["stt"], anchor_words)
+            correct_count = sum(1 for p in feedback if p.get("status") == "correct")
+            think(
                 f"Agent: [PronunciationCoach] 分析完成: {correct_count}/{len(anchor_words)} 个锚点词发音正确"
             )
+            return feedback
 
         # PHASE 1: Knowledge Retrieval (RAG)
-        thoughts.append(
-            f"Agent: [Critic] 正在获取目标分数 {target_level} 的 RAG 评分标准..."
-        )
-        rag_data = self.rag.retrieve_ielts_knowledge(transcription, target_level)
+        async def rag(results):
+            think(
+                f"Agent: [Critic] 正在获取目标分数 {target_level} 的 RAG 评分标准..."
+            )
+            return self.rag.retrieve_ielts_knowledge(results["stt"], target_level)
 
         # PHASE 2: Role-Playing Loop (CAMEL Style)
         # Agent A: The Examiner
-        thoughts.append("Agent: [Examiner] 正在根据官方评分标准评估回答...")
-        initial_assessment = llm_client.chat(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "你是一名资深雅思考官。根据流利度 (Fluency)、词汇 (Lexical) 和语法 (Grammar) 评估学生。保持专业。",
-                },
-                {
-                    "role": "user",
-                    "content": f"听写文本: {transcription}\n上下文: {rag_data}",
-                },
-            ],
-            temperature=0.5,
-        )
+        async def examiner(results):
+            think("Agent: [Examiner] 正在根据官方评分标准评估回答...")
+            return await llm_client.achat(
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "你是一名资深雅思考官。根据流利度 (Fluency)、词汇 (Lexical) 和语法 (Grammar) 评估学生。保持专业。",
+                    },
+                    {
+                        "role": "user",
+                        "content": f"听写文本: {results['stt']}{fluency_line(results)}\n上下文: {results['rag']}",
+                    },
+                ],
+                temperature=0.5,
+            )
 
         # Agent B: The Critic (Peer Review)
-        thoughts.append("Agent: [Critic] 正在复审考官评估并提出升级建议...")
-        critic_report = llm_client.chat(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "你是一名语言评论家。审查考官的报告。提出 3 个高级搭配来替换学生回答中的基础词汇。",
-                },
-                {
-                    "role": "user",
-                    "content": f"听写文本: {transcription}\n考官报告: {initial_assessment}",
-                },
-            ],
-            temperature=0.5,
-        )
+        async def critic(results):
+            think("Agent: [Critic] 正在复审考官评估并提出升级建议...")
+            return await llm_client.achat(
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "你是一名语言评论家。审查考官的报告。提出 3 个高级搭配来替换学生回答中的基础词汇。",
+                    },
+                    {
+                        "role": "user",
+                        "content": f"听写文本: {results['stt']}\n考官报告: {results['examiner']}",
+                    },
+                ],
+                temperature=0.5,
+            )
 
         # Agent C: The Game Master (Consolidation)
-        thoughts.append("Agent: [GM] 正在合成最终 JSON 报告并计算游戏化奖励...")
-        gm_raw = llm_client.chat(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "你是游戏管理员 (GM)。将分数和报告定稿为 JSON 格式。只返回有效的 JSON，不要任何其他内容。不要用 markdown 代码块包裹。",
-                },
-                {
-                    "role": "user",
-                    "content": (
-                        f"整合:\n"
-                        f"考官: {initial_assessment}\n"
-                        f"评论家: {critic_report}\n"
-                        f'返回 JSON: {{ "scores": {{ "fluency": float, "lexical": float, "grammar": float, "pronunciation": float }}, "report": str, "xp": int, '
-                        f'"errors": [{{ "type": "grammar|lexical|pronunciation|fluency", "original": "学生原始表达", "correction": "正确表达", "explanation": "中文解释(20字内)" }}] }}'
-                    ),
-                },
-            ],
-            temperature=0.3,
-        )
+        async def gm(results):
+            think("Agent: [GM] 正在合成最终 JSON 报告并计算游戏化奖励...")
+            return await llm_client.achat(
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "你是游戏管理员 (GM)。将分数和报告定稿为 JSON 格式。只返回有效的 JSON，不要任何其他内容。不要用 markdown 代码块包裹。",
+                    },
+                    {
+                        "role": "user",
+                        "content": (
+                            f"整合:\n"
+                            f"考官: {results['examiner']}\n"
+                            f"评论家: {results['critic']}\n"
+                            f"返回 JSON: {{ {_SCORES_SCHEMA} }}"
+                        ),
+                    },
+                ],
+                temperature=0.3,
+            )
+
+        # Fast mode: Examiner, Critic and GM fused into one structured call
+        async def assessment(results):
+            think("Agent: [Examiner+Critic+GM] 正在一次性完成评分、升级建议与 JSON 报告...")
+            return await llm_client.achat(
+                messages=[
+                    {
+                        "role": "system",
+                        "content": (
+                            "你是一名资深雅思考官，同时担任语言评论家和游戏管理员 (GM)。"
+                            "根据流利度 (Fluency)、词汇 (Lexical)、语法 (Grammar) 和发音 (Pronunciation) 评估学生，"
+                            "并提出 3 个高级搭配来替换学生回答中的基础词汇。"
+                            "只返回有效的 JSON，不要任何其他内容。不要用 markdown 代码块包裹。"
+                        ),
+                    },
+                    {
+                        "role": "user",
+                        "content": (
+                            f"听写文本: {results['stt']}{fluency_line(results)}\n上下文: {results['rag']}\n"
+                            f'返回 JSON: {{ {_SCORES_SCHEMA}, "suggestions": str }}'
+                        ),
+                    },
+                ],
+                temperature=0.3,
+            )
+
+        stages = [
+            Stage("stt", stt),
+            Stage("pauses", pauses),
+            Stage("fluency", fluency_stage, deps=("stt", "pauses")),
+            Stage("pronunciation", pronunciation, deps=("stt",)),
+            Stage("rag", rag, deps=("stt",)),
+        ]
+        if mode == "fast":
+            stages.append(Stage("assessment", assessment, deps=("stt", "rag", "fluency")))
+        else:
+            stages += [
+                Stage("examiner", examiner, deps=("stt", "rag", "fluency")),
+                Stage("critic", critic, deps=("examiner",)),
+                Stage("gm", gm, deps=("examiner", "critic")),
+            ]
+        results, timings = await run_dag(stages, on_complete=stage_done)
+        final_raw = results["assessment"] if mode == "fast" else results["gm"]
 
         try:
-            final_json = _parse_llm_json(gm_raw)
+            final_json = _parse_llm_json(final_raw)
         except json.JSONDecodeError:
             # If the LLM didn't return valid JSON, provide defaults
             final_json = {
@@ -308,16 +378,26 @@ class CamelIELTSAgent:
                     "grammar": 5.0,
                     "pronunciation": 5.0,
                 },
-                "report": gm_raw,
+                "report": final_raw,
                 "xp": 100,
             }
 
+        if mode == "fast":
+            suggestions = final_json.get("suggestions", "")
+            if isinstance(suggestions, list):
+                suggestions = "\n".join(str(x) for x in suggestions)
+        else:
+            suggestions = results["critic"]
+
         return {
-            "transcription": transcription,
+            "transcription": results["stt"],
             "scores": final_json.get("scores", {}),
             "agent_thoughts": thoughts,
-            "feedback": f"{final_json.get('report')}\n\n语言升级建议:\n{critic_report}",
+            "feedback": f"{final_json.get('report')}\n\n语言升级建议:\n{suggestions}",
             "xpReward": final_json.get("xp", 100),
-            "pronunciation_feedback": pronunciation_feedback,
+            "pronunciation_feedback": results["pronunciation"],
+            "fluency_metrics": results["fluency"],
             "detected_errors": final_json.get("errors", []),
+            "stage_timings_ms": timings,
+            "mode": mode,
         }
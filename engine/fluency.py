@@ -0,0 +1,103 @@
+"""Signal-level fluency metrics.
+
+The Examiner only ever saw the transcript, which carries none of the pauses
+that fluency is judged on. ``analyze_pauses`` reuses the quality gate's
+energy VAD on the already-decoded 16 kHz signal (so it runs in a worker
+thread while ASR is still in flight); ``fluency_metrics`` then combines
+the pause profile with the transcript into speaking rate, pause
+distribution, mean length of run and filler density.
+"""
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .audio_quality import frame_rms, speech_mask
+
+# Silences shorter than this are gaps between words, not pauses.
+MIN_PAUSE_S = float(os.getenv("FLUENCY_MIN_PAUSE_S", "0.25"))
+LONG_PAUSE_S = float(os.getenv("FLUENCY_LONG_PAUSE_S", "1.0"))
+
+_WORD = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+FILLER_WORDS = {"um", "umm", "uh", "uhm", "er", "erm", "ah", "eh", "hmm", "mm"}
+FILLER_PHRASES = (("you", "know"), ("i", "mean"))
+
+
+@dataclass
+class PauseProfile:
+    # Speaking time: voiced frames plus the short gaps between words.
+    voiced_s: float
+    # Silent pauses between runs of speech (leading/trailing silence excluded).
+    pauses_s: List[float]
+    runs: int
+
+
+def analyze_pauses(samples: Optional[np.ndarray], rate: int) -> Optional[PauseProfile]:
+    """Pause profile of a decoded recording; None if nothing was voiced."""
+    if samples is None or not rate:
+        return None
+    rms, frame = frame_rms(samples, rate)
+    if len(rms) == 0:
+        return None
+    speech, _ = speech_mask(rms)
+    voiced = np.flatnonzero(speech)
+    if len(voiced) == 0:
+        return None
+
+    frame_s = frame / rate
+    # Silent gaps between consecutive voiced frames, in frames.
+    gaps = np.diff(voiced) - 1
+    gaps_s = gaps[gaps > 0] * frame_s
+    pauses = gaps_s[gaps_s >= MIN_PAUSE_S]
+    span_s = (voiced[-1] - voiced[0] + 1) * frame_s
+    return PauseProfile(
+        voiced_s=float(span_s - pauses.sum()),
+        pauses_s=[float(p) for p in pauses],
+        runs=len(pauses) + 1,
+    )
+
+
+def count_words(transcript: str) -> Dict[str, int]:
+    """Word and filler counts of an ASR transcript."""
+    tokens = [t.lower() for t in _WORD.findall(transcript or "")]
+    fillers = sum(1 for t in tokens if t in FILLER_WORDS)
+    fillers += sum(
+        1 for a, b in zip(tokens, tokens[1:]) if (a, b) in FILLER_PHRASES
+    )
+    return {"words": len(tokens), "fillers": fillers}
+
+
+def fluency_metrics(profile: Optional[PauseProfile], transcript: str) -> Optional[Dict[str, Any]]:
+    if profile is None:
+        return None
+    counts = count_words(transcript)
+    words, pauses = counts["words"], profile.pauses_s
+    minutes = profile.voiced_s / 60
+    return {
+        "speaking_rate_wpm": round(words / minutes, 1) if words and minutes else None,
+        "voiced_s": round(profile.voiced_s, 2),
+        "pause_count": len(pauses),
+        "pauses_per_min": round(len(pauses) / minutes, 1) if minutes else None,
+        "pause_mean_s": round(float(np.mean(pauses)), 2) if pauses else 0.0,
+        "pause_median_s": round(float(np.median(pauses)), 2) if pauses else 0.0,
+        "pause_max_s": round(max(pauses), 2) if pauses else 0.0,
+        "long_pause_count": sum(1 for p in pauses if p >= LONG_PAUSE_S),
+        "mean_length_of_run": round(words / profile.runs, 1) if words else None,
+        "filler_count": counts["fillers"],
+        "filler_per_100_words": round(counts["fillers"] * 100 / words, 1) if words else None,
+    }
+
+
+def describe(metrics: Optional[Dict[str, Any]]) -> str:
+    """One compact line for the Examiner prompt; "" when unavailable."""
+    if not metrics or metrics["speaking_rate_wpm"] is None:
+        return ""
+    return (
+        f"语速 {metrics['speaking_rate_wpm']:.0f} 词/分; "
+        f"停顿 {metrics['pause_count']} 次 (≥{LONG_PAUSE_S:g}s 的 {metrics['long_pause_count']} 次, "
+        f"平均 {metrics['pause_mean_s']}s, 最长 {metrics['pause_max_s']}s); "
+        f"平均语流长度 {metrics['mean_length_of_run']} 词; "
+        f"填充词 {metrics['filler_count']} 个 ({metrics['filler_per_100_words']}/百词)"
+    )
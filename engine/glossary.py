@@ -0,0 +1,315 @@
+"""Precomputed Chinese glossary for word-tap translation.
+
+Every word tapped in PracticeBank used to cost one LLM round trip, although
+almost all of them come from the fixed question bank. ``scripts/
+build_glossary.py`` extracts the bank's words and recurring collocations
+and pre-translates them in large batches into a gzipped TSV
+(``term<TAB>translation<TAB>emoji``). At runtime terms are answered from
+that dict; only the misses of a request go to the LLM, together in one
+prompt, and their answers are kept in a bounded in-memory overlay.
+
+The file needs the LLM to build, so a deploy without it (or with a bank
+that has grown since) translates the missing bank terms once in the
+background at startup (``Glossary.build_missing``); lookups see each batch
+as soon as it lands.
+"""
+import asyncio
+import gzip
+import json
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import llm_client
+from .llm_json import parse_llm_json
+
+ROOT = Path(__file__).resolve().parents[1]
+GLOSSARY_PATH = Path(os.getenv("GLOSSARY_PATH") or ROOT / "data" / "processed" / "glossary.tsv.gz")
+P1_BANK = ROOT / "data" / "processed" / "p1_bank.json"
+QUESTION_BANK = ROOT / "engine" / "question_bank.json"
+# Translate bank terms missing from the file at startup (needs DASHSCOPE_API_KEY).
+AUTOBUILD = os.getenv("GLOSSARY_AUTOBUILD", "1").strip() != "0"
+BUILD_CONCURRENCY = int(os.getenv("GLOSSARY_BUILD_CONCURRENCY", "3"))
+# Terms per LLM prompt; a batch of misses larger than this is split.
+BATCH_SIZE = int(os.getenv("GLOSSARY_BATCH_SIZE", "80"))
+RUNTIME_ENTRIES = int(os.getenv("GLOSSARY_RUNTIME_ENTRIES", "20000"))
+MAX_TERM_CHARS = 64
+DEFAULT_EMOJI = "📝"
+
+_TOKEN = re.compile(r"[A-Za-z]+(?:['-][A-Za-z]+)*")
+_CLAUSE = re.compile(r"[.,!?;:()\"\n]+")
+
+# Collocations must not start or end with one of these.
+STOPWORDS = frozenset("""
+a an the and or but if so as of to in on at by for with from about into than then
+i me my we our you your he him his she her it its they them their this that these those
+is am are was were be been being do does did have has had will would can could should
+not no very really just also too there here what which who when where how why
+because probably actually pretty quite maybe kind sort always usually often
+""".split())
+# The only stopwords allowed inside a 3-word collocation ("bit of privacy").
+LINKING_WORDS = frozenset("a an the of on in to up for with into and".split())
+
+Entry = Tuple[str, str]  # (translation, emoji)
+
+
+def normalize_term(text: str) -> str:
+    """Lowercase words joined by single spaces; "" for nothing usable or an over-long term."""
+    term = " ".join(t.lower() for t in _TOKEN.findall(text.replace("’", "'")))
+    return term if len(term) <= MAX_TERM_CHARS else ""
+
+
+def extract_terms(texts: Iterable[str], phrases: Iterable[str] = (), min_count: int = 2) -> List[str]:
+    """Distinct words of ``texts``, their 2-3 word collocations seen ``min_count``+ times, and ``phrases``."""
+    words = set()
+    ngrams: Counter = Counter()
+    for text in texts:
+        for clause in _CLAUSE.split(text.replace("’", "'")):
+            tokens = [t.lower() for t in _TOKEN.findall(clause)]
+            words.update(t for t in tokens if len(t) > 1 or t in ("a", "i"))
+            for n in (2, 3):
+                for i in range(len(tokens) - n + 1):
+                    gram = tokens[i:i + n]
+                    if gram[0] in STOPWORDS or gram[-1] in STOPWORDS:
+                        continue
+                    if n == 2 or gram[1] not in STOPWORDS or gram[1] in LINKING_WORDS:
+                        ngrams[" ".join(gram)] += 1
+    terms = words | {gram for gram, count in ngrams.items() if count >= min_count}
+    terms.update(term for term in map(normalize_term, phrases) if term)
+    return sorted(terms)
+
+
+def load_bank() -> Tuple[List[str], List[str]]:
+    """``(texts, phrases)``: bank questions/answers and the P1 keywords."""
+    texts: List[str] = []
+    phrases: List[str] = []
+    for record in json.loads(P1_BANK.read_text(encoding="utf-8")):
+        texts.append(record["question"])
+        texts.extend(record.get("sample_answers") or [])
+        phrases.extend(record.get("keywords") or [])
+    bank = json.loads(QUESTION_BANK.read_text(encoding="utf-8"))
+    for part in ("part1", "part3"):
+        for topic in bank.get(part, []):
+            texts.extend(topic.get("questions") or [])
+    texts.extend(topic["cue_card"] for topic in bank.get("part2", []) if topic.get("cue_card"))
+    return texts, phrases
+
+
+def bank_terms(min_count: int = 2) -> List[str]:
+    texts, phrases = load_bank()
+    return extract_terms(texts, phrases, min_count=min_count)
+
+
+def load_glossary(path: Path) -> Dict[str, Entry]:
+    entries: Dict[str, Entry] = {}
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#"):
+                    continue
+                term, translation, emoji = (line.rstrip("\n").split("\t") + ["", ""])[:3]
+                if term and translation:
+                    entries[term] = (translation, emoji or DEFAULT_EMOJI)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"[WARN] glossary: {path} unreadable ({e})")
+    return entries
+
+
+def save_glossary(path: Path, entries: Dict[str, Entry]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    # mtime=0 keeps the file byte-identical across rebuilds of the same content.
+    with gzip.GzipFile(tmp, "wb", mtime=0) as raw:
+        raw.write("# term\ttranslation\temoji\n".encode("utf-8"))
+        for term in sorted(entries):
+            translation, emoji = entries[term]
+            row = "\t".join(" ".join(v.split()) for v in (term, translation, emoji))
+            raw.write(f"{row}\n".encode("utf-8"))
+    os.replace(tmp, path)
+
+
+async def translate_batch(terms: List[str]) -> Dict[str, Entry]:
+    """Translate normalized ``terms`` in one LLM call; terms it skipped are absent.
+
+    Raises RuntimeError (LLM failure) or ValueError (unparseable reply).
+    """
+    prompt = (
+        "Translate each English word/phrase below to Chinese contextually as used in IELTS speaking, "
+        "and give 1 relevant emoji for each. Return a JSON object that maps every input, exactly as given, "
+        'to {"translation": "...", "emoji": "..."}.\n'
+        + json.dumps(terms, ensure_ascii=False)
+    )
+    raw = await llm_client.achat(
+        messages=[
+            {"role": "system", "content": "Always respond with a valid JSON object. No markdown fences."},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.3,
+    )
+    data = parse_llm_json(raw)
+    if not isinstance(data, dict):
+        raise ValueError("glossary reply is not a JSON object")
+    wanted = set(terms)
+    entries: Dict[str, Entry] = {}
+    for key, value in data.items():
+        term = normalize_term(str(key))
+        if term not in wanted or not isinstance(value, dict):
+            continue
+        translation = str(value.get("translation") or "").strip()
+        if translation:
+            entries[term] = (translation, str(value.get("emoji") or "").strip() or DEFAULT_EMOJI)
+    return entries
+
+
+async def build_glossary(
+    path: Path, pending: List[str], entries: Dict[str, Entry],
+    batch_size: int = BATCH_SIZE, concurrency: int = BUILD_CONCURRENCY,
+) -> int:
+    """Translate ``pending`` into ``entries``, rewriting ``path`` after every batch.
+
+    Returns how many terms are still untranslated; a rerun retries them.
+    """
+    size = max(1, batch_size)
+    batches = [pending[i:i + size] for i in range(0, len(pending), size)]
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    failed = 0
+
+    async def run(index: int, batch: List[str]) -> None:
+        nonlocal failed
+        async with semaphore:
+            try:
+                found = await translate_batch(batch)
+            except (RuntimeError, ValueError) as e:
+                failed += len(batch)
+                print(f"[WARN] glossary: batch {index + 1}/{len(batches)} failed: {str(e)[:200]}")
+                return
+        failed += len(batch) - len(found)
+        entries.update(found)
+        save_glossary(path, entries)
+        print(f"[INFO] glossary: batch {index + 1}/{len(batches)}: {len(found)}/{len(batch)} translated")
+
+    await asyncio.gather(*(run(i, batch) for i, batch in enumerate(batches)))
+    return failed
+
+
+class Glossary:
+    def __init__(self, path: Path = GLOSSARY_PATH, runtime_entries: int = RUNTIME_ENTRIES):
+        self.path = Path(path)
+        self.runtime_entries = runtime_entries
+        self._entries: Optional[Dict[str, Entry]] = None
+        self._lock = threading.Lock()
+        # Translations fetched at runtime, least recently used first.
+        self._runtime: "OrderedDict[str, Entry]" = OrderedDict()
+        self._stats = {"glossary_hits": 0, "runtime_hits": 0, "misses": 0, "llm_calls": 0, "llm_errors": 0}
+        self._build_task: Optional[asyncio.Task] = None
+
+    def entries(self) -> Dict[str, Entry]:
+        """The precomputed glossary, loaded on first use."""
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._entries = load_glossary(self.path)
+        return self._entries
+
+    def lookup(self, term: str) -> Optional[Entry]:
+        """Translation of a normalized term if known, without calling the LLM."""
+        entry = self.entries().get(term)
+        if entry is not None:
+            self._stats["glossary_hits"] += 1
+            return entry
+        entry = self._runtime.get(term)
+        if entry is not None:
+            self._runtime.move_to_end(term)
+            self._stats["runtime_hits"] += 1
+        return entry
+
+    def known(self, terms: Iterable[str]) -> Dict[str, Entry]:
+        """normalized term -> entry for the ``terms`` already known; never calls the LLM."""
+        found: Dict[str, Entry] = {}
+        for term in dict.fromkeys(filter(None, map(normalize_term, terms))):
+            entry = self.lookup(term)
+            if entry is not None:
+                found[term] = entry
+        return found
+
+    def start_build(self) -> None:
+        """Run ``build_missing`` in the background unless a build is already running."""
+        if self._build_task is None or self._build_task.done():
+            self._build_task = asyncio.get_running_loop().create_task(self.build_missing())
+
+    async def build_missing(self) -> None:
+        """Translate the bank terms the glossary file lacks and serve them as they arrive."""
+        try:
+            terms = await asyncio.to_thread(bank_terms)
+            entries = dict(self.entries())
+            pending = [t for t in terms if t not in entries]
+            if not pending:
+                return
+            print(f"[INFO] glossary: translating {len(pending)} of {len(terms)} bank terms into {self.path}")
+            # Lookups read the dict the build fills in.
+            self._entries = entries
+            failed = await build_glossary(self.path, pending, entries)
+            print(f"[INFO] glossary: {len(entries)} entries, {failed} untranslated")
+        except Exception as e:
+            print(f"[WARN] glossary: build failed: {e}")
+        finally:
+            self._build_task: Optional[asyncio.Task] = None
+
+    def _remember(self, term: str, entry: Entry) -> None:
+        if self.runtime_entries <= 0:
+            return
+        self._runtime.pop(term, None)
+        self._runtime[term] = entry
+        while len(self._runtime) > self.runtime_entries:
+            self._runtime.popitem(last=False)
+
+    async def _fetch(self, terms: List[str]) -> Dict[str, Entry]:
+        self._stats["llm_calls"] += 1
+        try:
+            found = await translate_batch(terms)
+        except (RuntimeError, ValueError) as e:
+            self._stats["llm_errors"] += 1
+            print(f"[WARN] glossary: translating {len(terms)} terms failed: {str(e)[:200]}")
+            return {}
+        for term, entry in found.items():
+            self._remember(term, entry)
+        return found
+
+    async def translate(self, terms: Iterable[str]) -> Dict[str, Entry]:
+        """normalized term -> entry for ``terms``; misses go to the LLM in batches of BATCH_SIZE.
+
+        Terms the LLM could not translate are left out.
+        """
+        found: Dict[str, Entry] = {}
+        misses: List[str] = []
+        for term in dict.fromkeys(filter(None, map(normalize_term, terms))):
+            entry = self.lookup(term)
+            if entry is not None:
+                found[term] = entry
+            else:
+                misses.append(term)
+        if misses:
+            self._stats["misses"] += len(misses)
+            size = max(1, BATCH_SIZE)
+            batches = await asyncio.gather(*(
+                self._fetch(misses[i:i + size]) for i in range(0, len(misses), size)
+            ))
+            for batch in batches:
+                found.update(batch)
+        return found
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            **self._stats,
+            "entries": len(self.entries()),
+            "runtime_entries": len(self._runtime),
+            "building": int(self._build_task is not None and not self._build_task.done()),
+        }
+
+
+glossary = Glossary()
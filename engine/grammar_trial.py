@@ -0,0 +1,77 @@
+import json
+from typing import Any, Dict
+
+from . import llm_client
+from .audio_preprocess import PreparedAudio
+from .camel_agents import _transcribe_audio
+from .llm_json import parse_llm_json
+
+
+async def generate_grammar_hint(original: str, correction: str, explanation: str) -> Dict[str, str]:
+    """Generate a dynamic Chinese hint for the grammar trial."""
+    prompt = (
+        f"Student error: {original}\n"
+        f"Correct expression: {correction}\n"
+        f"Error explanation: {explanation}\n\n"
+        "Tasks:\n"
+        f'1. Generate a short Chinese sentence whose English translation matches "{correction}"\n'
+        "2. Add a grammar tip in parentheses (e.g. note the tense, subject-verb agreement, etc.)\n"
+        "3. Provide a brief context note to help the student understand the grammar point\n\n"
+        'Return JSON: {"chineseHint": "Chinese sentence (grammar tip)", "contextNote": "explanation"}'
+    )
+
+    try:
+        raw = await llm_client.achat(
+            messages=[
+                {"role": "system", "content": "You are an IELTS grammar coach. Generate a Chinese context hint based on the student's error and correction. Return only valid JSON with keys: chineseHint, contextNote. The chineseHint should be in Chinese with a grammar tip in parentheses. The contextNote should be a brief Chinese explanation."},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.5,
+            cache="grammar_hint",
+            batch="grammar_hint",
+        )
+        result = parse_llm_json(raw)
+        return {
+            "chineseHint": result.get("chineseHint", ""),
+            "contextNote": result.get("contextNote", ""),
+        }
+    except (json.JSONDecodeError, RuntimeError):
+        return {"chineseHint": "", "contextNote": ""}
+
+
+async def validate_grammar_trial(prepared: PreparedAudio, correction: str, chinese_hint: str) -> Dict[str, Any]:
+    """STT via SenseVoice, then LLM semantic comparison against the expected correction."""
+    transcription = (await _transcribe_audio(prepared)).strip()
+    # _transcribe_audio reports failures as "(...)" placeholders
+    if not transcription or transcription.startswith("("):
+        return {"transcription": "", "isCorrect": False, "reason": "未识别到语音，请重试"}
+
+    validate_prompt = (
+        f"Chinese context: {chinese_hint}\n"
+        f"Expected correct expression: {correction}\n"
+        f"Student speech transcription: {transcription}\n\n"
+        "Judging criteria:\n"
+        "1. Core grammar points (tense/voice/subject-verb agreement) must be correct\n"
+        "2. Allow reasonable word substitutions (e.g. traveled/went, last year/a year ago)\n"
+        "3. Empty or meaningless answers should be judged as incorrect\n\n"
+        'Return JSON: {"isCorrect": true/false, "reason": "one-sentence Chinese explanation"}'
+    )
+
+    try:
+        raw = await llm_client.achat(
+            messages=[
+                {"role": "system", "content": "You are a grammar judge. Determine if the student's spoken answer is grammatically and semantically equivalent to the expected answer. Return only valid JSON with keys: isCorrect (boolean), reason (string in Chinese)."},
+                {"role": "user", "content": validate_prompt},
+            ],
+            temperature=0.2,
+            cache="grammar_validate",
+        )
+        result = parse_llm_json(raw)
+    except (json.JSONDecodeError, RuntimeError):
+        return {"transcription": transcription, "isCorrect": False, "reason": "AI 判定失败，请重试"}
+
+    return {
+        "transcription": transcription,
+        "isCorrect": bool(result.get("isCorrect", False)),
+        "reason": result.get("reason", ""),
+    }
@@ -0,0 +1,146 @@
+"""Shared pooled HTTP transport for all DashScope calls.
+
+One keep-alive ``httpx.AsyncClient`` (plus a sync twin for scripts) is reused
+by every engine module, so TLS handshakes happen once per connection instead
+of once per call, and a per-host semaphore caps how many requests we keep in
+flight against any single upstream host.
+"""
+import asyncio
+import os
+import ssl
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+DEFAULT_TIMEOUT = 60.0
+
+# A single SSL context is shared by both clients so certificate stores are
+# loaded once and every pooled connection reuses the same TLS configuration.
+_ssl_context = ssl.create_default_context()
+_limits = httpx.Limits(
+    max_connections=MAX_CONNECTIONS,
+    max_keepalive_connections=MAX_CONNECTIONS,
+    keepalive_expiry=KEEPALIVE_EXPIRY,
+)
+
+_async_client: Optional[httpx.AsyncClient] = None
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+_host_slots: Dict[str, asyncio.Semaphore] = {}
+
+_sync_client: Optional[httpx.Client] = None
+_sync_lock = threading.Lock()
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """Return the pooled async client bound to the running event loop."""
+    global _async_client, _async_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_loop is not loop or _async_client.is_closed:
+        # Connections cannot be shared across event loops (e.g. repeated
+        # asyncio.run() in scripts), so a new loop gets a fresh pool.
+        _async_client = httpx.AsyncClient(
+            verify=_ssl_context,
+            limits=_limits,
+            timeout=DEFAULT_TIMEOUT,
+            follow_redirects=True,
+        )
+        _async_loop = loop
+        _host_slots.clear()
+    return _async_client
+
+
+def _get_sync_client() -> httpx.Client:
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = httpx.Client(
+                verify=_ssl_context,
+                limits=_limits,
+                timeout=DEFAULT_TIMEOUT,
+                follow_redirects=True,
+            )
+        return _sync_client
+
+
+def _host_slot(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc
+    slot = _host_slots.get(host)
+    if slot is None:
+        slot = _host_slots[host] = asyncio.Semaphore(MAX_CONNECTIONS_PER_HOST)
+    return slot
+
+
+async def request(
+    method: str,
+    url: str,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    json: Any = None,
+    content: Any = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> httpx.Response:
+    """Send a request over the shared async pool and return the full response.
+
+    Non-2xx responses are returned as-is so callers can build their own error
+    messages; connection problems raise ``httpx.HTTPError``.
+    """
+    client = _get_async_client()
+    async with _host_slot(url):
+        return await client.request(
+            method, url, headers=headers, json=json, content=content, timeout=timeout,
+        )
+
+
+@asynccontextmanager
+async def stream(
+    method: str,
+    url: str,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    json: Any = None,
+    content: Any = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> AsyncIterator[httpx.Response]:
+    """Like :func:`request`, but yields the response before its body is read.
+
+    The host slot and pooled connection stay held until the block exits.
+    """
+    client = _get_async_client()
+    async with _host_slot(url):
+        async with client.stream(
+            method, url, headers=headers, json=json, content=content, timeout=timeout,
+        ) as resp:
+            yield resp
+
+
+def request_sync(
+    method: str,
+    url: str,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    json: Any = None,
+    content: Any = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> httpx.Response:
+    """Blocking counterpart of :func:`request` for scripts and CLI tools."""
+    return _get_sync_client().request(
+        method, url, headers=headers, json=json, content=content, timeout=timeout,
+    )
+
+
+async def aclose() -> None:
+    """Close pooled connections (called on application shutdown)."""
+    global _async_client, _sync_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    with _sync_lock:
+        if _sync_client is not None:
+            _sync_client.close()
+            _sync_client = None
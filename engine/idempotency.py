@@ -0,0 +1,116 @@
+"""Idempotent execution of expensive requests.
+
+A client that times out and retries used to start a second full
+evaluation next to the first. Requests are identified by their
+``Idempotency-Key`` header, or by a hash of their content when none is
+sent. A duplicate of a running request attaches to the original's task,
+and finished results are replayed from a short-lived store. The work runs
+as its own task, so a retry can still pick up the result after the first
+client has gone away.
+"""
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+REPLAY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_REPLAY_TTL_S", "600"))
+MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "256"))
+
+
+class IdempotencyConflict(ValueError):
+    """The Idempotency-Key was already used for a different request."""
+
+
+def request_key(scope: str, idempotency_key: Optional[str], *parts: Any) -> Tuple[str, str]:
+    """``(key, fingerprint)`` for a request; the fingerprint hashes its content."""
+    fingerprint = hashlib.sha256(
+        "\x1f".join(str(p) for p in parts).encode("utf-8")
+    ).hexdigest()
+    idempotency_key = (idempotency_key or "").strip()
+    if idempotency_key:
+        return f"{scope}:key:{hashlib.sha256(idempotency_key.encode('utf-8')).hexdigest()}", fingerprint
+    return f"{scope}:hash:{fingerprint}", fingerprint
+
+
+class IdempotentRunner:
+    def __init__(self, ttl: float = REPLAY_TTL_SECONDS, max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (expires_at, fingerprint, result), least recently stored first
+        self._done: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Tuple[str, asyncio.Task]] = {}
+        self._stats = {"executed": 0, "coalesced": 0, "replayed": 0, "conflicts": 0}
+
+    def _check(self, key: str, fingerprint: str, stored: str) -> None:
+        if stored != fingerprint:
+            self._stats["conflicts"] += 1
+            raise IdempotencyConflict(f"Idempotency key reused with a different request ({key.split(':', 1)[0]}).")
+
+    def replay(self, key: str, fingerprint: str) -> Optional[Any]:
+        """A finished result for ``key``, or None; raises IdempotencyConflict."""
+        entry = self._done.get(key)
+        if entry is None:
+            return None
+        expires_at, stored, result = entry
+        if expires_at <= time.monotonic():
+            del self._done[key]
+            return None
+        self._check(key, fingerprint, stored)
+        self._stats["replayed"] += 1
+        return result
+
+    def attach(self, key: str, fingerprint: str) -> Optional[Awaitable[Any]]:
+        """A waiter on the running request for ``key``, or None; raises IdempotencyConflict.
+
+        Lets a handler join a duplicate before doing its own preparation.
+        """
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            return None
+        self._check(key, fingerprint, inflight[0])
+        self._stats["coalesced"] += 1
+        waiter = asyncio.shield(inflight[1])
+        # Mark the exception as retrieved even if the handler never awaits.
+        waiter.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return waiter
+
+    def _store(self, key: str, fingerprint: str, result: Any) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        self._done.pop(key, None)
+        self._done[key] = (time.monotonic() + self.ttl, fingerprint, result)
+        while len(self._done) > self.max_entries:
+            self._done.popitem(last=False)
+
+    async def run(
+        self, key: str, fingerprint: str, work: Callable[[], Awaitable[Any]],
+    ) -> Tuple[Any, str]:
+        """Run ``work`` once per key; returns ``(result, "executed"|"coalesced"|"replayed")``.
+
+        Failures are not stored: waiters attached to a failing run see its
+        exception and the next request runs again.
+        """
+        result = self.replay(key, fingerprint)
+        if result is not None:
+            return result, "replayed"
+
+        joined = self.attach(key, fingerprint)
+        if joined is not None:
+            return await joined, "coalesced"
+
+        self._stats["executed"] += 1
+        task = asyncio.ensure_future(work())
+        self._inflight[key] = (fingerprint, task)
+
+        def finished(t: asyncio.Task) -> None:
+            self._inflight.pop(key, None)
+            if not t.cancelled() and t.exception() is None:
+                self._store(key, fingerprint, t.result())
+
+        task.add_done_callback(finished)
+        return await asyncio.shield(task), "executed"
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "inflight": len(self._inflight), "stored": len(self._done)}
@@ -1,13 +1,11 @@
-import asyncio
 import json
 import os
-import urllib.error
-import urllib.request
+
+from . import http_client, task_poller
 
 DASHSCOPE_IMAGE_URL = (
     "https://dashscope.aliyuncs.com/api/v1/services/aigc/text2image/image-synthesis"
 )
-DASHSCOPE_TASK_URL = "https://dashscope.aliyuncs.com/api/v1/tasks"
 DEFAULT_IMAGE_MODEL = "wanx2.1-t2i-turbo"
 
 
@@ -16,6 +14,37 @@ class ImageGenError(Exception):
     pass
 
 
+def normalize_words(words: str) -> str:
+    """Comma-separated anchor words, deduplicated and sorted case-insensitively."""
+    seen = {}
+    for word in words.split(","):
+        word = " ".join(word.split())
+        if word and word.lower() not in seen:
+            seen[word.lower()] = word
+    return ", ".join(seen[k] for k in sorted(seen))
+
+
+def build_image_prompt(prompt: str = "", words: str = "") -> str:
+    """Text-free scene prompt for a set of vocabulary words and/or a scene description.
+
+    Words are normalized so the same anchor set always yields the same prompt.
+    """
+    scene = " ".join((prompt or "").split())
+    word_list = normalize_words(words or "")
+    if not word_list:
+        return f"{scene} No text, no labels, no words in the image." if scene else ""
+
+    # Build a prompt that visually represents the selected vocabulary words
+    parts = [
+        "A photorealistic scene without any text, words, labels, or watermarks.",
+        f"The scene naturally shows: {word_list}.",
+    ]
+    if scene:
+        parts.append(f"Scene context: {scene}.")
+    parts.append("Style: high quality photograph, vivid colors, no text overlay, no captions, no annotations.")
+    return " ".join(parts)
+
+
 async def generate_image(prompt: str) -> str:
     """Generate an image from a text prompt using DashScope Wanx.
 
@@ -30,29 +59,31 @@ async def generate_image(prompt: str) -> str:
         raise ImageGenError("图片生成提示词为空")
 
     # Step 1: Submit async image generation task
-    payload = json.dumps({
+    payload = {
         "model": DEFAULT_IMAGE_MODEL,
         "input": {"prompt": prompt.strip()},
         "parameters": {"n": 1, "size": "512*512"},
-    }).encode("utf-8")
-
-    req = urllib.request.Request(
-        url=DASHSCOPE_IMAGE_URL,
-        data=payload,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-            "X-DashScope-Async": "enable",
-        },
-        method="POST",
-    )
+    }
 
     try:
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            submit_data = json.loads(resp.read().decode("utf-8"))
-    except urllib.error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="ignore")[:500]
-        print(f"[ERROR] image_gen submit HTTP {exc.code}: {detail}")
+        resp = await http_client.request(
+            "POST",
+            DASHSCOPE_IMAGE_URL,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {api_key}",
+                "X-DashScope-Async": "enable",
+            },
+            json=payload,
+            timeout=15,
+        )
+    except Exception as e:
+        print(f"[ERROR] image_gen submit failed: {e}")
+        raise ImageGenError(f"图片生成请求异常: {e}")
+
+    if resp.status_code >= 400:
+        detail = resp.text[:500]
+        print(f"[ERROR] image_gen submit HTTP {resp.status_code}: {detail}")
         # Try to extract DashScope error code/message
         try:
             err_json = json.loads(detail)
@@ -65,9 +96,11 @@ async def generate_image(prompt: str) -> str:
         except (json.JSONDecodeError, ImageGenError) as parse_err:
             if isinstance(parse_err, ImageGenError):
                 raise
-        raise ImageGenError(f"DashScope 图片生成请求失败 (HTTP {exc.code}): {detail[:200]}")
-    except Exception as e:
-        print(f"[ERROR] image_gen submit failed: {e}")
+        raise ImageGenError(f"DashScope 图片生成请求失败 (HTTP {resp.status_code}): {detail[:200]}")
+
+    try:
+        submit_data = resp.json()
+    except ValueError as e:
         raise ImageGenError(f"图片生成请求异常: {e}")
 
     task_id = submit_data.get("output", {}).get("task_id", "")
@@ -76,34 +109,18 @@ async def generate_image(prompt: str) -> str:
 
     print(f"[INFO] image_gen: task submitted, task_id={task_id}")
 
-    # Step 2: Poll for task completion (non-blocking)
-    task_url = f"{DASHSCOPE_TASK_URL}/{task_id}"
-    last_poll_error = ""
-    for attempt in range(30):  # max 60 seconds (poll every 2s)
-        await asyncio.sleep(2)
-        try:
-            poll_req = urllib.request.Request(
-                url=task_url,
-                headers={"Authorization": f"Bearer {api_key}"},
-            )
-            with urllib.request.urlopen(poll_req, timeout=10) as resp:
-                poll_data = json.loads(resp.read().decode("utf-8"))
-        except Exception as e:
-            last_poll_error = str(e)
-            print(f"[WARN] image_gen poll attempt {attempt} failed: {e}")
-            continue
-
-        status = poll_data.get("output", {}).get("task_status", "")
-        if status == "SUCCEEDED":
-            results = poll_data.get("output", {}).get("results", [])
-            if results:
-                url = results[0].get("url", "")
-                print(f"[INFO] image_gen: success, url={url[:80]}...")
-                return url
-            raise ImageGenError("图片生成成功但结果为空 (SUCCEEDED with no results)")
-        elif status == "FAILED":
-            msg = poll_data.get("output", {}).get("message", "unknown")
-            print(f"[ERROR] image_gen: task FAILED: {msg}")
-            raise ImageGenError(f"图片生成任务失败: {msg}")
-
-    raise ImageGenError(f"图片生成超时 (60秒)，最后轮询错误: {last_poll_error or 'none'}")
+    # Step 2: Wait for task completion on the shared poller (non-blocking)
+    try:
+        output = await task_poller.wait_for_task(task_id, api_key, timeout=60)
+    except task_poller.TaskFailed as e:
+        print(f"[ERROR] image_gen: task FAILED: {e}")
+        raise ImageGenError(f"图片生成任务失败: {e}")
+    except task_poller.TaskTimeout as e:
+        raise ImageGenError(f"图片生成超时 (60秒)，最后轮询错误: {e}")
+
+    results = output.get("results", [])
+    if results:
+        url = results[0].get("url", "")
+        print(f"[INFO] image_gen: success, url={url[:80]}...")
+        return url
+    raise ImageGenError("图片生成成功但结果为空 (SUCCEEDED with no results)")
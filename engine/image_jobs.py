@@ -0,0 +1,185 @@
+"""Background job queue for scene-image generation.
+
+Generating a picture takes up to a minute of Wanx polling, which used to
+hold the HTTP request (and a proxy slot) open the whole time. Jobs are
+submitted instead: the client gets a job id at once and polls or
+subscribes to its status over SSE while a fixed pool of workers, which
+also caps concurrent Wanx tasks, does the work through ``image_store``.
+Jobs are deduplicated by prompt hash, and finished ones are kept for a
+TTL so late pollers and repeat submissions still find the result.
+"""
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .image_gen import ImageGenError
+from .image_store import image_store, prompt_key
+
+WORKERS = int(os.getenv("IMAGE_JOB_WORKERS", "2"))
+MAX_QUEUED = int(os.getenv("IMAGE_JOB_MAX_QUEUED", "64"))
+RESULT_TTL_SECONDS = float(os.getenv("IMAGE_JOB_TTL_S", "900"))
+
+FINISHED = ("succeeded", "failed")
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+@dataclass
+class ImageJob:
+    id: str
+    key: str
+    prompt: str
+    status: str = "queued"  # queued -> running -> succeeded | failed
+    url: str = ""
+    error: str = ""
+    cached: bool = False
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "url": self.url,
+            "error": self.error,
+            "cached": self.cached,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    def _update(self, **changes: Any) -> None:
+        for name, value in changes.items():
+            setattr(self, name, value)
+        if self.finished:
+            self.finished_at = time.time()
+        # Wake current waiters; later ones wait on a fresh event.
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_change(self, timeout: float) -> bool:
+        """Wait for the next status change; False on timeout."""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class ImageJobManager:
+    def __init__(self, workers: int = WORKERS, max_queued: int = MAX_QUEUED, ttl: float = RESULT_TTL_SECONDS):
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self._jobs: Dict[str, ImageJob] = {}
+        self._by_key: Dict[str, ImageJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stats = {"submitted": 0, "deduplicated": 0, "succeeded": 0, "failed": 0, "rejected": 0}
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.ttl
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and job.finished_at < cutoff:
+                del self._jobs[job_id]
+                if self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+
+    def _ensure_workers(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return self._queue
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            try:
+                job._update(status="running")
+                url, source = await image_store.get_or_generate(job.prompt)
+                job._update(status="succeeded", url=url, cached=source == "disk")
+                self._stats["succeeded"] += 1
+            except asyncio.CancelledError:
+                job._update(status="failed", error="服务已停止")
+                raise
+            except ImageGenError as e:
+                job._update(status="failed", error=str(e))
+                self._stats["failed"] += 1
+            except Exception as e:
+                print(f"[WARN] image_jobs: job {job.id} failed: {e}")
+                job._update(status="failed", error=f"图片生成异常: {e}")
+                self._stats["failed"] += 1
+            finally:
+                queue.task_done()
+
+    def submit(self, prompt: str) -> ImageJob:
+        """Queue a generation job, or return the live/finished job for the same prompt.
+
+        Raises ImageGenError for an empty prompt and JobQueueFull when the
+        backlog is at its limit.
+        """
+        if not prompt or not prompt.strip():
+            raise ImageGenError("图片生成提示词为空")
+        self._prune()
+        key = prompt_key(prompt)
+        existing = self._by_key.get(key)
+        # A succeeded job is only reused while its image is still in the store;
+        # after an eviction (or for a temporary remote URL) it is generated again.
+        if existing is not None and existing.status != "failed" and (
+            existing.status != "succeeded" or image_store.lookup(key) is not None
+        ):
+            self._stats["deduplicated"] += 1
+            return existing
+
+        job = ImageJob(id=uuid.uuid4().hex, key=key, prompt=prompt)
+        stored = image_store.lookup(key)
+        if stored is not None:
+            # Already on disk: finished before it is even queued.
+            job._update(status="succeeded", url=stored.url, cached=True)
+            self._stats["succeeded"] += 1
+        else:
+            queue = self._ensure_workers()
+            if queue.qsize() >= self.max_queued:
+                self._stats["rejected"] += 1
+                raise JobQueueFull("图片生成队列已满，请稍后重试")
+            queue.put_nowait(job)
+        self._stats["submitted"] += 1
+        self._jobs[job.id] = job
+        self._by_key[key] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[ImageJob]:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    async def wait(self, job: ImageJob, timeout: float) -> ImageJob:
+        deadline = time.monotonic() + timeout
+        while not job.finished:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not await job.wait_change(remaining):
+                break
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        queued = self._queue.qsize() if self._queue is not None else 0
+        running = sum(1 for job in self._jobs.values() if job.status == "running")
+        return {**self._stats, "queued": queued, "running": running, "workers": self.workers, "jobs": len(self._jobs)}
+
+    async def aclose(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks, self._queue = [], None
+
+
+image_jobs = ImageJobManager()
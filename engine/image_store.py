@@ -0,0 +1,255 @@
+"""Local store for generated scene images.
+
+DashScope returns a temporary result URL that expires, and every
+PracticeBank card used to regenerate its picture with a ~60 s synthesis
+job even when the anchor-word set was the same as minutes before. Images
+are keyed on sha256(model, normalized prompt), downloaded once,
+transcoded to a compact WebP thumbnail and kept in a size-bounded on-disk
+LRU served from ``/media/images/<key>.webp``. Concurrent misses for the
+same prompt share one synthesis job. The directory scan, stat, utime and
+eviction unlinks run in worker threads; a request only consults the
+in-memory index.
+
+Without Pillow the downloaded image is stored unchanged.
+"""
+import asyncio
+import hashlib
+import io
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import http_client
+from .image_gen import DEFAULT_IMAGE_MODEL, ImageGenError, generate_image
+from .singleflight import SingleFlight
+
+try:
+    from PIL import Image
+except ImportError:  # optional: store the original bytes
+    Image = None
+
+CACHE_DIR = Path(
+    os.getenv("IMAGE_CACHE_DIR")
+    or Path(__file__).resolve().parents[1] / "data" / "cache" / "images"
+)
+DISK_BYTES = int(float(os.getenv("IMAGE_CACHE_DISK_MB", "256")) * 1024 * 1024)
+THUMB_PX = int(os.getenv("IMAGE_THUMB_PX", "512"))
+WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+MAX_DOWNLOAD_BYTES = 20 * 1024 * 1024
+
+MEDIA_PREFIX = "/media/images"
+# Keys are content hashes of the prompt, so a stored image never changes.
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+CONTENT_TYPES = {"webp": "image/webp", "png": "image/png", "jpg": "image/jpeg"}
+FILE_NAME = re.compile(r"^[0-9a-f]{64}\.(webp|png|jpg)$")
+
+
+def prompt_key(prompt: str, model: str = DEFAULT_IMAGE_MODEL) -> str:
+    normalized = " ".join(prompt.split()).lower()
+    return hashlib.sha256(f"{model}\x1f{normalized}".encode("utf-8")).hexdigest()
+
+
+def transcode(data: bytes) -> Tuple[bytes, str]:
+    """``(image bytes, extension)``: a WebP thumbnail, or the original when Pillow is unavailable."""
+    if Image is None:
+        ext = "png" if data[:8] == b"\x89PNG\r\n\x1a\n" else "jpg"
+        return data, ext
+    with Image.open(io.BytesIO(data)) as img:
+        img.thumbnail((THUMB_PX, THUMB_PX))
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGB")
+        out = io.BytesIO()
+        img.save(out, format="WEBP", quality=WEBP_QUALITY, method=4)
+    return out.getvalue(), "webp"
+
+
+@dataclass
+class StoredImage:
+    name: str  # "<key>.<ext>"
+    source: str  # "disk" or "miss"
+
+    @property
+    def url(self) -> str:
+        return f"{MEDIA_PREFIX}/{self.name}"
+
+
+class ImageStore:
+    def __init__(self, directory: Path = CACHE_DIR, disk_bytes: int = DISK_BYTES):
+        self.directory = Path(directory)
+        self.disk_bytes = disk_bytes
+        # file name -> size, least recently used first
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._ready = False
+        self._scan_lock = asyncio.Lock()
+        self._inflight: SingleFlight[Tuple[str, str]] = SingleFlight()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "download_errors": 0}
+
+    # ---- index (file system work runs off the event loop) -------------
+
+    def _list_disk(self) -> List[Tuple[int, str, int]]:
+        """``(mtime_ns, name, size)`` of stored images, least recently used first."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self.directory.iterdir():
+            if FILE_NAME.match(path.name):
+                stat = path.stat()
+                entries.append((stat.st_mtime_ns, path.name, stat.st_size))
+        return sorted(entries)
+
+    async def _scan(self) -> None:
+        """Index existing files once, least recently used first (mtime)."""
+        async with self._scan_lock:
+            if self._ready:
+                return
+            try:
+                entries = await asyncio.to_thread(self._list_disk)
+            except OSError as e:
+                print(f"[WARN] image_store: disk store unavailable ({e})")
+                self.disk_bytes = 0
+            else:
+                for _, name, size in entries:
+                    self._files[name] = size
+                    self._size += size
+                await self._evict()
+            self._ready = True
+
+    def _remove(self, names: List[str]) -> None:
+        for name in names:
+            try:
+                (self.directory / name).unlink()
+            except OSError:
+                pass
+
+    async def _evict(self) -> None:
+        victims = []
+        while self._size > self.disk_bytes and self._files:
+            name, size = self._files.popitem(last=False)
+            self._size -= size
+            self._stats["evictions"] += 1
+            victims.append(name)
+        if victims:
+            await asyncio.to_thread(self._remove, victims)
+
+    def _touch(self, path: Path) -> None:
+        try:
+            os.utime(path)  # persist recency for the next startup scan
+        except OSError:
+            pass
+
+    def _size_on_disk(self, name: str) -> Optional[int]:
+        try:
+            return (self.directory / name).stat().st_size
+        except OSError:
+            return None
+
+    async def _adopt(self, names: List[str]) -> Optional[str]:
+        """Index the first of ``names`` written by another process (e.g. another uvicorn worker)."""
+        for name in names:
+            size = await asyncio.to_thread(self._size_on_disk, name)
+            if size is not None:
+                self._size += size - self._files.pop(name, 0)
+                self._files[name] = size
+                await self._evict()
+                return name if name in self._files else None
+        return None
+
+    def _hit(self, name: str) -> Path:
+        self._files.move_to_end(name)
+        path = self.directory / name
+        asyncio.get_running_loop().run_in_executor(None, self._touch, path)
+        return path
+
+    def forget(self, name: str) -> None:
+        """Drop ``name`` from the index after its file turned out to be gone."""
+        size = self._files.pop(name, None)
+        if size is not None:
+            self._size -= size
+
+    async def path(self, name: str) -> Optional[Path]:
+        """File for a ``/media/images/<name>`` request, refreshing its recency."""
+        if not FILE_NAME.match(name):
+            return None
+        if not self._ready:
+            await self._scan()
+        if name not in self._files and await self._adopt([name]) is None:
+            return None
+        return self._hit(name)
+
+    def lookup(self, key: str) -> Optional[StoredImage]:
+        """Indexed image for ``key``; a pure index check, never touches the disk."""
+        for ext in CONTENT_TYPES:
+            if f"{key}.{ext}" in self._files:
+                return StoredImage(f"{key}.{ext}", "disk")
+        return None
+
+    def _write(self, name: str, data: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / name
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    async def _download(self, url: str) -> bytes:
+        resp = await http_client.request("GET", url, timeout=30)
+        resp.raise_for_status()
+        if len(resp.content) > MAX_DOWNLOAD_BYTES:
+            raise ValueError(f"image larger than {MAX_DOWNLOAD_BYTES} bytes")
+        return resp.content
+
+    async def _generate_and_store(self, key: str, prompt: str) -> Tuple[Optional[StoredImage], str]:
+        url = await generate_image(prompt)
+        try:
+            data, ext = await asyncio.to_thread(transcode, await self._download(url))
+            name = f"{key}.{ext}"
+            if self.disk_bytes <= 0 or len(data) > self.disk_bytes:
+                raise OSError("image store disabled or too small")
+            await asyncio.to_thread(self._write, name, data)
+        except Exception as e:
+            # The temporary DashScope URL still works for a while.
+            self._stats["download_errors"] += 1
+            print(f"[WARN] image_store: keeping remote URL for {key[:12]} ({str(e)[:100]})")
+            return None, url
+        self._size += len(data) - self._files.pop(name, 0)
+        self._files[name] = len(data)
+        await self._evict()
+        return StoredImage(name, "miss"), url
+
+    async def get_or_generate(self, prompt: str) -> Tuple[str, str]:
+        """``(url, source)`` for a prompt; source is "disk", "miss", "coalesced" or "remote".
+
+        Raises ImageGenError like :func:`generate_image`.
+        """
+        if not prompt or not prompt.strip():
+            raise ImageGenError("图片生成提示词为空")
+        if not self._ready:
+            await self._scan()
+        key = prompt_key(prompt)
+        hit = self.lookup(key)
+        if hit is None and key not in self._inflight:
+            adopted = await self._adopt([f"{key}.{ext}" for ext in CONTENT_TYPES])
+            hit = StoredImage(adopted, "disk") if adopted else None
+        if hit is not None:
+            self._hit(hit.name)
+            self._stats["hits"] += 1
+            return hit.url, "disk"
+
+        async def generate() -> Tuple[str, str]:
+            stored, remote_url = await self._generate_and_store(key, prompt)
+            return (stored.url, "miss") if stored else (remote_url, "remote")
+
+        if key in self._inflight:
+            self._stats["coalesced"] += 1
+            url, _ = await self._inflight.do(key, generate)
+            return url, "coalesced"
+        self._stats["misses"] += 1
+        return await self._inflight.do(key, generate)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "entries": len(self._files), "bytes": self._size}
+
+
+image_store = ImageStore()
@@ -0,0 +1,191 @@
+"""Micro-batching of small concurrent LLM tasks.
+
+Short JSON prompts (a word translation, a grammar hint) spend most of
+their latency and request quota on the round trip itself, and at peak
+hundreds of them arrive per second. Call sites opt in by task name
+(``llm_client.achat(..., batch="translate_word")``), but only if their
+system prompt does not forbid the packed reply's shape (one JSON object),
+e.g. "Return only a JSON array". Requests of the same task, system prompt
+and temperature that arrive within a window of a few milliseconds are
+packed into one prompt that lists them by id and asks for a JSON object
+mapping each id to its answer. Each caller then gets its own answer back
+as JSON text, as if it had asked alone. When the packed reply does not
+parse, or lacks some ids, those requests are retried as individual calls.
+
+The batch runs in whichever context flushes it, so each item keeps its
+caller's context and the call receives the contexts it answers for:
+``llm_client`` splits a packed call's token usage evenly across them.
+"""
+import asyncio
+import contextvars
+import json
+import os
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .llm_json import parse_llm_json
+
+ENABLED = os.getenv("LLM_BATCH", "1").strip() != "0"
+WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "8"))
+MAX_ITEMS = int(os.getenv("LLM_BATCH_MAX_ITEMS", "16"))
+
+PACKING_INSTRUCTIONS = (
+    "\n\nYou will receive several independent requests as a JSON array of "
+    '{"id": "...", "request": "..."} objects. Handle each request on its own, exactly as '
+    "instructed above, and return one JSON object that maps every id to that request's JSON "
+    "answer. Do NOT use markdown code fences."
+)
+
+Messages = List[Dict[str, Any]]
+# (messages, temperature, contexts of the callers answered; None for the current one)
+Call = Callable[[Messages, float, Optional[List[contextvars.Context]]], Awaitable[str]]
+
+
+class _Batch:
+    def __init__(self, task: str, system: str, temperature: float):
+        self.task = task
+        self.system = system
+        self.temperature = temperature
+        # (user prompt, caller's future, caller's context)
+        self.items: List[Tuple[str, asyncio.Future, contextvars.Context]] = []
+
+
+def split_reply(raw: str, count: int) -> Dict[int, str]:
+    """Answers of a packed reply by item index, re-serialized as JSON; raises ValueError."""
+    data = parse_llm_json(raw)
+    if not isinstance(data, dict):
+        raise ValueError("packed reply is not a JSON object")
+    answers = {}
+    for index in range(count):
+        answer = data.get(str(index))
+        if answer is not None:
+            answers[index] = json.dumps(answer, ensure_ascii=False)
+    return answers
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        call: Call,
+        window_ms: float = WINDOW_MS,
+        max_items: int = MAX_ITEMS,
+    ):
+        self._call = call
+        self.window_ms = window_ms
+        self.max_items = max_items
+        self._open: Dict[Tuple[str, str, float], _Batch] = {}
+        self._running: Set[asyncio.Task] = set()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._sizes: Dict[str, Counter] = {}
+
+    def _count(self, task: str, field: str, n: int = 1) -> None:
+        counters = self._stats.setdefault(
+            task, {"requests": 0, "llm_calls": 0, "packed_calls": 0, "parse_failures": 0, "fallback_items": 0},
+        )
+        counters[field] += n
+
+    async def submit(self, task: str, messages: Messages, temperature: float) -> str:
+        """Content for ``[system, user]`` messages, answered alone or as part of a packed call."""
+        self._count(task, "requests")
+        if (
+            not ENABLED or self.window_ms <= 0 or self.max_items <= 1
+            or [m.get("role") for m in messages] != ["system", "user"]
+        ):
+            self._count(task, "llm_calls")
+            self._sizes.setdefault(task, Counter())[1] += 1
+            return await self._call(messages, temperature, None)
+
+        loop = asyncio.get_running_loop()
+        key = (task, messages[0]["content"], temperature)
+        batch = self._open.get(key)
+        if batch is None:
+            batch = self._open[key] = _Batch(task, messages[0]["content"], temperature)
+            loop.call_later(self.window_ms / 1000, self._flush, key, batch)
+        future = loop.create_future()
+        batch.items.append((messages[1]["content"], future, contextvars.copy_context()))
+        if len(batch.items) >= self.max_items:
+            self._flush(key, batch)
+        return await future
+
+    def _flush(self, key: Tuple[str, str, float], batch: _Batch) -> None:
+        # The window timer also fires for a batch already flushed at max_items.
+        if self._open.get(key) is not batch:
+            return
+        del self._open[key]
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: _Batch) -> None:
+        items = [item for item in batch.items if not item[1].done()]
+        try:
+            if not items:
+                return
+            self._sizes.setdefault(batch.task, Counter())[len(items)] += 1
+            if len(items) == 1:
+                await self._single(batch, *items[0])
+                return
+
+            self._count(batch.task, "llm_calls")
+            self._count(batch.task, "packed_calls")
+            packed = json.dumps(
+                [{"id": str(i), "request": prompt} for i, (prompt, _, _) in enumerate(items)], ensure_ascii=False,
+            )
+            try:
+                raw = await self._call(
+                    [
+                        {"role": "system", "content": batch.system + PACKING_INSTRUCTIONS},
+                        {"role": "user", "content": packed},
+                    ],
+                    batch.temperature,
+                    [ctx for _, _, ctx in items],
+                )
+            except Exception as exc:
+                for _, future, _ in items:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+            try:
+                answers = split_reply(raw, len(items))
+            except ValueError as e:
+                self._count(batch.task, "parse_failures")
+                print(f"[WARN] llm_batcher: {batch.task} packed reply unparseable ({e}); answering singly")
+                answers = {}
+            for index, (_, future, _) in enumerate(items):
+                if index in answers and not future.done():
+                    future.set_result(answers[index])
+            retry = [item for index, item in enumerate(items) if index not in answers]
+            if retry:
+                self._count(batch.task, "fallback_items", len(retry))
+                await asyncio.gather(*(self._single(batch, *item) for item in retry))
+        finally:
+            for _, future, _ in items:
+                if not future.done():
+                    future.cancel()
+
+    async def _single(self, batch: _Batch, prompt: str, future: asyncio.Future, ctx: contextvars.Context) -> None:
+        self._count(batch.task, "llm_calls")
+        try:
+            content = await self._call(
+                [{"role": "system", "content": batch.system}, {"role": "user", "content": prompt}],
+                batch.temperature,
+                [ctx],
+            )
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+        else:
+            if not future.done():
+                future.set_result(content)
+
+    def stats(self) -> Dict[str, Any]:
+        tasks = {}
+        for task, counters in self._stats.items():
+            sizes = self._sizes.get(task, Counter())
+            batches = sum(sizes.values())
+            tasks[task] = {
+                **counters,
+                "mean_batch_size": round(sum(n * c for n, c in sizes.items()) / batches, 2) if batches else 0.0,
+                "batch_sizes": {str(n): sizes[n] for n in sorted(sizes)},
+            }
+        return {"enabled": ENABLED, "window_ms": self.window_ms, "max_items": self.max_items, "tasks": tasks}
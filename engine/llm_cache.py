@@ -0,0 +1,237 @@
+"""Opt-in response cache for deterministic LLM calls.
+
+Many prompts are pure functions of their inputs (a word translation, a
+grammar hint for one error/correction pair, a direct-example polish), and
+the same vocabulary is looked up thousands of times a day. Call sites opt
+in by name (``llm_client.achat(..., cache="translate_word")``); each name
+has a policy with a TTL and a temperature ceiling above which the call is
+too random to cache. Responses are keyed on sha256(model, messages,
+temperature) and kept in an in-memory LRU backed by a SQLite file, so
+they survive restarts. Hit rates are counted per call site.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .llm_json import parse_llm_json
+from .singleflight import SingleFlight
+
+ENABLED = os.getenv("LLM_CACHE", "1").strip() != "0"
+DB_PATH = Path(
+    os.getenv("LLM_CACHE_DB")
+    or Path(__file__).resolve().parents[1] / "data" / "cache" / "llm_cache.sqlite3"
+)
+MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "4096"))
+DB_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DB_MAX_ENTRIES", "200000"))
+# Expired/over-limit rows are pruned once every this many writes.
+PRUNE_EVERY = 500
+
+DAY = 86400.0
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl_s: float
+    # Calls hotter than this are not cached (or served from cache).
+    max_temperature: float
+    # Only store responses that parse as JSON (after stripping ``` fences).
+    json_only: bool = True
+
+
+POLICIES: Dict[str, CachePolicy] = {
+    "translate_word": CachePolicy(ttl_s=30 * DAY, max_temperature=0.3),
+    "polish_direct": CachePolicy(ttl_s=7 * DAY, max_temperature=0.7),
+    "grammar_hint": CachePolicy(ttl_s=7 * DAY, max_temperature=0.5),
+    "grammar_validate": CachePolicy(ttl_s=1 * DAY, max_temperature=0.2),
+}
+
+
+def cache_key(model: str, messages: List[Dict[str, Any]], temperature: float) -> str:
+    blob = json.dumps(
+        {"model": model, "messages": messages, "temperature": round(float(temperature), 3)},
+        ensure_ascii=False, sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _is_json(content: str) -> bool:
+    try:
+        parse_llm_json(content)
+    except ValueError:
+        return False
+    return True
+
+
+class LLMCache:
+    def __init__(self, db_path: Optional[Path] = DB_PATH, memory_entries: int = MEMORY_ENTRIES,
+                 db_max_entries: int = DB_MAX_ENTRIES):
+        self.db_path = Path(db_path) if db_path else None
+        self.memory_entries = memory_entries
+        self.db_max_entries = db_max_entries
+        # key -> (expires_at, content), least recently used first
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_ready = False
+        self._db_lock = threading.Lock()
+        self._writes = 0
+        self._inflight: SingleFlight[str] = SingleFlight()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    # ---- policy / stats ----------------------------------------------
+
+    def policy(self, site: Optional[str], temperature: float) -> Optional[CachePolicy]:
+        """The site's policy if this call may use the cache, else None."""
+        if not ENABLED or not site:
+            return None
+        policy = POLICIES.get(site)
+        if policy is None:
+            print(f"[WARN] llm_cache: unknown call site '{site}', not caching")
+            return None
+        if temperature > policy.max_temperature:
+            self._count(site, "bypassed")
+            return None
+        return policy
+
+    def _count(self, site: str, field: str) -> None:
+        counters = self._stats.setdefault(
+            site, {"hits_memory": 0, "hits_disk": 0, "misses": 0, "coalesced": 0, "bypassed": 0, "not_stored": 0},
+        )
+        counters[field] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        sites = {}
+        for site, counters in self._stats.items():
+            hits = counters["hits_memory"] + counters["hits_disk"]
+            lookups = hits + counters["misses"] + counters["coalesced"]
+            sites[site] = {**counters, "hit_rate": round(hits / lookups, 4) if lookups else 0.0}
+        return {"enabled": ENABLED, "memory_entries": len(self._memory), "sites": sites}
+
+    # ---- SQLite tier -------------------------------------------------
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._db_ready:
+            return self._db
+        self._db_ready = True
+        if self.db_path is None:
+            return None
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, site TEXT NOT NULL, content TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created_at)")
+            db.commit()
+            self._db = db
+        except sqlite3.Error as e:
+            print(f"[WARN] llm_cache: SQLite tier unavailable ({e}); memory only")
+        return self._db
+
+    def _db_get(self, key: str) -> Optional[Tuple[float, str]]:
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return None
+            try:
+                row = db.execute(
+                    "SELECT expires_at, content FROM responses WHERE key = ?", (key,),
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"[WARN] llm_cache: read failed: {e}")
+                return None
+        if row is None or row[0] <= time.time():
+            return None
+        return row[0], row[1]
+
+    def _db_put(self, key: str, site: str, content: str, expires_at: float) -> None:
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses (key, site, content, expires_at, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, site, content, expires_at, time.time()),
+                )
+                self._writes += 1
+                if self._writes % PRUNE_EVERY == 0:
+                    db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+                    db.execute(
+                        "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                        "ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                        (self.db_max_entries,),
+                    )
+                db.commit()
+            except sqlite3.Error as e:
+                print(f"[WARN] llm_cache: write failed: {e}")
+
+    # ---- memory tier -------------------------------------------------
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return entry[1]
+
+    def _memory_put(self, key: str, content: str, expires_at: float) -> None:
+        if self.memory_entries <= 0:
+            return
+        self._memory.pop(key, None)
+        self._memory[key] = (expires_at, content)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    # ---- lookup ------------------------------------------------------
+
+    def _expiry(self, site: str, content: str, policy: CachePolicy) -> Optional[float]:
+        """When a fresh response expires, or None if the policy rejects storing it."""
+        if policy.json_only and not _is_json(content):
+            self._count(site, "not_stored")
+            return None
+        return time.time() + policy.ttl_s
+
+    async def get_or_call(
+        self, key: str, site: str, policy: CachePolicy, call: Callable[[], Awaitable[str]],
+    ) -> str:
+        """Cached content, or ``await call()`` once per key and store it."""
+        content = self._memory_get(key)
+        if content is not None:
+            self._count(site, "hits_memory")
+            return content
+        if key in self._inflight:
+            self._count(site, "coalesced")
+
+        async def load() -> str:
+            row = await asyncio.to_thread(self._db_get, key)
+            if row is not None:
+                self._memory_put(key, row[1], row[0])
+                self._count(site, "hits_disk")
+                return row[1]
+            self._count(site, "misses")
+            content = await call()
+            expires_at = self._expiry(site, content, policy)
+            if expires_at is not None:
+                self._memory_put(key, content, expires_at)
+                await asyncio.to_thread(self._db_put, key, site, content, expires_at)
+            return content
+
+        return await self._inflight.do(key, load)
+
+
+llm_cache = LLMCache()
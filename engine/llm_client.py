@@ -1,11 +1,49 @@
 import json
 import os
-import urllib.error
-import urllib.request
-from typing import Any, Dict, List
+from contextlib import contextmanager
+from contextvars import Context, ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import httpx
+
+from . import http_client
+from .llm_batcher import MicroBatcher
+from .llm_cache import cache_key, llm_cache
 
 DASHSCOPE_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
 
+# Token usage of every completion made inside a track_usage() block is added
+# to the sink; asyncio tasks inherit the context, so concurrent stages count too.
+_usage_sink: ContextVar[Optional[Dict[str, int]]] = ContextVar("llm_usage_sink", default=None)
+
+
+@contextmanager
+def track_usage() -> Iterator[Dict[str, int]]:
+    """Accumulate call count and token usage for completions in this context."""
+    sink = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    token = _usage_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _usage_sink.reset(token)
+
+
+def _record_usage(usage: Any, contexts: Optional[List[Context]] = None) -> None:
+    """Add ``usage`` to the sink of the current context, or split it evenly across ``contexts``.
+
+    A completion shared by several callers (a packed batch) counts as one
+    call for each of them; its tokens are divided so they add up to the total.
+    """
+    sinks = [_usage_sink.get()] if contexts is None else [ctx.get(_usage_sink) for ctx in contexts]
+    for index, sink in enumerate(sinks):
+        if sink is None:
+            continue
+        sink["calls"] += 1
+        if isinstance(usage, dict):
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                share, rest = divmod(int(usage.get(key) or 0), len(sinks))
+                sink[key] += share + (1 if index < rest else 0)
+
 
 def _get_config() -> Dict[str, str]:
     api_key = os.getenv("DASHSCOPE_API_KEY", "").strip()
@@ -13,36 +51,37 @@ def _get_config() -> Dict[str, str]:
     return {"base_url": DASHSCOPE_BASE_URL, "api_key": api_key, "model": model}
 
 
-def chat(messages: List[Dict[str, Any]], temperature: float = 0.7) -> str:
+def _build_request(messages: List[Dict[str, Any]], temperature: float, stream: bool = False) -> Dict[str, Any]:
     config = _get_config()
     if not config["api_key"]:
         raise RuntimeError("Missing DASHSCOPE_API_KEY environment variable.")
 
-    payload = {
+    body: Dict[str, Any] = {
         "model": config["model"],
         "messages": messages,
         "temperature": temperature,
     }
-    body = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url=f"{config['base_url']}/chat/completions",
-        data=body,
-        headers={
+    if stream:
+        # The final chunk then carries token usage for track_usage().
+        body["stream"] = True
+        body["stream_options"] = {"include_usage": True}
+
+    return {
+        "url": f"{config['base_url']}/chat/completions",
+        "headers": {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {config['api_key']}",
         },
-        method="POST",
-    )
+        "json": body,
+    }
 
-    try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-    except urllib.error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="ignore")
-        raise RuntimeError(f"DashScope API request failed ({exc.code}): {detail}") from exc
-    except urllib.error.URLError as exc:
-        raise RuntimeError(f"DashScope API connection failed: {exc.reason}") from exc
 
+def _parse_response(resp: httpx.Response, contexts: Optional[List[Context]] = None) -> str:
+    if resp.status_code >= 400:
+        raise RuntimeError(f"DashScope API request failed ({resp.status_code}): {resp.text}")
+
+    data = resp.json()
+    _record_usage(data.get("usage"), contexts)
     content = (
         data.get("choices", [{}])[0]
         .get("message", {})
@@ -51,3 +90,90 @@ def chat(messages: List[Dict[str, Any]], temperature: float = 0.7) -> str:
     if not isinstance(content, str) or not content.strip():
         raise RuntimeError("DashScope API returned empty content.")
     return content
+
+
+def chat(messages: List[Dict[str, Any]], temperature: float = 0.7) -> str:
+    """Blocking chat completion; prefer :func:`achat` inside request handlers."""
+    req = _build_request(messages, temperature)
+    try:
+        resp = http_client.request_sync("POST", timeout=60, **req)
+    except httpx.HTTPError as exc:
+        raise RuntimeError(f"DashScope API connection failed: {exc}") from exc
+    return _parse_response(resp)
+
+
+async def _complete(
+    messages: List[Dict[str, Any]], temperature: float, contexts: Optional[List[Context]] = None,
+) -> str:
+    """One completion; usage goes to the callers' ``contexts`` (default: the current one)."""
+    req = _build_request(messages, temperature)
+    try:
+        resp = await http_client.request("POST", timeout=60, **req)
+    except httpx.HTTPError as exc:
+        raise RuntimeError(f"DashScope API connection failed: {exc}") from exc
+    return _parse_response(resp, contexts)
+
+
+llm_batcher = MicroBatcher(_complete)
+
+
+async def achat(
+    messages: List[Dict[str, Any]],
+    temperature: float = 0.7,
+    cache: Optional[str] = None,
+    batch: Optional[str] = None,
+) -> str:
+    """Chat completion over the shared async connection pool.
+
+    ``cache`` names the call site's policy in :mod:`engine.llm_cache`;
+    only deterministic prompts should opt in. ``batch`` names a task whose
+    concurrent ``[system, user]`` JSON prompts may share one packed call
+    (:mod:`engine.llm_batcher`).
+    """
+    config = _get_config()
+    if not config["api_key"]:
+        raise RuntimeError("Missing DASHSCOPE_API_KEY environment variable.")
+
+    async def call() -> str:
+        if batch:
+            return await llm_batcher.submit(batch, messages, temperature)
+        return await _complete(messages, temperature)
+
+    policy = llm_cache.policy(cache, temperature)
+    if policy is None:
+        return await call()
+    key = cache_key(config["model"], messages, temperature)
+    return await llm_cache.get_or_call(key, cache, policy, call)
+
+
+async def astream_chat(messages: List[Dict[str, Any]], temperature: float = 0.7) -> AsyncIterator[str]:
+    """Yield content deltas as DashScope streams them (server-sent events).
+
+    Raises RuntimeError like :func:`achat`; callers that already forwarded
+    some deltas decide themselves how to end the stream.
+    """
+    req = _build_request(messages, temperature, stream=True)
+    try:
+        async with http_client.stream("POST", timeout=60, **req) as resp:
+            if resp.status_code >= 400:
+                body = (await resp.aread()).decode("utf-8", "replace")
+                raise RuntimeError(f"DashScope API request failed ({resp.status_code}): {body}")
+
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    chunk = json.loads(data)
+                except ValueError:
+                    continue
+                if chunk.get("usage"):
+                    _record_usage(chunk["usage"])
+                for choice in chunk.get("choices") or []:
+                    delta = (choice.get("delta") or {}).get("content")
+                    if isinstance(delta, str) and delta:
+                        yield delta
+    except httpx.HTTPError as exc:
+        raise RuntimeError(f"DashScope API connection failed: {exc}") from exc
@@ -0,0 +1,24 @@
+"""Parsing of JSON replies from the chat models.
+
+Models often wrap JSON in a markdown fence (```json ... ```) even when told
+not to; every caller that parses a reply goes through here.
+"""
+import json
+import re
+from typing import Any
+
+_OPEN_FENCE = re.compile(r"^```\w*\n?")
+_CLOSE_FENCE = re.compile(r"\n?```$")
+
+
+def strip_fences(raw: str) -> str:
+    """Reply text without a surrounding markdown code fence."""
+    text = raw.strip()
+    if text.startswith("```"):
+        text = _CLOSE_FENCE.sub("", _OPEN_FENCE.sub("", text)).strip()
+    return text
+
+
+def parse_llm_json(raw: str) -> Any:
+    """Strip markdown fences and parse JSON from LLM output; raises json.JSONDecodeError."""
+    return json.loads(strip_fences(raw))
@@ -0,0 +1,199 @@
+"""Compact memory-mappable P1 bank format (``.p1b``).
+
+Layout (little-endian, every section 4-byte aligned)::
+
+    header     magic "P1BANK01", content hash, counts, section offsets
+    strings    (n_strings + 1) u32 offsets into the UTF-8 string blob
+    blob       all strings (ids, topics, questions, answers, keywords, terms)
+    records    n_records x 9 u32: id, topic, question string ids,
+               answers (start, count), keywords (start, count),
+               tokens (start, count) into the lists section
+    lists      u32 string ids (answers, keywords) and term ids (tokens)
+    terms      n_terms x 3 u32 sorted by term: string id, postings (start, count)
+    postings   (doc id, tf) u32 pairs
+
+Term ids are the precomputed question/keyword tokens; topics are stored as
+``#topic:<name>`` pseudo-terms so the topic boost is a postings lookup too.
+Readers map the file read-only, so every worker shares the same page-cache
+pages and nothing is parsed up front.
+"""
+import hashlib
+import mmap
+import os
+import struct
+from collections import Counter
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+MAGIC = b"P1BANK01"
+TOPIC_TERM_PREFIX = "#topic:"
+_HEADER = struct.Struct("<8s16s9If")
+_RECORD_FIELDS = 9
+_U32 = np.dtype("<u4")
+
+
+def _pad4(buf: bytearray) -> None:
+    buf.extend(b"\0" * (-len(buf) % 4))
+
+
+def write_binary_bank(records: List[Dict[str, Any]], path: Path) -> str:
+    """Write ``records`` (bank JSON dicts) to ``path``; returns the content hash.
+
+    The file is written next to ``path`` and renamed into place so readers
+    that still map the previous version keep a valid file.
+    """
+    from .p1_retrieval import _terms
+
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def sid(text: str) -> int:
+        if text not in string_ids:
+            string_ids[text] = len(strings)
+            strings.append(text)
+        return string_ids[text]
+
+    doc_terms: List[Counter] = []
+    for rec in records:
+        terms = _terms(rec.get("question", ""))
+        for keyword in rec.get("keywords", []):
+            terms.extend(_terms(keyword))
+        doc_terms.append(Counter(terms))
+
+    vocab = sorted({t for counts in doc_terms for t in counts}
+                   | {TOPIC_TERM_PREFIX + str(r.get("topic", "")).lower() for r in records})
+    term_ids = {t: i for i, t in enumerate(vocab)}
+
+    record_rows: List[int] = []
+    lists: List[int] = []
+    postings: Dict[int, List[int]] = {i: [] for i in range(len(vocab))}
+    for doc_id, (rec, counts) in enumerate(zip(records, doc_terms)):
+        answers = [sid(a) for a in rec.get("sample_answers", [])]
+        keywords = [sid(k) for k in rec.get("keywords", [])]
+        tokens = [term_ids[t] for t, tf in counts.items() for _ in range(tf)]
+        row = [sid(str(rec.get("id", ""))), sid(str(rec.get("topic", ""))), sid(rec.get("question", ""))]
+        for items in (answers, keywords, tokens):
+            row += [len(lists), len(items)]
+            lists.extend(items)
+        record_rows.extend(row)
+        for term, tf in counts.items():
+            postings[term_ids[term]] += [doc_id, tf]
+        postings[term_ids[TOPIC_TERM_PREFIX + str(rec.get("topic", "")).lower()]] += [doc_id, 0]
+
+    term_rows: List[int] = []
+    flat_postings: List[int] = []
+    for term_id, term in enumerate(vocab):
+        plist = postings[term_id]
+        term_rows += [sid(term), len(flat_postings) // 2, len(plist) // 2]
+        flat_postings.extend(plist)
+
+    encoded = [s.encode("utf-8") for s in strings]
+    str_offsets = [0]
+    for b in encoded:
+        str_offsets.append(str_offsets[-1] + len(b))
+
+    body = bytearray()
+    offsets = []
+    for section in (
+        np.asarray(str_offsets, dtype=_U32).tobytes(),
+        b"".join(encoded),
+        np.asarray(record_rows, dtype=_U32).tobytes(),
+        np.asarray(lists, dtype=_U32).tobytes(),
+        np.asarray(term_rows, dtype=_U32).tobytes(),
+        np.asarray(flat_postings, dtype=_U32).tobytes(),
+    ):
+        offsets.append(_HEADER.size + len(body))
+        body.extend(section)
+        _pad4(body)
+
+    digest = hashlib.sha256(body).digest()[:16]
+    total_tokens = sum(sum(c.values()) for c in doc_terms)
+    avg_len = total_tokens / len(records) if records else 0.0
+    header = _HEADER.pack(
+        MAGIC, digest, len(records), len(strings), len(vocab), *offsets, avg_len,
+    )
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(header + bytes(body))
+    os.replace(tmp, path)
+    return digest.hex()[:12]
+
+
+class BinaryBank(Sequence):
+    """Read-only, lazily decoded view of a ``.p1b`` file.
+
+    Behaves like the list of record dicts the JSON loader returns; records
+    are decoded from the mapping only when indexed.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, digest, self.n_records, n_strings, self.n_terms,
+         off_str, off_blob, off_rec, off_lists, off_terms, off_post, self.avg_len) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a P1 binary bank")
+        self.version = digest.hex()[:12]
+        self._blob_offset = off_blob
+        self._str_offsets = np.frombuffer(self._mm, _U32, n_strings + 1, off_str)
+        self._records = np.frombuffer(self._mm, _U32, self.n_records * _RECORD_FIELDS, off_rec).reshape(-1, _RECORD_FIELDS)
+        self._lists = np.frombuffer(self._mm, _U32, (off_terms - off_lists) // 4, off_lists)
+        self._terms = np.frombuffer(self._mm, _U32, self.n_terms * 3, off_terms).reshape(-1, 3)
+        self._postings = np.frombuffer(self._mm, _U32, (len(self._mm) - off_post) // 4, off_post)
+
+    def string(self, string_id: int) -> str:
+        start = self._blob_offset + int(self._str_offsets[string_id])
+        end = self._blob_offset + int(self._str_offsets[string_id + 1])
+        return self._mm[start:end].decode("utf-8")
+
+    def _list(self, start: int, count: int) -> np.ndarray:
+        return self._lists[start:start + count]
+
+    def __len__(self) -> int:
+        return self.n_records
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.n_records))]
+        if index < 0:
+            index += self.n_records
+        if not 0 <= index < self.n_records:
+            raise IndexError(index)
+        rid, topic, question, a_start, a_count, k_start, k_count, _, _ = (int(x) for x in self._records[index])
+        return {
+            "id": self.string(rid),
+            "topic": self.string(topic),
+            "question": self.string(question),
+            "sample_answers": [self.string(int(s)) for s in self._list(a_start, a_count)],
+            "keywords": [self.string(int(s)) for s in self._list(k_start, k_count)],
+        }
+
+    def token_ids(self, index: int) -> np.ndarray:
+        row = self._records[index]
+        return self._list(int(row[7]), int(row[8]))
+
+    def doc_lengths(self) -> np.ndarray:
+        return self._records[:, 8]
+
+    def term_id(self, term: str) -> Optional[int]:
+        """Binary search of the sorted term table, without building a dict."""
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = self.string(int(self._terms[mid, 0]))
+            if current < term:
+                lo = mid + 1
+            elif current > term:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def postings(self, term_id: int) -> np.ndarray:
+        """(doc id, tf) pairs for ``term_id`` as an (n, 2) view of the mapping."""
+        start, count = int(self._terms[term_id, 1]), int(self._terms[term_id, 2])
+        return self._postings[start * 2:(start + count) * 2].reshape(-1, 2)
@@ -1,33 +1,49 @@
+import heapq
 import json
+import math
+import os
 import random
 import re
+from collections import Counter
 from pathlib import Path
 from typing import Any
 
-BANK_PATH = Path(__file__).resolve().parents[1] / "data" / "processed" / "p1_bank.json"
+from .bank_registry import BankVersion, registry
+
+# JSON by default; point P1_BANK_PATH at a .p1b file (build_p1_bank.py
+# --binary-output) to memory-map the compact binary bank instead.
+BANK_PATH = Path(
+    os.getenv("P1_BANK_PATH")
+    or Path(__file__).resolve().parents[1] / "data" / "processed" / "p1_bank.json"
+)
 STOPWORDS = {"do", "you", "the", "a", "an", "to", "is", "are", "of", "in", "on"}
 
-_CACHE: list[dict[str, Any]] | None = None
+BM25_K1 = 1.2
+BM25_B = 0.75
+TOPIC_BOOST = 2.0
 
+# "bm25": inverted index over exact terms (default).
+# "tfidf": NumPy/SciPy TF-IDF matrix over words + char n-grams, tolerant of paraphrases.
+RETRIEVAL_BACKENDS = {"bm25", "tfidf"}
+DEFAULT_BACKEND = os.getenv("P1_RETRIEVAL_BACKEND", "bm25").strip().lower()
+if DEFAULT_BACKEND not in RETRIEVAL_BACKENDS:
+    print(
+        f"[WARN] P1_RETRIEVAL_BACKEND='{DEFAULT_BACKEND}' is not one of "
+        f"{sorted(RETRIEVAL_BACKENDS)}; using bm25."
+    )
+    DEFAULT_BACKEND = "bm25"
 
-def _load_bank() -> list[dict[str, Any]]:
-    global _CACHE
-    if _CACHE is not None:
-        return _CACHE
+BANK_NAME = "p1"
 
-    if not BANK_PATH.exists():
-        _CACHE = []
-        return _CACHE
 
-    try:
-        data = json.loads(BANK_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        _CACHE = []
-        return _CACHE
+def _parse_bank(raw: bytes | None) -> list[dict[str, Any]]:
+    if raw is None:
+        return []
 
+    # Raising lets the registry keep the previous version on a bad reload.
+    data = json.loads(raw.decode("utf-8"))
     if not isinstance(data, list):
-        _CACHE = []
-        return _CACHE
+        raise ValueError("P1 bank must be a JSON list")
 
     cleaned: list[dict[str, Any]] = []
     for item in data:
@@ -42,6 +58,9 @@ def _load_bank() -> list[dict[str, Any]]:
         answers = [str(a).strip() for a in sample_answers if isinstance(a, str) and a.strip()]
         if not answers:
             continue
+        keywords = item.get("keywords")
+        if not isinstance(keywords, list):
+            keywords = []
 
         cleaned.append(
             {
@@ -49,44 +68,172 @@ def _load_bank() -> list[dict[str, Any]]:
                 "topic": str(item.get("topic") or "other"),
                 "question": question.strip(),
                 "sample_answers": answers,
+                "keywords": [str(k).strip() for k in keywords if isinstance(k, str) and k.strip()],
             }
         )
 
-    _CACHE = cleaned
-    return _CACHE
+    return cleaned
+
+
+def _open_binary_bank(path: Path | None):
+    if path is None:
+        return "missing", []
+    from .p1_binary import BinaryBank
+    bank = BinaryBank(path)
+    return bank.version, bank
+
+
+def _current_bank() -> BankVersion:
+    return registry.get(BANK_NAME)
+
+
+def _load_bank() -> list[dict[str, Any]]:
+    return _current_bank().data
+
+
+def bank_version() -> str:
+    """Content hash of the live P1 bank; changes whenever the bank is reloaded."""
+    return _current_bank().version
+
+
+def _terms(text: str) -> list[str]:
+    return [w for w in re.findall(r"[a-z]+", text.lower()) if w not in STOPWORDS]
 
 
 def _tokenize(text: str) -> set[str]:
-    words = re.findall(r"[a-z]+", text.lower())
-    return {w for w in words if w and w not in STOPWORDS}
+    return set(_terms(text))
 
 
-def retrieve_examples(question: str, topic: str | None = None, top_k: int = 5) -> list[dict]:
+class BM25Index:
+    """Inverted index over bank questions and keywords, built once per bank.
+
+    Each posting stores the precomputed BM25 weight of a term in a record,
+    so a query only sums the postings of its own terms instead of scanning
+    and re-tokenizing every record.
     """
-    Return top_k Part1 example records.
-    Each record includes: id, topic, question, sample_answers
+
+    def __init__(self, records: list[dict[str, Any]]):
+        self.records = records
+        self.postings: dict[str, list[tuple[int, float]]] = {}
+        self.by_topic: dict[str, list[int]] = {}
+
+        doc_terms: list[Counter] = []
+        for doc_id, rec in enumerate(records):
+            terms = _terms(rec.get("question", ""))
+            for keyword in rec.get("keywords", []):
+                terms.extend(_terms(keyword))
+            doc_terms.append(Counter(terms))
+            self.by_topic.setdefault(str(rec.get("topic", "")).lower(), []).append(doc_id)
+
+        n_docs = len(records)
+        total_len = sum(sum(c.values()) for c in doc_terms)
+        avg_len = total_len / n_docs if n_docs else 0.0
+        doc_freq = Counter(term for counts in doc_terms for term in counts)
+
+        for doc_id, counts in enumerate(doc_terms):
+            doc_len = sum(counts.values())
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avg_len) if avg_len else BM25_K1
+            for term, tf in counts.items():
+                df = doc_freq[term]
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                weight = idf * tf * (BM25_K1 + 1) / (tf + norm)
+                self.postings.setdefault(term, []).append((doc_id, weight))
+
+    def search(self, question: str, topic_norm: str, top_k: int) -> list[dict[str, Any]]:
+        scores: dict[int, float] = {}
+        for term in _tokenize(question):
+            for doc_id, weight in self.postings.get(term, ()):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+        if topic_norm:
+            for doc_id in self.by_topic.get(topic_norm, ()):
+                scores[doc_id] = scores.get(doc_id, 0.0) + TOPIC_BOOST
+
+        # Ties keep bank order, as the previous stable sort did.
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [self.records[doc_id] for doc_id, _ in best]
+
+
+class BinaryBM25Index:
+    """BM25 scored straight from the postings stored in a .p1b bank.
+
+    Nothing is built per worker: term lookup is a binary search over the
+    mapped term table and scores are accumulated with NumPy over the
+    matching postings only. Scores match BM25Index on the same records.
     """
-    records = _load_bank()
-    if not records or top_k <= 0:
-        return []
 
-    topic_norm = (topic or "").strip().lower()
-    query_tokens = _tokenize(question)
+    def __init__(self, bank):
+        self.records = bank
+
+    def search(self, question: str, topic_norm: str, top_k: int) -> list[dict[str, Any]]:
+        import numpy as np
+        from .p1_binary import TOPIC_TERM_PREFIX
+
+        bank = self.records
+        n_docs = len(bank)
+        doc_lens = bank.doc_lengths()
+        doc_ids: list = []
+        weights: list = []
+        for term in _tokenize(question):
+            term_id = bank.term_id(term)
+            if term_id is None:
+                continue
+            plist = bank.postings(term_id)
+            df = len(plist)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            docs = plist[:, 0]
+            tf = plist[:, 1].astype(np.float64)
+            if bank.avg_len:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lens[docs] / bank.avg_len)
+            else:
+                norm = BM25_K1
+            doc_ids.append(docs)
+            weights.append(idf * tf * (BM25_K1 + 1) / (tf + norm))
+        if topic_norm:
+            term_id = bank.term_id(TOPIC_TERM_PREFIX + topic_norm)
+            if term_id is not None:
+                docs = bank.postings(term_id)[:, 0]
+                doc_ids.append(docs)
+                weights.append(np.full(len(docs), TOPIC_BOOST))
+        if not doc_ids:
+            return []
+
+        unique_docs, inverse = np.unique(np.concatenate(doc_ids), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(weights))
+        # Highest score first; ties keep bank order.
+        order = np.lexsort((unique_docs, -scores))[:top_k]
+        return [bank[int(unique_docs[i])] for i in order]
+
+
+def _get_index(backend: str | None = None, bank: BankVersion | None = None):
+    backend = (backend or DEFAULT_BACKEND).lower()
+    if backend not in RETRIEVAL_BACKENDS:
+        raise ValueError(f"Unknown retrieval backend '{backend}'. Use one of {sorted(RETRIEVAL_BACKENDS)}.")
+
+    bank = bank or _current_bank()
 
-    scored: list[tuple[int, dict[str, Any]]] = []
-    for rec in records:
-        rec_tokens = _tokenize(rec.get("question", ""))
-        score = len(query_tokens & rec_tokens)
-        if topic_norm and str(rec.get("topic", "")).lower() == topic_norm:
-            score += 2
-        scored.append((score, rec))
+    def build():
+        if backend == "tfidf":
+            from .p1_vector_index import TfidfIndex
+            return TfidfIndex(bank.data, STOPWORDS)
+        if not isinstance(bank.data, list):
+            return BinaryBM25Index(bank.data)
+        return BM25Index(bank.data)
 
-    matched = [(score, rec) for score, rec in scored if score > 0]
-    matched.sort(key=lambda item: item[0], reverse=True)
+    return bank.index(backend, build)
 
-    if matched:
-        return [rec for _, rec in matched[:top_k]]
 
+def _warm_index(bank: BankVersion) -> None:
+    # Runs on the loading thread, so a reloaded bank goes live with its index ready.
+    _get_index(bank=bank)
+
+
+if BANK_PATH.suffix == ".p1b":
+    registry.register(BANK_NAME, BANK_PATH, _open_binary_bank, warm=_warm_index, mapped=True)
+else:
+    registry.register(BANK_NAME, BANK_PATH, _parse_bank, warm=_warm_index)
+
+
+def _fallback(records: list[dict[str, Any]], topic_norm: str, top_k: int) -> list[dict]:
     fallback = records
     if topic_norm:
         same_topic = [rec for rec in records if str(rec.get("topic", "")).lower() == topic_norm]
@@ -95,3 +242,41 @@ def retrieve_examples(question: str, topic: str | None = None, top_k: int = 5) -
 
     k = min(top_k, len(fallback))
     return random.sample(fallback, k)
+
+
+def retrieve_examples(
+    question: str, topic: str | None = None, top_k: int = 5, backend: str | None = None,
+) -> list[dict]:
+    """
+    Return top_k Part1 example records.
+    Each record includes: id, topic, question, sample_answers, keywords
+    """
+    bank = _current_bank()
+    records = bank.data
+    if not records or top_k <= 0:
+        return []
+
+    topic_norm = (topic or "").strip().lower()
+    matched = _get_index(backend, bank).search(question, topic_norm, top_k)
+    return matched or _fallback(records, topic_norm, top_k)
+
+
+def retrieve_examples_batch(
+    questions: list[str], topic: str | None = None, top_k: int = 5, backend: str | None = None,
+) -> list[list[dict]]:
+    """Batch form of retrieve_examples (e.g. for warmup jobs).
+
+    The tfidf backend scores the whole batch with one matrix product.
+    """
+    bank = _current_bank()
+    records = bank.data
+    if not records or top_k <= 0:
+        return [[] for _ in questions]
+
+    topic_norm = (topic or "").strip().lower()
+    index = _get_index(backend, bank)
+    if hasattr(index, "search_batch"):
+        batches = index.search_batch(questions, [topic_norm] * len(questions), top_k)
+    else:
+        batches = [index.search(q, topic_norm, top_k) for q in questions]
+    return [matched or _fallback(records, topic_norm, top_k) for matched in batches]
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from engine import llm_client
 from engine.p1_retrieval import retrieve_examples
@@ -54,7 +54,7 @@ def _build_reference_examples(examples: List[Dict[str, Any]]) -> str:
     return "\n\n".join(blocks) if blocks else "No strong examples found."
 
 
-def generate_p1_answer(question: str, band: str, profile: Dict[str, Any]) -> str:
+def _build_messages(question: str, band: str, profile: Dict[str, Any]) -> List[Dict[str, str]]:
     topic = profile.get("topic") if isinstance(profile, dict) else None
     topic_str = str(topic).strip() if isinstance(topic, str) else None
     examples = retrieve_examples(question=question, topic=topic_str, top_k=5)
@@ -77,14 +77,27 @@ def generate_p1_answer(question: str, band: str, profile: Dict[str, Any]) -> str
         "仅返回一个回答，雅思口语 Part 1 风格，2-4 句话。"
     )
 
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _try_build_messages(question: str, band: str, profile: Dict[str, Any]) -> Optional[List[Dict[str, str]]]:
+    """Prompt messages, or None when the P1 bank cannot be loaded (corrupt or unreadable file)."""
+    try:
+        return _build_messages(question, band, profile)
+    except (OSError, ValueError) as e:
+        print(f"[WARN] p1_answer: P1 bank unavailable, using fallback answer: {e}")
+        return None
+
+
+async def generate_p1_answer(question: str, band: str, profile: Dict[str, Any]) -> str:
+    messages = _try_build_messages(question, band, profile)
+    if messages is None:
+        return _fallback_answer(question=question, profile=profile, band=band)
     try:
-        answer = llm_client.chat(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.6,
-        )
+        answer = await llm_client.achat(messages=messages, temperature=0.6)
     except RuntimeError:
         return _fallback_answer(question=question, profile=profile, band=band)
 
@@ -93,3 +106,37 @@ def generate_p1_answer(question: str, band: str, profile: Dict[str, Any]) -> str
         return _fallback_answer(question=question, profile=profile, band=band)
 
     return cleaned
+
+
+async def stream_p1_answer(question: str, band: str, profile: Dict[str, Any]) -> AsyncIterator[str]:
+    """Streaming form of generate_p1_answer.
+
+    Deltas are whitespace-collapsed on the fly, so the joined stream equals
+    the non-streaming answer. If the model fails before its first token the
+    fallback answer is sent instead.
+    """
+    messages = _try_build_messages(question, band, profile)
+    if messages is None:
+        yield _fallback_answer(question=question, profile=profile, band=band)
+        return
+    started = False
+    pending_space = False
+    try:
+        async for delta in llm_client.astream_chat(messages=messages, temperature=0.6):
+            words = delta.split()
+            if not words:
+                pending_space = pending_space or started
+                continue
+            piece = " ".join(words)
+            if started and (pending_space or delta[0].isspace()):
+                piece = " " + piece
+            pending_space = delta[-1].isspace()
+            started = True
+            yield piece
+    except RuntimeError as e:
+        if started:
+            print(f"[WARN] p1_answer stream interrupted: {e}")
+            return
+
+    if not started:
+        yield _fallback_answer(question=question, profile=profile, band=band)
@@ -0,0 +1,116 @@
+"""Vectorized TF-IDF retrieval backend for the P1 bank.
+
+Records are embedded once as a sparse L2-normalized TF-IDF matrix over word
+unigrams plus character 3-5-grams, so paraphrased questions ("your home
+town" vs "your hometown") still overlap. A query batch is scored against the
+whole bank with one sparse matrix product.
+"""
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+from scipy import sparse
+
+CHAR_NGRAMS = (3, 4, 5)
+TOPIC_BOOST = 0.2
+
+_WORD = re.compile(r"[a-z]+")
+
+
+def _features(text: str, stopwords: set) -> Counter:
+    feats: Counter = Counter()
+    for word in _WORD.findall(text.lower()):
+        if word not in stopwords:
+            feats["w:" + word] += 1
+        padded = f" {word} "
+        for n in CHAR_NGRAMS:
+            for i in range(len(padded) - n + 1):
+                feats["c:" + padded[i:i + n]] += 1
+    return feats
+
+
+def _doc_text(rec: Dict[str, Any]) -> str:
+    return " ".join([rec.get("question", "")] + list(rec.get("keywords", [])))
+
+
+class TfidfIndex:
+    """Same search() interface as p1_retrieval.BM25Index, plus search_batch()."""
+
+    def __init__(self, records: List[Dict[str, Any]], stopwords: set):
+        self.records = records
+        self.stopwords = stopwords
+        self.vocab: Dict[str, int] = {}
+
+        doc_feats = [_features(_doc_text(rec), stopwords) for rec in records]
+        doc_freq: Counter = Counter()
+        for feats in doc_feats:
+            doc_freq.update(feats.keys())
+        for feat in doc_freq:
+            self.vocab[feat] = len(self.vocab)
+
+        n_docs = len(records)
+        self.idf = [0.0] * len(self.vocab)
+        for feat, df in doc_freq.items():
+            self.idf[self.vocab[feat]] = math.log((1 + n_docs) / (1 + df)) + 1.0
+
+        self.matrix = self._vectorize(doc_feats)
+        # Feature-major copy so a sparse query row multiplies straight into
+        # per-record scores without transposing on every call.
+        self.matrix_t = self.matrix.T.tocsr()
+        self.topic_codes: Dict[str, int] = {}
+        self.topic_ids = np.array(
+            [self.topic_codes.setdefault(str(rec.get("topic", "")).lower(), len(self.topic_codes)) for rec in records],
+            dtype=np.int32,
+        )
+
+    def _vectorize(self, feats_list: Sequence[Counter]) -> sparse.csr_matrix:
+        """Sublinear-TF x IDF rows, L2-normalized; unknown features are dropped."""
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for feats in feats_list:
+            for feat, tf in feats.items():
+                col = self.vocab.get(feat)
+                if col is None:
+                    continue
+                indices.append(col)
+                data.append((1.0 + math.log(tf)) * self.idf[col])
+            indptr.append(len(indices))
+
+        values = np.asarray(data, dtype=np.float32)
+        row_ids = np.repeat(np.arange(len(feats_list)), np.diff(indptr))
+        norms = np.sqrt(np.bincount(row_ids, weights=values * values, minlength=len(feats_list)))
+        norms[norms == 0] = 1.0
+        values /= norms[row_ids].astype(np.float32)
+        return sparse.csr_matrix(
+            (values, np.asarray(indices, dtype=np.int64), indptr),
+            shape=(len(feats_list), len(self.vocab)),
+        )
+
+    def score_batch(self, questions: Sequence[str]) -> np.ndarray:
+        """Cosine similarity of each question to every record, shape (len(questions), n_records)."""
+        queries = self._vectorize([_features(q, self.stopwords) for q in questions])
+        return (queries @ self.matrix_t).toarray()
+
+    def search_batch(
+        self, questions: Sequence[str], topics: Sequence[str], top_k: int,
+    ) -> List[List[Dict[str, Any]]]:
+        if not self.records or not questions:
+            return [[] for _ in questions]
+        scores = self.score_batch(questions)
+        results: List[List[Dict[str, Any]]] = []
+        k = min(top_k, len(self.records))
+        for row, topic_norm in zip(scores, topics):
+            topic_id = self.topic_codes.get(topic_norm) if topic_norm else None
+            if topic_id is not None:
+                row = row + TOPIC_BOOST * (self.topic_ids == topic_id)
+            candidates = np.argpartition(-row, k - 1)[:k] if k < len(row) else np.arange(len(row))
+            # Highest score first; ties keep bank order.
+            candidates = candidates[np.lexsort((candidates, -row[candidates]))]
+            results.append([self.records[i] for i in candidates if row[i] > 0])
+        return results
+
+    def search(self, question: str, topic_norm: str, top_k: int) -> List[Dict[str, Any]]:
+        return self.search_batch([question], [topic_norm], top_k)[0]
@@ -0,0 +1,84 @@
+"""Minimal dependency-graph executor for the evaluation pipeline.
+
+Each stage declares the stages it depends on; every stage starts as soon as
+all of its dependencies have finished, so independent branches (e.g.
+pronunciation analysis vs. the Examiner call) overlap instead of running
+back to back.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[Dict[str, Any]], Awaitable[Any]]
+    deps: Tuple[str, ...] = ()
+
+
+def _validate(stages: Sequence[Stage]) -> None:
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names in pipeline: {names}")
+    by_name = {s.name: s for s in stages}
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+    # Kahn's algorithm: reject cycles up front instead of deadlocking.
+    indegree = {s.name: len(s.deps) for s in stages}
+    ready: List[str] = [n for n, d in indegree.items() if d == 0]
+    seen = 0
+    while ready:
+        current = ready.pop()
+        seen += 1
+        for stage in stages:
+            if current in stage.deps:
+                indegree[stage.name] -= 1
+                if indegree[stage.name] == 0:
+                    ready.append(stage.name)
+    if seen != len(stages):
+        raise ValueError("Pipeline stages contain a dependency cycle")
+
+
+async def run_dag(
+    stages: Sequence[Stage],
+    on_complete: Optional[Callable[[str, Any, float], None]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Execute ``stages`` concurrently wherever their dependencies allow.
+
+    Every stage receives the shared ``results`` dict (stage name -> return
+    value) and is only started once all of its ``deps`` are present in it.
+    ``on_complete(name, result, elapsed_ms)`` is called as each stage
+    finishes, e.g. to stream partial results. Returns ``(results,
+    timings_ms)``. The first failing stage cancels the remaining ones and
+    its exception is re-raised.
+    """
+    _validate(stages)
+    results: Dict[str, Any] = {}
+    timings: Dict[str, float] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def _execute(stage: Stage) -> None:
+        if stage.deps:
+            await asyncio.gather(*(tasks[d] for d in stage.deps))
+        start = time.perf_counter()
+        results[stage.name] = await stage.run(results)
+        timings[stage.name] = round((time.perf_counter() - start) * 1000, 1)
+        if on_complete is not None:
+            on_complete(stage.name, results[stage.name], timings[stage.name])
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.ensure_future(_execute(stage))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    return results, timings
@@ -0,0 +1,388 @@
+"""Local anchor-word pronunciation matcher.
+
+Decides whether each anchor word in a transcription is correct,
+mispronounced (an ASR mis-hearing such as "routine" -> "root teen") or
+missing without an LLM round-trip. Anchors are matched against transcript
+token windows by phoneme edit distance (CMUdict pronunciations bundled in
+data/processed/pronunciation_lexicon.tsv.gz) or, for out-of-vocabulary
+words, Metaphone codes, blended with spelling similarity. IPA and Chinese
+hints are derived from the same lexicon. Only scores between the two
+thresholds are reported as ambiguous for the caller to adjudicate.
+"""
+import gzip
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+LEXICON_PATH = Path(
+    os.getenv("PRONUNCIATION_LEXICON_PATH")
+    or Path(__file__).resolve().parents[1] / "data" / "processed" / "pronunciation_lexicon.tsv.gz"
+)
+# Window score at or above MATCH_THRESHOLD -> mispronounced, below
+# MISSING_THRESHOLD -> missing, in between -> ambiguous. A window whose
+# lexicon phones equal the anchor's is a homophone ("their" -> "there")
+# and counts as correct.
+MATCH_THRESHOLD = float(os.getenv("PRONUNCIATION_MATCH_THRESHOLD", "0.75"))
+MISSING_THRESHOLD = float(os.getenv("PRONUNCIATION_MISSING_THRESHOLD", "0.45"))
+# Extra transcript tokens a window may span beyond the anchor's own.
+EXTRA_WINDOW_TOKENS = 2
+
+_TOKEN = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+_INFLECTIONS = ("s", "es", "ed", "d", "ing", "'s")
+# Suffixes after a doubled final consonant: running, stopped, travelling.
+_DOUBLING_INFLECTIONS = ("ing", "ed", "er")
+_VOWELS = frozenset("aeiou")
+
+_lexicon: Optional[Dict[str, Tuple[str, ...]]] = None
+_lexicon_lock = threading.Lock()
+
+
+def lexicon() -> Dict[str, Tuple[str, ...]]:
+    """word -> ARPAbet phones, loaded on first use."""
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                _lexicon = _load_lexicon(LEXICON_PATH)
+    return _lexicon
+
+
+def _load_lexicon(path: Path) -> Dict[str, Tuple[str, ...]]:
+    entries: Dict[str, Tuple[str, ...]] = {}
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#"):
+                    continue
+                word, _, phones = line.rstrip("\n").partition("\t")
+                entries[word] = tuple(phones.split())
+    except OSError as e:
+        print(f"[WARN] pronunciation: lexicon unavailable ({e}); using Metaphone only")
+    return entries
+
+
+# ---------------------------------------------------------------------------
+# ARPAbet -> IPA
+# ---------------------------------------------------------------------------
+
+_IPA = {
+    "AA": "ɑː", "AE": "æ", "AH": "ʌ", "AO": "ɔː", "AW": "aʊ", "AY": "aɪ",
+    "EH": "e", "ER": "ɜːr", "EY": "eɪ", "IH": "ɪ", "IY": "iː", "OW": "oʊ",
+    "OY": "ɔɪ", "UH": "ʊ", "UW": "uː",
+    "B": "b", "CH": "tʃ", "D": "d", "DH": "ð", "F": "f", "G": "ɡ", "HH": "h",
+    "JH": "dʒ", "K": "k", "L": "l", "M": "m", "N": "n", "NG": "ŋ", "P": "p",
+    "R": "r", "S": "s", "SH": "ʃ", "T": "t", "TH": "θ", "V": "v", "W": "w",
+    "Y": "j", "Z": "z", "ZH": "ʒ",
+}
+_UNSTRESSED_IPA = {"AH": "ə", "ER": "ər"}
+# Two-consonant onsets a stress mark may sit in front of (e.g. "ˈtriː", "ˈstʌdi").
+_ONSETS = {
+    ("S", c) for c in ("P", "T", "K", "M", "N", "L", "W")
+} | {
+    (c, "R") for c in ("P", "B", "T", "D", "K", "G", "F", "TH", "SH")
+} | {
+    (c, "L") for c in ("P", "B", "K", "G", "F")
+} | {
+    (c, "Y") for c in ("P", "B", "K", "G", "F", "V", "M", "HH")
+} | {("T", "W"), ("D", "W"), ("K", "W")}
+
+
+def _is_vowel(phone: str) -> bool:
+    return phone[-1].isdigit()
+
+
+def syllables(phones: Sequence[str]) -> List[int]:
+    """Stress digit (0/1/2) of each syllable's vowel."""
+    return [int(p[-1]) for p in phones if _is_vowel(p)]
+
+
+def to_ipa(phones: Sequence[str]) -> str:
+    """ARPAbet -> IPA, with stress marks before the stressed syllable's onset."""
+    marks: Dict[int, str] = {}
+    prev_vowel = -1
+    for i, p in enumerate(phones):
+        if not _is_vowel(p):
+            continue
+        stress = p[-1]
+        if stress in "12" and len(syllables(phones)) > 1:
+            start = i
+            if i - 1 > prev_vowel and not _is_vowel(phones[i - 1]):
+                start = i - 1
+                if prev_vowel == -1:
+                    start = 0
+                elif i - 2 > prev_vowel and (phones[i - 2], phones[i - 1]) in _ONSETS:
+                    start = i - 2
+            marks[start] = "ˈ" if stress == "1" else "ˌ"
+        prev_vowel = i
+
+    out = []
+    for i, p in enumerate(phones):
+        out.append(marks.get(i, ""))
+        base = p.rstrip("012")
+        if p.endswith("0") and base in _UNSTRESSED_IPA:
+            out.append(_UNSTRESSED_IPA[base])
+        else:
+            out.append(_IPA.get(base, base.lower()))
+    return "".join(out)
+
+
+def word_ipa(text: str) -> str:
+    """IPA for a word or phrase, "" if any word is not in the lexicon."""
+    parts = []
+    for token in tokenize(text):
+        phones = lexicon().get(token.lower())
+        if not phones:
+            return ""
+        parts.append(to_ipa(phones))
+    return f"/{' '.join(parts)}/" if parts else ""
+
+
+# ---------------------------------------------------------------------------
+# Metaphone (Lawrence Philips, 1990) for out-of-vocabulary words
+# ---------------------------------------------------------------------------
+
+def metaphone(word: str) -> str:
+    w = re.sub(r"[^A-Z]", "", word.upper())
+    if not w:
+        return ""
+    w = re.sub(r"(.)\1+", lambda m: m.group(1) if m.group(1) != "C" else m.group(0), w)
+    if w[:2] in ("AE", "GN", "KN", "PN", "WR"):
+        w = w[1:]
+    elif w[0] == "X":
+        w = "S" + w[1:]
+    elif w[:2] == "WH":
+        w = "W" + w[2:]
+
+    vowels = "AEIOU"
+    out = []
+    n = len(w)
+    i = 0
+    while i < n:
+        c = w[i]
+        prev = w[i - 1] if i > 0 else ""
+        nxt = w[i + 1] if i + 1 < n else ""
+        nxt2 = w[i + 2] if i + 2 < n else ""
+        if c in vowels:
+            if i == 0:
+                out.append(c)
+        elif c == "B":
+            if not (prev == "M" and i == n - 1):
+                out.append("B")
+        elif c == "C":
+            if nxt == "I" and nxt2 == "A":
+                out.append("X")
+            elif nxt == "H":
+                out.append("K" if prev == "S" else "X")
+                i += 1
+            elif nxt and nxt in "IEY":
+                if prev != "S":
+                    out.append("S")
+            else:
+                out.append("K")
+        elif c == "D":
+            if nxt == "G" and nxt2 and nxt2 in "EIY":
+                out.append("J")
+                i += 2
+            else:
+                out.append("T")
+        elif c == "G":
+            if nxt == "H" and nxt2 and nxt2 not in vowels:
+                pass
+            elif nxt == "N" and (i + 2 == n or w[i + 2:] == "ED"):
+                pass
+            elif nxt and nxt in "IEY" and prev != "G":
+                out.append("J")
+            else:
+                out.append("K")
+        elif c == "H":
+            if nxt and nxt in vowels and not (prev and prev in "CSPTG"):
+                out.append("H")
+        elif c == "K":
+            if prev != "C":
+                out.append("K")
+        elif c == "P":
+            if nxt == "H":
+                out.append("F")
+                i += 1
+            else:
+                out.append("P")
+        elif c == "Q":
+            out.append("K")
+        elif c == "S":
+            if nxt == "H":
+                out.append("X")
+                i += 1
+            elif nxt == "I" and nxt2 in ("O", "A"):
+                out.append("X")
+            else:
+                out.append("S")
+        elif c == "T":
+            if nxt == "I" and nxt2 in ("O", "A"):
+                out.append("X")
+            elif nxt == "H":
+                out.append("0")
+                i += 1
+            elif not (nxt == "C" and nxt2 == "H"):
+                out.append("T")
+        elif c == "V":
+            out.append("F")
+        elif c in "WY":
+            if nxt and nxt in vowels:
+                out.append(c)
+        elif c == "X":
+            out.append("KS")
+        elif c == "Z":
+            out.append("S")
+        else:  # F J L M N R
+            out.append(c)
+        i += 1
+    return "".join(out)
+
+
+# ---------------------------------------------------------------------------
+# Matching
+# ---------------------------------------------------------------------------
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text or "")
+
+
+def levenshtein(a: Sequence, b: Sequence) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    row = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        prev, row[0] = row[0], i
+        for j, y in enumerate(b, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (x != y))
+    return row[-1]
+
+
+def _similarity(a: Sequence, b: Sequence) -> float:
+    longest = max(len(a), len(b))
+    return 1.0 - levenshtein(a, b) / longest if longest else 1.0
+
+
+def _phones(words: Sequence[str]) -> Optional[List[str]]:
+    """Stress-less phones of a word sequence, None if any word is unknown."""
+    lex = lexicon()
+    out: List[str] = []
+    for w in words:
+        phones = lex.get(w)
+        if phones is None:
+            return None
+        out.extend(p.rstrip("012") for p in phones)
+    return out
+
+
+def _inflection_of(token: str, base: str) -> bool:
+    if token == base:
+        return True
+    if token.startswith(base) and token[len(base):] in _INFLECTIONS:
+        return True
+    if base.endswith("e") and token == base[:-1] + "ing":
+        return True
+    if (
+        len(base) > 1 and base[-1] not in _VOWELS and base[-1] not in "wxy"
+        and token.startswith(base + base[-1]) and token[len(base) + 1:] in _DOUBLING_INFLECTIONS
+    ):
+        return True
+    return base.endswith("y") and token in (base[:-1] + "ies", base[:-1] + "ied")
+
+
+def _window_scores(anchor: Sequence[str], window: Sequence[str]) -> Tuple[float, bool]:
+    """``(score, same_phones)``; ``same_phones`` only when both sides are in the lexicon."""
+    anchor_phones, window_phones = _phones(anchor), _phones(window)
+    if anchor_phones is not None and window_phones is not None:
+        phonetic = _similarity(anchor_phones, window_phones)
+        same_phones = anchor_phones == window_phones
+    else:
+        phonetic = _similarity(
+            "".join(metaphone(w) for w in anchor), "".join(metaphone(w) for w in window)
+        )
+        same_phones = False
+    spelling = _similarity("".join(anchor), "".join(window))
+    # Sound decides; spelling can only lift a weak phonetic score halfway.
+    return max(phonetic, (phonetic + spelling) / 2), same_phones
+
+
+def score_window(anchor: Sequence[str], window: Sequence[str]) -> float:
+    """Similarity in [0, 1] between lower-cased anchor and window tokens."""
+    return _window_scores(anchor, window)[0]
+
+
+def _hint(anchor: Sequence[str], window: Sequence[str]) -> str:
+    if len(window) > len(anchor):
+        return "连贯读出，别拆成两词" if len(anchor) == 1 else "连贯读出，不要拆开"
+    phones = lexicon().get(anchor[0]) if len(anchor) == 1 else None
+    if phones:
+        stresses = syllables(phones)
+        if len(stresses) > 1 and 1 in stresses:
+            return f"重音在第{stresses.index(1) + 1}个音节"
+    return "对照音标放慢再读"
+
+
+def _item(word: str, status: str, recognized_as: Optional[str] = None,
+          hint: str = "", score: Optional[float] = None) -> Dict[str, Any]:
+    item = {
+        "word": word,
+        "status": status,
+        "recognized_as": recognized_as,
+        "ipa": "" if status == "correct" else word_ipa(word),
+        "hint": hint,
+    }
+    if score is not None:
+        item["score"] = round(score, 3)
+    return item
+
+
+def match_anchor(word: str, tokens: Sequence[str], lowered: Sequence[str]) -> Dict[str, Any]:
+    """Classify one anchor against the transcript tokens.
+
+    The result carries ``score`` (best window similarity) unless the word
+    was found verbatim; a score between the thresholds means ambiguous.
+    A window with the anchor's exact phones is correct (ASR chose another
+    spelling); identical Metaphone codes alone are too coarse for that
+    and come back ambiguous.
+    """
+    anchor = [t.lower() for t in tokenize(word)]
+    if not anchor:
+        return _item(word, "missing", score=0.0)
+
+    n = len(anchor)
+    for start in range(len(lowered) - n + 1):
+        if all(_inflection_of(lowered[start + k], anchor[k]) for k in range(n)):
+            return _item(word, "correct")
+
+    anchor_len = len("".join(anchor))
+    best, best_window, best_same_phones = 0.0, (0, 0), False
+    for size in range(1, n + EXTRA_WINDOW_TOKENS + 1):
+        for start in range(len(lowered) - size + 1):
+            window = lowered[start:start + size]
+            window_len = len("".join(window))
+            if window_len * 2 < anchor_len or window_len > anchor_len * 2:
+                continue
+            score, same_phones = _window_scores(anchor, window)
+            if score > best or (score == best and same_phones and not best_same_phones):
+                best, best_window, best_same_phones = score, (start, start + size), same_phones
+
+    if best < MISSING_THRESHOLD:
+        return _item(word, "missing", score=best)
+    if best_same_phones:
+        return _item(word, "correct", score=best)
+    start, end = best_window
+    # Only differing sounds are a mispronunciation; a perfect score without
+    # lexicon phones to confirm it is left to the adjudicator.
+    status = "mispronounced" if MATCH_THRESHOLD <= best < 1.0 else "ambiguous"
+    return _item(
+        word, status, " ".join(tokens[start:end]), _hint(anchor, lowered[start:end]), score=best,
+    )
+
+
+def analyze_anchor_words(transcription: str, anchor_words: Sequence[str]) -> List[Dict[str, Any]]:
+    """Classify every anchor word; items may have status "ambiguous"."""
+    tokens = tokenize(transcription)
+    lowered = [t.lower() for t in tokens]
+    return [match_anchor(w, tokens, lowered) for w in anchor_words]
@@ -2,10 +2,22 @@
 import json
 import os
 
+from .bank_registry import registry
+
+QUESTION_BANK_NAME = "question_bank"
+
+
+def _parse_question_bank(raw):
+    if raw is None:
+        return None
+    return json.loads(raw.decode("utf-8"))
+
+
 class AgenticRAG:
     def __init__(self):
-        # 预留加载题库
+        # 题库由 bank_registry 加载一次，文件变更时后台热更新
         self.question_bank_path = os.path.join(os.path.dirname(__file__), "question_bank.json")
+        registry.register(QUESTION_BANK_NAME, self.question_bank_path, _parse_question_bank)
         self.rubric = {
             "fluency": "Connectives, hesitation management, self-correction.",
             "lexical": "Collocations, idiomatic expressions, topic-specific vocabulary.",
@@ -27,7 +39,7 @@ class AgenticRAG:
         return context
 
     def get_question_context(self, q_id: str):
-        if not os.path.exists(self.question_bank_path):
-            return None
-        with open(self.question_bank_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return registry.get(QUESTION_BANK_NAME).data
+
+    def question_bank_version(self) -> str:
+        return registry.get(QUESTION_BANK_NAME).version
@@ -0,0 +1,44 @@
+"""Single-flight execution of keyed async work.
+
+The caches in this package share one pattern: when several requests miss
+on the same key at once, only the first does the expensive work (TTS,
+ASR, LLM, image synthesis) and the rest wait for its result. The work runs
+as its own task and every caller, the first included, awaits it through
+``asyncio.shield``. A caller that goes away (client disconnect) therefore
+cancels neither the work nor the other waiters, and the result is still
+stored for the next request.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    def __init__(self):
+        self._inflight: Dict[str, "asyncio.Task[T]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, work: Callable[[], Awaitable[T]]) -> T:
+        """Result of ``work()``, started only if no run for ``key`` is in flight (``key in self``).
+
+        Exceptions from ``work`` reach every caller of that run; nothing is
+        remembered after it finishes.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(work())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finished(key, t))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: "asyncio.Task[T]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller has gone
@@ -0,0 +1,143 @@
+"""Shared poller for DashScope async tasks (ASR, image synthesis).
+
+Instead of every request running its own ``sleep`` + poll loop, callers
+register a task ID and await a future. One background coroutine per event
+loop polls every in-flight task with adaptive backoff (quick first checks,
+slower later) and resolves the futures when DashScope reports a final state.
+"""
+import asyncio
+import os
+from typing import Any, Dict, Optional
+
+from . import http_client
+
+DASHSCOPE_TASK_URL = "https://dashscope.aliyuncs.com/api/v1/tasks"
+
+INITIAL_INTERVAL = float(os.getenv("TASK_POLL_INITIAL_INTERVAL", "0.5"))
+# A task is noticed up to one interval after it finishes, so keep this short.
+MAX_INTERVAL = float(os.getenv("TASK_POLL_MAX_INTERVAL", "2.0"))
+BACKOFF = 1.5
+
+
+class TaskFailed(RuntimeError):
+    """DashScope reported the task as FAILED (or CANCELED/UNKNOWN)."""
+
+
+class TaskTimeout(RuntimeError):
+    """The task did not reach a final state before its deadline."""
+
+
+class _TrackedTask:
+    __slots__ = ("future", "api_key", "deadline", "next_poll", "interval", "last_error")
+
+    def __init__(self, future: asyncio.Future, api_key: str, deadline: float, now: float):
+        self.future = future
+        self.api_key = api_key
+        self.deadline = deadline
+        self.interval = INITIAL_INTERVAL
+        self.next_poll = now + self.interval
+        self.last_error = ""
+
+
+class TaskPoller:
+    def __init__(self):
+        self._tasks: Dict[str, _TrackedTask] = {}
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    async def wait(self, task_id: str, api_key: str, timeout: float) -> Dict[str, Any]:
+        """Wait for ``task_id`` to finish and return its ``output`` dict.
+
+        Raises TaskFailed / TaskTimeout. Concurrent waiters on the same task
+        ID share a single poll schedule.
+        """
+        loop = asyncio.get_running_loop()
+        tracked = self._tasks.get(task_id)
+        if tracked is None:
+            now = loop.time()
+            tracked = _TrackedTask(loop.create_future(), api_key, now + timeout, now)
+            # Mark the exception as retrieved even if every waiter was cancelled.
+            tracked.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._tasks[task_id] = tracked
+            if self._runner is None or self._runner.done():
+                self._runner = loop.create_task(self._run())
+            self._wakeup.set()
+        return await asyncio.shield(tracked.future)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._tasks:
+            now = loop.time()
+            due = [(tid, t) for tid, t in self._tasks.items() if t.next_poll <= now]
+            if due:
+                await asyncio.gather(*(self._poll(tid, t) for tid, t in due))
+
+            for tid in [tid for tid, t in self._tasks.items() if t.future.done()]:
+                del self._tasks[tid]
+            if not self._tasks:
+                break
+
+            next_at = min(t.next_poll for t in self._tasks.values())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, next_at - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+        self._runner = None
+
+    async def _poll(self, task_id: str, tracked: _TrackedTask) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            resp = await http_client.request(
+                "GET",
+                f"{DASHSCOPE_TASK_URL}/{task_id}",
+                headers={"Authorization": f"Bearer {tracked.api_key}"},
+                timeout=10,
+            )
+            resp.raise_for_status()
+            output = resp.json().get("output", {})
+        except Exception as e:
+            tracked.last_error = str(e)
+            print(f"[WARN] task_poller: poll {task_id} failed: {e}")
+            output = {}
+
+        status = output.get("task_status", "")
+        if tracked.future.done():
+            return
+        if status == "SUCCEEDED":
+            tracked.future.set_result(output)
+            return
+        if status in ("FAILED", "CANCELED", "UNKNOWN"):
+            tracked.future.set_exception(TaskFailed(output.get("message", "unknown error")))
+            return
+
+        now = loop.time()
+        # next_poll still holds this poll's slot; the one at the deadline is final.
+        if now >= tracked.deadline or tracked.next_poll >= tracked.deadline:
+            tracked.future.set_exception(TaskTimeout(tracked.last_error or "none"))
+            return
+        tracked.interval = min(tracked.interval * BACKOFF, MAX_INTERVAL)
+        # The last poll happens at the deadline itself, not one interval before it.
+        tracked.next_poll = min(now + tracked.interval, tracked.deadline)
+
+
+_poller: Optional[TaskPoller] = None
+_poller_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_poller() -> TaskPoller:
+    """Return the poller bound to the running event loop."""
+    global _poller, _poller_loop
+    loop = asyncio.get_running_loop()
+    if _poller is None or _poller_loop is not loop:
+        _poller = TaskPoller()
+        _poller_loop = loop
+    return _poller
+
+
+async def wait_for_task(task_id: str, api_key: str, timeout: float) -> Dict[str, Any]:
+    return await get_poller().wait(task_id, api_key, timeout)
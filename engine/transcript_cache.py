@@ -0,0 +1,102 @@
+"""In-memory cache of ASR transcriptions keyed by audio content.
+
+Students re-submit the same take and frontend retries re-upload the same
+bytes; each used to re-run the whole async SenseVoice job (2-30 s). Keys
+are sha256 of the normalized audio -- the trimmed 16 kHz mono PCM that
+``audio_preprocess`` produced, or the raw upload when it could not be
+decoded -- i.e. of what ASR would actually hear. Entries expire after a
+TTL and the least recently used are evicted past a size bound.
+Concurrent misses for the same key share one ASR job.
+"""
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .audio_preprocess import PreparedAudio
+from .singleflight import SingleFlight
+
+TTL_SECONDS = float(os.getenv("TRANSCRIPT_CACHE_TTL_S", "86400"))
+MAX_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "2048"))
+HASH_CHUNK = 1024 * 1024
+
+
+def audio_key(prepared: PreparedAudio, model: str = "") -> str:
+    digest = hashlib.sha256(f"{model}\x1f".encode("utf-8"))
+    if prepared.samples is not None:
+        digest.update(f"pcm16:{prepared.sample_rate}\x1f".encode("ascii"))
+        pcm = np.round(np.clip(prepared.samples, -1.0, 1.0) * 32767).astype("<i2")
+        digest.update(pcm.tobytes())
+    else:
+        digest.update(f"raw:{prepared.mime}\x1f".encode("ascii"))
+        source = prepared.open()
+        while True:
+            block = source.read(HASH_CHUNK)
+            if not block:
+                break
+            digest.update(block)
+        source.seek(0)
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    def __init__(self, ttl: float = TTL_SECONDS, max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (expires_at, transcription), least recently used first
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: SingleFlight[str] = SingleFlight()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "expired": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, text = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._stats["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl, text)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    async def get_or_transcribe(
+        self, key: str, transcribe: Callable[[], Awaitable[Tuple[str, bool]]],
+    ) -> str:
+        """Return the cached text, or run ``transcribe() -> (text, cacheable)`` once per key."""
+        text = self.get(key)
+        if text is not None:
+            self._stats["hits"] += 1
+            return text
+
+        async def run() -> str:
+            text, cacheable = await transcribe()
+            if cacheable:
+                self.put(key, text)
+            return text
+
+        self._stats["coalesced" if key in self._inflight else "misses"] += 1
+        return await self._inflight.do(key, run)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self._stats["hits"] + self._stats["misses"] + self._stats["coalesced"]
+        return {
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+transcript_cache = TranscriptCache()
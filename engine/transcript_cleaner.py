@@ -0,0 +1,91 @@
+"""Post-processing of SenseVoice STT output.
+
+All patterns are compiled once at import. Casing fixes for contractions are
+table-driven: ``CONTRACTION_FIXES`` feeds a single alternation regex whose
+matches are replaced by dictionary lookup, so adding another STT fix-up is a
+new table entry rather than another pass over the transcript.
+
+Passes whose ``re.sub`` scans interact (e.g. the ``.``/``,`` spacing rules,
+whose non-overlapping matches differ from a combined pattern on inputs like
+``a.b,c``) are kept separate so output stays identical to the original
+rule-by-rule implementation.
+"""
+import re
+
+# 6. Contraction casing from SenseVoice: i'M → I'm, it'S → it's
+CONTRACTION_FIXES = {
+    "i'M": "I'm",
+    "it'S": "it's",
+    "that'S": "that's",
+    "what'S": "what's",
+    "there'S": "there's",
+    "he'S": "he's",
+    "she'S": "she's",
+    "don'T": "don't",
+    "can'T": "can't",
+    "won'T": "won't",
+    "didn'T": "didn't",
+    "isn'T": "isn't",
+    "aren'T": "aren't",
+    "wasn'T": "wasn't",
+    "wouldn'T": "wouldn't",
+    "couldn'T": "couldn't",
+    "shouldn'T": "shouldn't",
+    "haven'T": "haven't",
+    "hasn'T": "hasn't",
+    "I'Ve": "I've",
+    "we'Re": "we're",
+    "they'Re": "they're",
+    "you'Re": "you're",
+    "i'Ll": "I'll",
+    "we'Ll": "we'll",
+    "i'D": "I'd",
+}
+
+# 1. Chinese/CJK characters and Chinese punctuation
+_CJK = re.compile(r'[\u4e00-\u9fff\u3000-\u303f\uff00-\uffef]+')
+# 2. word.Word → word. Word  (e.g. "center.it'Spretty" → "center. it'Spretty")
+_DOT_JOIN = re.compile(r'([a-zA-Z])\.([a-zA-Z])')
+# 3. word,word → word, word  (e.g. "convenient,but" → "convenient, but")
+_COMMA_JOIN = re.compile(r'([a-zA-Z]),([a-zA-Z])')
+# 4. Apostrophe camelCase from STT: "i'Mcurrently" → "i'M currently"
+_APOSTROPHE_JOIN = re.compile(r"([a-z])'([A-Z])([a-z])")
+# 5. Direct lowercase-uppercase joins: e.g. "liveIn" → "live In"
+_CASE_JOIN = re.compile(r'([a-z])([A-Z])')
+_CONTRACTION = re.compile(
+    r"\b(?:" + "|".join(re.escape(k) for k in sorted(CONTRACTION_FIXES, key=len, reverse=True)) + r")\b"
+)
+# 7. Orphan single letters (not "I" or "a") left after CJK removal
+_ORPHAN_LETTER = re.compile(r'\b([b-hj-zB-HJ-Z])\b(?=\s*[.,!?]|\s*$)')
+# 8. Spaces before punctuation
+_SPACE_BEFORE_PUNCT = re.compile(r'\s+([.,!?;:])')
+# 9. Runs of whitespace
+_WHITESPACE = re.compile(r'\s+')
+# 10. Trailing punctuation-only fragments
+_TRAILING_PUNCT = re.compile(r'[.,!?;:\s]+$')
+# 11. First letter of each sentence
+_SENTENCE_START = re.compile(r'(?:^|(?<=\.\s))([a-z])')
+
+
+def _fix_contraction(match: re.Match) -> str:
+    return CONTRACTION_FIXES[match.group(0)]
+
+
+def _upper_first(match: re.Match) -> str:
+    return match.group(1).upper()
+
+
+def clean_transcription(text: str) -> str:
+    """Post-process STT output to fix common SenseVoice issues."""
+    text = _CJK.sub('', text)
+    text = _DOT_JOIN.sub(r'\1. \2', text)
+    text = _COMMA_JOIN.sub(r'\1, \2', text)
+    text = _APOSTROPHE_JOIN.sub(r"\1'\2 \3", text)
+    text = _CASE_JOIN.sub(r'\1 \2', text)
+    text = _CONTRACTION.sub(_fix_contraction, text)
+    text = _ORPHAN_LETTER.sub('', text)
+    text = _SPACE_BEFORE_PUNCT.sub(r'\1', text)
+    text = _WHITESPACE.sub(' ', text).strip()
+    text = _TRAILING_PUNCT.sub('.', text).strip()
+    text = _SENTENCE_START.sub(_upper_first, text)
+    return text
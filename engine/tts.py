@@ -1,8 +1,9 @@
-import json
 import os
-import urllib.error
-import urllib.request
-from typing import Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from . import http_client
 
 DASHSCOPE_TTS_URL = (
     "https://dashscope.aliyuncs.com/api/v1/services/aigc/multimodal-generation/generation"
@@ -11,12 +12,12 @@ DEFAULT_TTS_MODEL = "qwen-tts"
 DEFAULT_TTS_VOICE = "cherry"
 
 
-def synthesize_speech(
+def _build_request(
     text: str,
-    voice: Optional[str] = None,
-    audio_format: str = "wav",
-    model: Optional[str] = None,
-) -> Tuple[bytes, str]:
+    voice: Optional[str],
+    audio_format: str,
+    model: Optional[str],
+) -> Tuple[Dict[str, Any], str]:
     api_key = os.getenv("DASHSCOPE_API_KEY", "").strip()
     if not api_key:
         raise RuntimeError("Missing DASHSCOPE_API_KEY environment variable.")
@@ -33,27 +34,22 @@ def synthesize_speech(
             "format": normalized_format,
         },
     }
-
-    body = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url=DASHSCOPE_TTS_URL,
-        data=body,
-        headers={
+    req = {
+        "url": DASHSCOPE_TTS_URL,
+        "headers": {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {api_key}",
         },
-        method="POST",
-    )
+        "json": payload,
+    }
+    return req, normalized_format
 
-    try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-    except urllib.error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="ignore")
-        raise RuntimeError(f"DashScope TTS request failed ({exc.code}): {detail}") from exc
-    except urllib.error.URLError as exc:
-        raise RuntimeError(f"DashScope TTS connection failed: {exc.reason}") from exc
 
+def _extract_audio_url(resp: httpx.Response) -> str:
+    if resp.status_code >= 400:
+        raise RuntimeError(f"DashScope TTS request failed ({resp.status_code}): {resp.text}")
+
+    data = resp.json()
     audio_url = (
         data.get("output", {})
         .get("audio", {})
@@ -61,17 +57,62 @@ def synthesize_speech(
     )
     if not audio_url:
         raise RuntimeError("DashScope TTS returned no audio URL.")
+    return audio_url
 
-    # Download the audio file from the returned URL
-    try:
-        audio_req = urllib.request.Request(url=audio_url)
-        with urllib.request.urlopen(audio_req, timeout=30) as audio_resp:
-            audio_bytes = audio_resp.read()
-    except Exception as exc:
-        raise RuntimeError(f"Failed to download TTS audio: {exc}") from exc
 
+def _finish(audio_bytes: bytes, normalized_format: str) -> Tuple[bytes, str]:
     if not audio_bytes:
         raise RuntimeError("Downloaded TTS audio is empty.")
 
     content_type = "audio/wav" if normalized_format == "wav" else "audio/mpeg"
     return audio_bytes, content_type
+
+
+def synthesize_speech(
+    text: str,
+    voice: Optional[str] = None,
+    audio_format: str = "wav",
+    model: Optional[str] = None,
+) -> Tuple[bytes, str]:
+    """Blocking synthesis; prefer :func:`asynthesize_speech` inside request handlers."""
+    req, normalized_format = _build_request(text, voice, audio_format, model)
+
+    try:
+        resp = http_client.request_sync("POST", timeout=60, **req)
+    except httpx.HTTPError as exc:
+        raise RuntimeError(f"DashScope TTS connection failed: {exc}") from exc
+    audio_url = _extract_audio_url(resp)
+
+    # Download the audio file from the returned URL
+    try:
+        audio_resp = http_client.request_sync("GET", audio_url, timeout=30)
+        audio_resp.raise_for_status()
+    except Exception as exc:
+        raise RuntimeError(f"Failed to download TTS audio: {exc}") from exc
+
+    return _finish(audio_resp.content, normalized_format)
+
+
+async def asynthesize_speech(
+    text: str,
+    voice: Optional[str] = None,
+    audio_format: str = "wav",
+    model: Optional[str] = None,
+) -> Tuple[bytes, str]:
+    """Synthesize speech over the shared async connection pool."""
+    req, normalized_format = _build_request(text, voice, audio_format, model)
+
+    try:
+        resp = await http_client.request("POST", timeout=60, **req)
+    except httpx.HTTPError as exc:
+        raise RuntimeError(f"DashScope TTS connection failed: {exc}") from exc
+    audio_url = _extract_audio_url(resp)
+
+    # Download the audio file from the returned URL
+    try:
+        audio_resp = await http_client.request("GET", audio_url, timeout=30)
+        audio_resp.raise_for_status()
+    except Exception as exc:
+        raise RuntimeError(f"Failed to download TTS audio: {exc}") from exc
+
+    return _finish(audio_resp.content, normalized_format)
@@ -0,0 +1,243 @@
+"""Content-addressed two-tier cache for synthesized speech.
+
+Audio is keyed on sha256(text, voice, model, format), so the examiner
+prompts and practice answers the frontend speaks over and over are
+synthesized by DashScope once. Fresh audio is kept in a small in-memory LRU
+and written to a size-bounded on-disk LRU; disk hits are served straight
+from the file. Concurrent misses for the same key share one synthesis call.
+
+Recency of disk entries is persisted through file mtimes, so the LRU order
+survives restarts.
+"""
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .singleflight import SingleFlight
+from .tts import DEFAULT_TTS_MODEL, DEFAULT_TTS_VOICE, asynthesize_speech
+
+CACHE_DIR = Path(
+    os.getenv("TTS_CACHE_DIR")
+    or Path(__file__).resolve().parents[1] / "data" / "cache" / "tts"
+)
+MEMORY_BYTES = int(float(os.getenv("TTS_CACHE_MEMORY_MB", "32")) * 1024 * 1024)
+DISK_BYTES = int(float(os.getenv("TTS_CACHE_DISK_MB", "512")) * 1024 * 1024)
+
+# Keys are content hashes, so a cached response never changes.
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+CONTENT_TYPES = {"wav": "audio/wav", "mp3": "audio/mpeg"}
+
+
+def cache_key(text: str, voice: Optional[str], model: Optional[str], audio_format: str) -> str:
+    parts = (
+        text,
+        voice or DEFAULT_TTS_VOICE,
+        model or DEFAULT_TTS_MODEL,
+        (audio_format or "wav").lower(),
+    )
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedSpeech:
+    key: str
+    content_type: str
+    source: str  # "memory", "disk" or "miss"
+    content: Optional[bytes] = None
+    path: Optional[Path] = None
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.key[:32]}"'
+
+
+class TTSCache:
+    def __init__(self, directory: Path = CACHE_DIR, memory_bytes: int = MEMORY_BYTES, disk_bytes: int = DISK_BYTES):
+        self.directory = Path(directory)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_size = 0
+        self._disk_ready = False
+        self._scan_lock = asyncio.Lock()
+        self._inflight: SingleFlight[Tuple[bytes, str]] = SingleFlight()
+        self._stats = {
+            "hits_memory": 0,
+            "hits_disk": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions_memory": 0,
+            "evictions_disk": 0,
+            "disk_errors": 0,
+        }
+
+    # ---- disk tier ---------------------------------------------------
+
+    def _path(self, key: str) -> Path:
+        fmt = key.rsplit(".", 1)[-1]
+        return self.directory / fmt / key
+
+    def _list_disk(self) -> List[Tuple[int, str, int]]:
+        """``(mtime_ns, name, size)`` of existing cache files, least recently used first."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for fmt in CONTENT_TYPES:
+            sub = self.directory / fmt
+            if not sub.is_dir():
+                continue
+            for path in sub.iterdir():
+                if path.suffix == ".tmp":
+                    continue
+                stat = path.stat()
+                entries.append((stat.st_mtime_ns, path.name, stat.st_size))
+        return sorted(entries)
+
+    async def _scan_disk(self) -> None:
+        """Index existing cache files once; the directory walk runs off the event loop."""
+        async with self._scan_lock:
+            if self._disk_ready:
+                return
+            if self.disk_bytes > 0:
+                try:
+                    entries = await asyncio.to_thread(self._list_disk)
+                except OSError as e:
+                    print(f"[WARN] tts_cache: disk cache unavailable ({e}); memory only")
+                    self.disk_bytes = 0
+                else:
+                    for _, name, size in entries:
+                        self._disk[name] = size
+                        self._disk_size += size
+                    self._evict_disk()
+            self._disk_ready = True
+
+    def _adopt(self, key: str) -> None:
+        """Index a file written by another process (e.g. scripts/warmup_caches.py)."""
+        if self.disk_bytes <= 0:
+            return
+        try:
+            size = self._path(key).stat().st_size
+        except OSError:
+            return
+        self._disk[key] = size
+        self._disk_size += size
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        while self._disk_size > self.disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            self._stats["evictions_disk"] += 1
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def _write_disk(self, key: str, audio: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(audio)
+        os.replace(tmp, path)
+
+    async def _store_disk(self, key: str, audio: bytes) -> None:
+        if self.disk_bytes <= 0 or len(audio) > self.disk_bytes:
+            return
+        try:
+            await asyncio.to_thread(self._write_disk, key, audio)
+        except OSError as e:
+            self._stats["disk_errors"] += 1
+            print(f"[WARN] tts_cache: failed to write {key[:12]}: {e}")
+            return
+        self._disk_size += len(audio) - self._disk.pop(key, 0)
+        self._disk[key] = len(audio)
+        self._evict_disk()
+
+    # ---- memory tier -------------------------------------------------
+
+    def _store_memory(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.memory_bytes:
+            return
+        self._memory_size += len(audio) - len(self._memory.pop(key, b""))
+        self._memory[key] = audio
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+            self._stats["evictions_memory"] += 1
+
+    # ---- lookup ------------------------------------------------------
+
+    def _lookup(self, key: str, content_type: str) -> Optional[CachedSpeech]:
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            self._stats["hits_memory"] += 1
+            return CachedSpeech(key, content_type, "memory", content=audio)
+
+        if key not in self._disk:
+            self._adopt(key)
+        if key in self._disk:
+            path = self._path(key)
+            try:
+                os.utime(path)  # persist recency for the next startup scan
+            except OSError:
+                # Removed behind our back; forget it and synthesize again.
+                self._disk_size -= self._disk.pop(key)
+                return None
+            self._disk.move_to_end(key)
+            self._stats["hits_disk"] += 1
+            return CachedSpeech(key, content_type, "disk", path=path)
+        return None
+
+    async def get_or_synthesize(
+        self,
+        text: str,
+        voice: Optional[str] = None,
+        audio_format: str = "wav",
+        model: Optional[str] = None,
+    ) -> CachedSpeech:
+        normalized_format = (audio_format or "wav").lower()
+        content_type = CONTENT_TYPES.get(normalized_format)
+        if content_type is None:
+            # Let the synthesizer produce the usual "Unsupported format" error.
+            audio, _ = await asynthesize_speech(text=text, voice=voice, audio_format=audio_format, model=model)
+            return CachedSpeech("", "application/octet-stream", "miss", content=audio)
+
+        key = f"{cache_key(text, voice, model, normalized_format)}.{normalized_format}"
+        if not self._disk_ready:
+            await self._scan_disk()
+        hit = self._lookup(key, content_type)
+        if hit is not None:
+            return hit
+
+        async def synthesize() -> Tuple[bytes, str]:
+            audio, synthesized_type = await asynthesize_speech(
+                text=text, voice=voice, audio_format=normalized_format, model=model,
+            )
+            self._store_memory(key, audio)
+            await self._store_disk(key, audio)
+            return audio, synthesized_type
+
+        self._stats["coalesced" if key in self._inflight else "misses"] += 1
+        audio, content_type = await self._inflight.do(key, synthesize)
+        return CachedSpeech(key, content_type, "miss", content=audio)
+
+    def stats(self) -> Dict[str, float]:
+        hits = self._stats["hits_memory"] + self._stats["hits_disk"]
+        lookups = hits + self._stats["misses"] + self._stats["coalesced"]
+        return {
+            **self._stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_size,
+        }
+
+
+tts_cache = TTSCache()
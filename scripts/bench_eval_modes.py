@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Compare the "full" (Examiner -> Critic -> GM) and "fast" (single call)
+evaluation modes on real recordings.
+
+Reports latency, LLM calls / token usage and how closely the fast-mode scores
+agree with the full role-play. Needs DASHSCOPE_API_KEY; every run costs real
+API calls.
+
+    python scripts/bench_eval_modes.py --audio a.wav b.wav --runs 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dotenv import load_dotenv  # noqa: E402
+
+from engine import llm_client  # noqa: E402
+from engine.camel_agents import CamelIELTSAgent  # noqa: E402
+
+CRITERIA = ("fluency", "lexical", "grammar", "pronunciation")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark full vs fast evaluation modes")
+    parser.add_argument("--audio", nargs="+", required=True, help="Recordings to evaluate")
+    parser.add_argument("--question", default="Do you work or are you a student?")
+    parser.add_argument("--level", default="6.0-6.5")
+    parser.add_argument("--part", default="P1")
+    parser.add_argument("--runs", type=int, default=1, help="Runs per recording and mode")
+    return parser.parse_args()
+
+
+async def run_once(agent: CamelIELTSAgent, audio: bytes, args: argparse.Namespace, mode: str) -> dict:
+    with llm_client.track_usage() as usage:
+        start = time.perf_counter()
+        result = await agent.run_roleplay_evaluation(
+            audio=audio,
+            question=args.question,
+            target_level=args.level,
+            part=args.part,
+            mode=mode,
+        )
+        elapsed = time.perf_counter() - start
+    timings = result.get("stage_timings_ms", {})
+    return {
+        "latency": elapsed,
+        # STT is identical in both modes; this isolates the part fast mode changes.
+        "llm_latency": elapsed - timings.get("stt", 0.0) / 1000,
+        "usage": dict(usage),
+        "scores": result.get("scores", {}),
+    }
+
+
+def _score(scores: dict, key: str) -> float | None:
+    try:
+        return float(scores.get(key))
+    except (TypeError, ValueError):
+        return None
+
+
+def summarize(mode: str, runs: list[dict]) -> None:
+    latencies = [r["latency"] for r in runs]
+    llm = [r["llm_latency"] for r in runs]
+    tokens = [r["usage"]["total_tokens"] for r in runs]
+    calls = [r["usage"]["calls"] for r in runs]
+    print(
+        f"{mode:>5}: latency mean={statistics.mean(latencies):.2f}s "
+        f"median={statistics.median(latencies):.2f}s | post-STT mean={statistics.mean(llm):.2f}s | "
+        f"LLM calls={statistics.mean(calls):.1f} tokens={statistics.mean(tokens):.0f}"
+    )
+
+
+def agreement(full_runs: list[dict], fast_runs: list[dict]) -> None:
+    for key in CRITERIA:
+        diffs = []
+        for full, fast in zip(full_runs, fast_runs):
+            a, b = _score(full["scores"], key), _score(fast["scores"], key)
+            if a is not None and b is not None:
+                diffs.append(abs(a - b))
+        if not diffs:
+            print(f"{key:>13}: no comparable scores")
+            continue
+        within = sum(1 for d in diffs if d <= 0.5) / len(diffs)
+        print(f"{key:>13}: mean |diff|={statistics.mean(diffs):.2f} within 0.5 band={within:.0%}")
+
+
+async def main() -> None:
+    load_dotenv()
+    args = parse_args()
+    agent = CamelIELTSAgent()
+    results: dict[str, list[dict]] = {"full": [], "fast": []}
+
+    for path in args.audio:
+        audio = Path(path).read_bytes()
+        for _ in range(args.runs):
+            for mode in ("full", "fast"):
+                results[mode].append(await run_once(agent, audio, args, mode))
+        print(f"done: {path}")
+
+    print()
+    summarize("full", results["full"])
+    summarize("fast", results["fast"])
+    print("\nScore agreement (fast vs full):")
+    agreement(results["full"], results["fast"])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Benchmark the P1 retrieval backends on synthetic banks.
+
+Grows the real Part 1 bank to 1k / 10k / 100k records by recombining its
+questions with topic words, then reports index build time, single-query
+latency for each backend and batched tfidf scoring throughput.
+
+    python scripts/bench_retrieval.py --sizes 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from engine.p1_retrieval import STOPWORDS, BM25Index, _load_bank  # noqa: E402
+from engine.p1_vector_index import TfidfIndex  # noqa: E402
+
+FILLERS = [
+    "weekend", "family", "friends", "music", "sports", "cooking", "travel", "weather",
+    "neighbours", "shopping", "reading", "films", "holidays", "transport", "university",
+    "colleagues", "childhood", "internet", "phone", "park", "restaurant", "garden",
+]
+
+
+def synthetic_bank(base: list[dict], size: int, rnd: random.Random) -> list[dict]:
+    records = []
+    for i in range(size):
+        rec = base[i % len(base)]
+        extra = " ".join(rnd.sample(FILLERS, 2))
+        question = f"{rec['question'][:-1]} with {extra}?"
+        records.append({**rec, "id": f"syn_{i:06d}", "question": question,
+                        "keywords": rec.get("keywords", []) + extra.split()})
+    return records
+
+
+def time_queries(search, queries: list[str]) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        search(q, "", 5)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark P1 retrieval backends")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    base = _load_bank()
+    if not base:
+        sys.exit("P1 bank is empty; nothing to benchmark.")
+    rnd = random.Random(0)
+    # Paraphrased queries: drop a word and swap in a filler so exact overlap is partial.
+    queries = []
+    for _ in range(args.queries):
+        words = rnd.choice(base)["question"].rstrip("?").split()
+        if len(words) > 3:
+            words.pop(rnd.randrange(len(words)))
+        queries.append(" ".join(words + [rnd.choice(FILLERS)]) + "?")
+
+    for size in args.sizes:
+        records = synthetic_bank(base, size, rnd)
+        t0 = time.perf_counter()
+        bm25 = BM25Index(records)
+        t1 = time.perf_counter()
+        tfidf = TfidfIndex(records, STOPWORDS)
+        t2 = time.perf_counter()
+
+        bm25_ms = time_queries(bm25.search, queries)
+        tfidf_ms = time_queries(tfidf.search, queries)
+        start = time.perf_counter()
+        tfidf.search_batch(queries, [""] * len(queries), 5)
+        batch_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+        print(
+            f"n={size:>7}: build bm25={t1 - t0:.2f}s tfidf={t2 - t1:.2f}s | "
+            f"query bm25={bm25_ms:.3f}ms tfidf={tfidf_ms:.3f}ms tfidf-batch={batch_ms:.3f}ms/query"
+        )
+
+
+if __name__ == "__main__":
+    main()
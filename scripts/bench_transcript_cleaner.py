@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Golden-output check and microbenchmark for the STT transcript cleaner.
+
+Verifies engine.transcript_cleaner.clean_transcription against
+scripts/fixtures/transcript_golden.json (exit code 1 on any mismatch), then
+times it against the original one-re.sub-per-rule implementation.
+
+    python scripts/bench_transcript_cleaner.py --number 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from engine.transcript_cleaner import clean_transcription  # noqa: E402
+
+GOLDEN_PATH = ROOT / "scripts" / "fixtures" / "transcript_golden.json"
+
+_LEGACY_CONTRACTIONS = [
+    (r"\bi'M\b", "I'm"), (r"\bit'S\b", "it's"), (r"\bthat'S\b", "that's"),
+    (r"\bwhat'S\b", "what's"), (r"\bthere'S\b", "there's"), (r"\bhe'S\b", "he's"),
+    (r"\bshe'S\b", "she's"), (r"\bdon'T\b", "don't"), (r"\bcan'T\b", "can't"),
+    (r"\bwon'T\b", "won't"), (r"\bdidn'T\b", "didn't"), (r"\bisn'T\b", "isn't"),
+    (r"\baren'T\b", "aren't"), (r"\bwasn'T\b", "wasn't"), (r"\bwouldn'T\b", "wouldn't"),
+    (r"\bcouldn'T\b", "couldn't"), (r"\bshouldn'T\b", "shouldn't"), (r"\bhaven'T\b", "haven't"),
+    (r"\bhasn'T\b", "hasn't"), (r"\bI'Ve\b", "I've"), (r"\bwe'Re\b", "we're"),
+    (r"\bthey'Re\b", "they're"), (r"\byou'Re\b", "you're"), (r"\bi'Ll\b", "I'll"),
+    (r"\bwe'Ll\b", "we'll"), (r"\bi'D\b", "I'd"),
+]
+
+
+def legacy_clean_transcription(text: str) -> str:
+    """The original rule-by-rule implementation, kept as the baseline."""
+    text = re.sub(r'[\u4e00-\u9fff\u3000-\u303f\uff00-\uffef]+', '', text)
+    text = re.sub(r'([a-zA-Z])\.([a-zA-Z])', r'\1. \2', text)
+    text = re.sub(r'([a-zA-Z]),([a-zA-Z])', r'\1, \2', text)
+    text = re.sub(r"([a-z])'([A-Z])([a-z])", r"\1'\2 \3", text)
+    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
+    for pattern, repl in _LEGACY_CONTRACTIONS:
+        text = re.sub(pattern, repl, text)
+    text = re.sub(r'\b([b-hj-zB-HJ-Z])\b(?=\s*[.,!?]|\s*$)', '', text)
+    text = re.sub(r'\s+([.,!?;:])', r'\1', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    text = re.sub(r'[.,!?;:\s]+$', '.', text).strip()
+    text = re.sub(r'(?:^|(?<=\.\s))([a-z])', lambda m: m.group(1).upper(), text)
+    return text
+
+
+def check_golden(cases: list[dict]) -> int:
+    failures = 0
+    for case in cases:
+        got = clean_transcription(case["input"])
+        if got != case["expected"]:
+            failures += 1
+            print(f"MISMATCH input={case['input']!r}\n  expected={case['expected']!r}\n  got     ={got!r}")
+    print(f"golden: {len(cases) - failures}/{len(cases)} identical")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the transcript cleaner")
+    parser.add_argument("--number", type=int, default=2000, help="Passes over the corpus per timing")
+    args = parser.parse_args()
+
+    cases = json.loads(GOLDEN_PATH.read_text(encoding="utf-8"))
+    if check_golden(cases):
+        sys.exit(1)
+
+    corpus = [c["input"] for c in cases]
+    for name, fn in (("legacy", legacy_clean_transcription), ("compiled", clean_transcription)):
+        best = min(timeit.repeat(lambda: [fn(t) for t in corpus], number=args.number, repeat=3))
+        per_call_us = best / (args.number * len(corpus)) * 1e6
+        print(f"{name:>8}: {per_call_us:.2f} us/transcript")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Pre-translate the question bank's vocabulary into data/processed/glossary.tsv.gz.
+
+Collects the questions and sample answers of data/processed/p1_bank.json
+and engine/question_bank.json, extracts every distinct word plus recurring
+2-3 word collocations and the P1 keywords, and translates whatever the
+existing glossary lacks in batched LLM calls. The file is rewritten after
+every batch, so an interrupted build resumes where it stopped. Needs
+DASHSCOPE_API_KEY unless nothing is missing. Exits 1 while terms are still
+missing (also with --dry-run), so deploy checks can gate on it. The server
+runs the same build at startup when the file is incomplete
+(GLOSSARY_AUTOBUILD).
+
+    python scripts/build_glossary.py --batch-size 80 --concurrency 3
+    python scripts/build_glossary.py --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv  # noqa: E402
+
+from engine import http_client  # noqa: E402
+from engine.glossary import (  # noqa: E402
+    BATCH_SIZE,
+    BUILD_CONCURRENCY,
+    GLOSSARY_PATH,
+    bank_terms,
+    build_glossary,
+    load_glossary,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build the word-tap translation glossary")
+    parser.add_argument("--output", type=Path, default=GLOSSARY_PATH)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Terms per LLM call")
+    parser.add_argument("--concurrency", type=int, default=BUILD_CONCURRENCY, help="Parallel LLM calls")
+    parser.add_argument("--min-count", type=int, default=2, help="Occurrences for a collocation to be kept")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the existing glossary")
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many terms are missing")
+    return parser.parse_args()
+
+
+async def build(args: argparse.Namespace) -> int:
+    """Number of bank terms still missing from the glossary afterwards."""
+    terms = bank_terms(min_count=args.min_count)
+    entries = {} if args.rebuild else load_glossary(args.output)
+    pending = [t for t in terms if t not in entries]
+    print(f"{len(terms)} terms, {len(entries)} in glossary, {len(pending)} to translate")
+    if args.dry_run or not pending:
+        return len(pending)
+    failed = await build_glossary(args.output, pending, entries, args.batch_size, args.concurrency)
+    print(f"Wrote {len(entries)} entries to {args.output}; {failed} untranslated (rerun to retry)")
+    return failed
+
+
+async def main() -> int:
+    load_dotenv()
+    args = parse_args()
+    try:
+        missing = await build(args)
+    finally:
+        await http_client.aclose()
+    # Non-zero while terms are missing, so deploy steps can tell a partial build.
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
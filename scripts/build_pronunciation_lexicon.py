@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Build the bundled pronunciation lexicon from CMUdict.
+
+Keeps the first pronunciation of every purely alphabetic headword and
+writes ``word<TAB>ARPAbet phones`` lines, gzipped, for
+engine/pronunciation.py (which derives IPA and phonetic match keys).
+
+    python scripts/build_pronunciation_lexicon.py --cmudict cmudict.dict
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import re
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_OUTPUT = ROOT / "data" / "processed" / "pronunciation_lexicon.tsv.gz"
+HEADWORD = re.compile(r"^[a-z]+(?:'[a-z]+)?$")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build the pronunciation lexicon from CMUdict")
+    parser.add_argument("--cmudict", required=True, help="Path to cmudict.dict")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="Output .tsv.gz path")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    entries: dict[str, str] = {}
+    for line in Path(args.cmudict).read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        word, _, phones = line.partition(" ")
+        # "word(2)" lines are alternates; the first pronunciation wins.
+        if not HEADWORD.match(word) or word in entries:
+            continue
+        entries[word] = phones.strip()
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    body = "".join(f"{w}\t{p}\n" for w, p in sorted(entries.items()))
+    header = "# Derived from the CMU Pronouncing Dictionary (BSD-2-Clause, see CMUDICT_LICENSE)\n"
+    # mtime=0 keeps rebuilds byte-identical.
+    with gzip.GzipFile(output, "wb", mtime=0) as f:
+        f.write((header + body).encode("utf-8"))
+    print(f"Wrote {len(entries)} entries to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -259,6 +259,24 @@ step7() {
   ok "step7 done"
 }
 
+step8() {
+  local py
+  if command -v python3 >/dev/null 2>&1; then
+    py="python3"
+  elif command -v python >/dev/null 2>&1; then
+    py="python"
+  else
+    fail "Missing required command: python3 (or python)"
+  fi
+
+  # Translates whatever bank terms data/processed/glossary.tsv.gz lacks
+  # (needs DASHSCOPE_API_KEY); exits non-zero while any are missing.
+  "$py" scripts/build_glossary.py || fail "Glossary incomplete; rerun step8 to retry the missing terms."
+  ok "data/processed/glossary.tsv.gz covers the question bank"
+
+  ok "step8 done"
+}
+
 # ---- Router ----
 case "$STEP" in
   step0) step0 ;;
@@ -269,8 +287,9 @@ case "$STEP" in
   step5) step5 ;;
   step6) step6 ;;
   step7) step7 ;;
+  step8) step8 ;;
   *)
-    echo "Usage: $0 step0|step1|step2|step3|step4|step5|step6|step7"
+    echo "Usage: $0 step0|step1|step2|step3|step4|step5|step6|step7|step8"
     exit 2
     ;;
 esac
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Pre-generate the examiner audio the frontend requests on every session.
+
+Fills the same on-disk cache the live /v1/audio/speech endpoint reads
+(data/cache/tts) with the exact (text, voice, model, format) requests the
+frontend sends, so they hit on the first play:
+
+- PracticeBank reads each INITIAL_QUESTIONS entry's questionEn/answerEn
+  (constants.tsx) in TTSProvider's default voice.
+- MockTest opens Part 1/3 with a fixed question in the chosen examiner's
+  voice and reads the fixed Part 2 instructions in the default voice
+  (components/MockTest.tsx).
+
+Texts are read from constants.tsx, so edits there are picked up on the next
+run; the MockTest lines are mirrored below and must be kept in sync.
+Entries are keyed by content hash, so re-runs only synthesize what is
+missing and an interrupted run resumes where it stopped. A running server
+picks up the new files on its next lookup.
+
+Scene images are not warmed: PracticeBank builds their prompts from the
+LLM-written scene or the phrases the user selects, so no fixed prompt would
+ever be requested.
+
+Needs DASHSCOPE_API_KEY for anything not cached yet.
+
+    python scripts/warmup_caches.py --concurrency 4
+    python scripts/warmup_caches.py --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv  # noqa: E402
+
+from engine import http_client  # noqa: E402
+from engine.tts_cache import cache_key, tts_cache  # noqa: E402
+
+CONSTANTS = ROOT / "constants.tsx"
+# What engine/TTSProvider.ts sends.
+FRONTEND_TTS_MODEL = "qwen3-tts-instruct-flash-realtime-2026-01-22"
+FRONTEND_TTS_FORMAT = "wav"
+DEFAULT_VOICE = "cherry"
+# components/MockTest.tsx: EXAMINERS[*].voice, the initial currentQuestionText,
+# and the Part 2 lines spoken without a voice (so in DEFAULT_VOICE).
+EXAMINER_VOICES = ["ethan", "cherry", "chelsie"]
+MOCKTEST_OPENING_QUESTION = "Could you describe a beautiful place you've visited recently?"
+MOCKTEST_P2_SCRIPT = [
+    "Now, I'm going to give you a topic and I'd like you to talk about it for one to two minutes. "
+    "Before you talk, you'll have one minute to think about what you're going to say. "
+    "You can make some notes if you wish. Here is your topic.",
+    "All right. Remember, you have one to two minutes for this, so don't worry if I stop you. "
+    "I will tell you when the time is up. Please start speaking now.",
+]
+
+# questionEn: '...' / answerEn: "..." inside INITIAL_QUESTIONS.
+_SPOKEN_FIELD = re.compile(r"""\b(?:questionEn|answerEn)\s*:\s*(['"])((?:\\.|(?!\1).)*)\1""")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Warm the TTS cache with the frontend's fixed examiner lines")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel TTS requests")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many new items")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what is missing")
+    return parser.parse_args()
+
+
+def practice_bank_texts() -> List[str]:
+    source = CONSTANTS.read_text(encoding="utf-8")
+    start = source.find("INITIAL_QUESTIONS")
+    if start < 0:
+        raise SystemExit(f"INITIAL_QUESTIONS not found in {CONSTANTS}")
+    return [re.sub(r"\\(.)", r"\1", m.group(2)) for m in _SPOKEN_FIELD.finditer(source, start)]
+
+
+def load_requests() -> List[Tuple[str, str]]:
+    """(text, voice) pairs exactly as the frontend requests them."""
+    pairs = [(text, DEFAULT_VOICE) for text in practice_bank_texts()]
+    pairs += [(MOCKTEST_OPENING_QUESTION, voice) for voice in EXAMINER_VOICES]
+    pairs += [(text, DEFAULT_VOICE) for text in MOCKTEST_P2_SCRIPT]
+    return list(dict.fromkeys((text.strip(), voice) for text, voice in pairs if text.strip()))
+
+
+def is_cached(text: str, voice: str) -> bool:
+    key = cache_key(text, voice, FRONTEND_TTS_MODEL, FRONTEND_TTS_FORMAT)
+    return tts_cache._path(f"{key}.{FRONTEND_TTS_FORMAT}").exists()
+
+
+async def warm_tts(args: argparse.Namespace, requests: List[Tuple[str, str]]) -> None:
+    pending = [(text, voice) for text, voice in requests if not is_cached(text, voice)]
+    if args.limit:
+        pending = pending[: args.limit]
+    print(f"TTS: {len(requests)} requests, {len(pending)} missing")
+    if args.dry_run or not pending:
+        return
+
+    semaphore = asyncio.Semaphore(max(1, args.concurrency))
+    counts = {"generated": 0, "cached": 0, "failed": 0}
+
+    async def one(text: str, voice: str) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                cached = await tts_cache.get_or_synthesize(
+                    text, voice=voice, audio_format=FRONTEND_TTS_FORMAT, model=FRONTEND_TTS_MODEL,
+                )
+            except Exception as e:
+                counts["failed"] += 1
+                print(f"[WARN] tts: {voice}: {text[:60]!r} failed: {str(e)[:120]}")
+                return
+            if cached.source in ("disk", "memory"):
+                counts["cached"] += 1
+                return
+            counts["generated"] += 1
+            print(f"[INFO] tts: {voice}: {text[:60]!r} ({time.perf_counter() - started:.1f}s)")
+
+    await asyncio.gather(*(one(text, voice) for text, voice in pending))
+    print(f"TTS done: {counts}")
+
+
+async def main() -> None:
+    load_dotenv()
+    args = parse_args()
+    try:
+        await warm_tts(args, load_requests())
+    finally:
+        await http_client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
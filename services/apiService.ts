@@ -24,6 +24,20 @@ export interface DetectedError {
   explanation: string;
 }
 
+export interface FluencyMetrics {
+  speaking_rate_wpm: number | null;
+  voiced_s: number;
+  pause_count: number;
+  pauses_per_min: number | null;
+  pause_mean_s: number;
+  pause_median_s: number;
+  pause_max_s: number;
+  long_pause_count: number;
+  mean_length_of_run: number | null;
+  filler_count: number;
+  filler_per_100_words: number | null;
+}
+
 export interface EvaluationResult {
   transcription: string;
   scores: { fluency: number; lexical: number; grammar: number; pronunciation: number };
@@ -32,13 +46,79 @@ export interface EvaluationResult {
   xpReward: number;
   pronunciationFeedback?: PronunciationItem[];
   detectedErrors?: DetectedError[];
+  fluencyMetrics?: FluencyMetrics | null;
 }
 
 /**
  * Unified API Agent Caller.
  * Calls the local FastAPI backend (/v1/ielts/evaluate) with multipart form data.
+ * With onProgress it uses /v1/ielts/evaluate/stream and reports thoughts,
+ * the transcription and pronunciation feedback while later stages still run.
  */
-export const callIELTSAgent = async (audioBlob: Blob, part: string, question: string, userLevel: string = "6.0-6.5", anchorWords: string[] = []): Promise<EvaluationResult> => {
+export type EvaluationMode = "full" | "fast";
+
+export type EvaluationProgress =
+  | { type: "thought"; text: string }
+  | { type: "transcription"; text: string }
+  | { type: "pronunciation"; items: PronunciationItem[] }
+  | { type: "fluency"; metrics: FluencyMetrics | null }
+  | { type: "stage"; name: string; elapsed_ms: number };
+
+const toEvaluationResult = (openaiResponse: any): EvaluationResult => {
+  const assistantMessage = openaiResponse.choices[0].message;
+  const metadata = assistantMessage.metadata;
+
+  return {
+    transcription: metadata.transcription,
+    scores: metadata.scores,
+    agent_thoughts: metadata.agent_thoughts,
+    feedback: assistantMessage.content,
+    xpReward: metadata.xp_reward,
+    pronunciationFeedback: metadata.pronunciation_feedback || [],
+    detectedErrors: metadata.detected_errors || [],
+    fluencyMetrics: metadata.fluency_metrics ?? null,
+  };
+};
+
+const readEvaluationStream = async (
+  response: Response,
+  onProgress: (event: EvaluationProgress) => void
+): Promise<EvaluationResult> => {
+  const reader = response.body!.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const blocks = buffer.split("\n\n");
+    buffer = blocks.pop() || "";
+    for (const block of blocks) {
+      let event = "message";
+      let data = "";
+      for (const line of block.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (!data) continue;
+      const payload = JSON.parse(data);
+      if (event === "result") return toEvaluationResult(payload);
+      if (event === "error") throw new Error(payload.detail || "Backend failure");
+      onProgress({ type: event, ...payload } as EvaluationProgress);
+    }
+  }
+  throw new Error("Evaluation stream ended without a result");
+};
+
+export const callIELTSAgent = async (
+  audioBlob: Blob,
+  part: string,
+  question: string,
+  userLevel: string = "6.0-6.5",
+  anchorWords: string[] = [],
+  mode?: EvaluationMode,
+  onProgress?: (event: EvaluationProgress) => void
+): Promise<EvaluationResult> => {
   try {
     const formData = new FormData();
     formData.append("audio", audioBlob, "response.wav");
@@ -48,30 +128,37 @@ export const callIELTSAgent = async (audioBlob: Blob, part: string, question: st
     if (anchorWords.length > 0) {
       formData.append("anchor_words", JSON.stringify(anchorWords));
     }
+    if (mode) {
+      formData.append("mode", mode);
+    }
 
-    const response = await fetch(`${API_BASE}/v1/ielts/evaluate`, {
+    const endpoint = onProgress ? "/v1/ielts/evaluate/stream" : "/v1/ielts/evaluate";
+    const response = await fetch(`${API_BASE}${endpoint}`, {
       method: "POST",
       body: formData,
     });
 
+    const rejection = response.status === 422 ? await response.json() : null;
+    if (rejection?.code) {
+      // Rejected locally by the audio quality gate (silent, too short or clipped).
+      return {
+        transcription: "",
+        scores: { fluency: 0, lexical: 0, grammar: 0, pronunciation: 0 },
+        agent_thoughts: [`Agent: [AudioNode] ${rejection.detail}`],
+        feedback: rejection.detail,
+        xpReward: 0,
+      };
+    }
+
     if (!response.ok) {
-      const errorJson = await response.json();
+      const errorJson = rejection || await response.json();
       throw new Error(errorJson.detail || "Backend failure");
     }
 
-    const openaiResponse = await response.json();
-    const assistantMessage = openaiResponse.choices[0].message;
-    const metadata = assistantMessage.metadata;
-
-    return {
-      transcription: metadata.transcription,
-      scores: metadata.scores,
-      agent_thoughts: metadata.agent_thoughts,
-      feedback: assistantMessage.content,
-      xpReward: metadata.xp_reward,
-      pronunciationFeedback: metadata.pronunciation_feedback || [],
-      detectedErrors: metadata.detected_errors || [],
-    };
+    if (onProgress && response.body) {
+      return await readEvaluationStream(response, onProgress);
+    }
+    return toEvaluationResult(await response.json());
   } catch (error: any) {
     console.error("Agentic Link Error:", error);
     return {
@@ -90,7 +177,10 @@ interface P1AnswerRequest {
   profile: Record<string, unknown>;
 }
 
-export const generateP1Answer = async (payload: P1AnswerRequest): Promise<string> => {
+export const generateP1Answer = async (
+  payload: P1AnswerRequest,
+  onDelta?: (delta: string, text: string) => void
+): Promise<string> => {
   const response = await fetch(`${API_BASE}/v1/chat/completions`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
@@ -103,6 +193,7 @@ export const generateP1Answer = async (payload: P1AnswerRequest): Promise<string
         question: payload.question,
         profile: payload.profile,
       },
+      stream: Boolean(onDelta),
     }),
   });
 
@@ -111,8 +202,33 @@ export const generateP1Answer = async (payload: P1AnswerRequest): Promise<string
     throw new Error(errorJson.detail || "Failed to generate Part 1 answer.");
   }
 
-  const data = await response.json();
-  return data?.choices?.[0]?.message?.content || "";
+  if (!onDelta || !response.body) {
+    const data = await response.json();
+    return data?.choices?.[0]?.message?.content || "";
+  }
+
+  // Server-sent chat.completion.chunk events: render text as it arrives.
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let text = "";
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const events = buffer.split("\n\n");
+    buffer = events.pop() || "";
+    for (const event of events) {
+      const data = event.replace(/^data: /, "").trim();
+      if (!data || data === "[DONE]") continue;
+      const delta = JSON.parse(data)?.choices?.[0]?.delta?.content;
+      if (delta) {
+        text += delta;
+        onDelta(delta, text);
+      }
+    }
+  }
+  return text;
 };
 
 
@@ -136,6 +252,26 @@ export const generateGrammarHint = async (
 };
 
 
+export interface WordTranslation {
+  translation: string;
+  emoji: string;
+}
+
+export const translateWords = async (
+  words: string[],
+  glossaryOnly: boolean = false
+): Promise<Record<string, WordTranslation>> => {
+  const response = await fetch(`${API_BASE}/api/translate_words`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ words, glossaryOnly }),
+  });
+  if (!response.ok) throw new Error(`Translate words failed: ${response.status}`);
+  const data = await response.json();
+  return data.translations || {};
+};
+
+
 export interface GrammarValidateResult {
   transcription: string;
   isCorrect: boolean;
@@ -164,3 +300,64 @@ export const validateGrammarTrial = async (
 
   return response.json();
 };
+
+export interface ImageJob {
+  id: string;
+  status: "queued" | "running" | "succeeded" | "failed";
+  url: string;
+  error: string;
+  cached: boolean;
+}
+
+const isFinished = (job: ImageJob) => job.status === "succeeded" || job.status === "failed";
+
+const pollImageJob = async (id: string): Promise<ImageJob> => {
+  while (true) {
+    const response = await fetch(`${API_BASE}/api/image-jobs/${id}`);
+    if (!response.ok) {
+      return { id, status: "failed", url: "", error: `HTTP ${response.status}`, cached: false };
+    }
+    const job: ImageJob = await response.json();
+    if (isFinished(job)) return job;
+    await new Promise((resolve) => setTimeout(resolve, 2000));
+  }
+};
+
+const waitForImageJob = (id: string): Promise<ImageJob> =>
+  new Promise((resolve) => {
+    const source = new EventSource(`${API_BASE}/api/image-jobs/${id}/events`);
+    source.addEventListener("status", (event) => {
+      const job: ImageJob = JSON.parse((event as MessageEvent).data);
+      if (isFinished(job)) {
+        source.close();
+        resolve(job);
+      }
+    });
+    source.onerror = () => {
+      // SSE blocked (e.g. by a buffering proxy): fall back to polling.
+      source.close();
+      resolve(pollImageJob(id));
+    };
+  });
+
+/**
+ * Scene image for a set of anchor words via the background job API:
+ * submit, then wait on the job's SSE status stream.
+ */
+export const generateSceneImage = async (
+  prompt: string,
+  words: string
+): Promise<{ url: string; error?: string }> => {
+  const response = await fetch(`${API_BASE}/api/image-jobs`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ prompt, words }),
+  });
+  if (!response.ok) {
+    const errorJson = await response.json().catch(() => ({}));
+    return { url: "", error: errorJson.detail || `HTTP ${response.status} ${response.statusText}` };
+  }
+  let job: ImageJob = await response.json();
+  if (!isFinished(job)) job = await waitForImageJob(job.id);
+  return job.status === "succeeded" ? { url: job.url } : { url: "", error: job.error || "图片生成失败" };
+};
@@ -17,6 +17,10 @@ export default defineConfig(({ mode }) => {
             target: 'http://localhost:8000',
             changeOrigin: true,
           },
+          '/media': {
+            target: 'http://localhost:8000',
+            changeOrigin: true,
+          },
         },
       },
       plugins: [react()],